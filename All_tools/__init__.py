@@ -12,8 +12,10 @@ from .file_management import (
     create_file, delete_file, read_file_content, write_file_content,
     create_folder, list_folder_contents, copy_file_or_folder, move_file_or_folder
 )
-from .communication_tools import send_email, send_whatsapp_message, make_phone_call
-from .system_info_tools import get_system_info, check_mac_permissions, get_downloads_info
+from .communication_tools import send_email, send_bulk_email, send_whatsapp_message, make_phone_call
+from .system_info_tools import (
+    get_system_info, check_mac_permissions, get_downloads_info, find_duplicate_files
+)
 from .screen_monitoring import (
     get_screen_info, get_open_windows_info, get_browser_tabs_detailed
 )
@@ -74,6 +76,7 @@ __all__ = [
     
     # Communication Tools
     'send_email',
+    'send_bulk_email',
     'send_whatsapp_message',
     'make_phone_call',
     
@@ -81,6 +84,7 @@ __all__ = [
     'get_system_info',
     'check_mac_permissions',
     'get_downloads_info',
+    'find_duplicate_files',
     
     # Screen Monitoring
     'get_screen_info',
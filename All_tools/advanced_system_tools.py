@@ -1,14 +1,13 @@
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+import shutil
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .device_control import get_device_control
+from .system_backend import BRIGHTNESS, VOLUME, get_system_backend, is_mac
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def set_volume_precise(
     context: RunContext,  # type: ignore
     percentage: int
@@ -18,8 +17,9 @@ async def set_volume_precise(
     Args:
         percentage: Volume percentage from 0 to 100
     """
-    if not is_mac():
-        return "Volume control केवल macOS पर उपलब्ध है।"
+    backend = get_system_backend()
+    if not backend.supports(VOLUME):
+        return f"❌ {backend.unavailable(VOLUME)}"
     
     try:
         # Validate percentage
@@ -27,18 +27,16 @@ async def set_volume_precise(
             percentage = 0
         elif percentage > 100:
             percentage = 100
-            
-        # Convert to AppleScript volume scale (0-100)
-        script = f'set volume output volume {percentage}'
-        subprocess.run(["osascript", "-e", script], check=True)
-        
-        return f"✅ Volume set to {percentage}%"
+
+        # Shares one in-memory level with every other volume change, so bursts apply once
+        applied = await get_device_control().volume.set(percentage)
+        return f"✅ Volume set to {applied}%"
         
     except Exception as e:
         logging.error(f"Error setting volume: {e}")
         return f"❌ Volume set करने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def set_brightness_precise(
     context: RunContext,  # type: ignore
     percentage: int
@@ -48,8 +46,9 @@ async def set_brightness_precise(
     Args:
         percentage: Brightness percentage from 0 to 100
     """
-    if not is_mac():
-        return "Brightness control केवल macOS पर उपलब्ध है।"
+    backend = get_system_backend()
+    if not backend.supports(BRIGHTNESS):
+        return f"❌ {backend.unavailable(BRIGHTNESS)}"
     
     try:
         # Validate percentage
@@ -57,40 +56,19 @@ async def set_brightness_precise(
             percentage = 0
         elif percentage > 100:
             percentage = 100
-            
-        # Convert percentage to decimal (0.0 to 1.0)
-        brightness_value = percentage / 100.0
-        
-        script = f'''
-        tell application "System Events"
-            tell appearance preferences
-                set brightness of (first display whose type is "built-in") to {brightness_value}
-            end tell
-        end tell
-        '''
-        
-        # Alternative method using brightness utility
-        subprocess.run(["brightness", str(brightness_value)], check=False)
-        
-        return f"✅ Brightness set to {percentage}%"
+
+        applied = await get_device_control().brightness.set(percentage)
+        return f"✅ Brightness set to {applied}%"
         
     except Exception as e:
-        # Try alternative method
-        try:
-            # Install brightness utility if not available
-            result = subprocess.run(["which", "brightness"], capture_output=True, text=True)
-            if result.returncode != 0:
-                return f"❌ Brightness control के लिए 'brightness' utility install करें: brew install brightness"
-                
-            brightness_value = percentage / 100.0
-            subprocess.run(["brightness", str(brightness_value)], check=True)
-            return f"✅ Brightness set to {percentage}%"
-            
-        except Exception as e2:
-            logging.error(f"Error setting brightness: {e2}")
-            return f"❌ Brightness set करने में error. System Preferences → Security & Privacy → Accessibility में Terminal को access दें।"
+        logging.error(f"Error setting brightness: {e}")
+        if not is_mac():
+            return f"❌ Brightness set करने में error: {str(e)}"
+        if not shutil.which("brightness"):
+            return f"❌ Brightness control के लिए 'brightness' utility install करें: brew install brightness"
+        return f"❌ Brightness set करने में error. System Preferences → Security & Privacy → Accessibility में Terminal को access दें।"
 
-@function_tool()
+@metered_tool()
 async def open_folder_in_app(
     context: RunContext,  # type: ignore
     folder_path: str,
@@ -151,7 +129,7 @@ async def open_folder_in_app(
         logging.error(f"Error opening folder: {e}")
         return f"❌ Folder open करने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def change_wallpaper(
     context: RunContext,  # type: ignore
     image_path: str = "",
@@ -0,0 +1,17 @@
+import json
+import os
+import time
+
+# Lines with this prefix on stdout are parsed by agent_supervisor and
+# forwarded to dashboards instead of being logged
+EVENT_PREFIX = "FRIDAY_EVENT "
+
+# Set by the supervisor for processes it manages
+events_enabled = os.getenv("FRIDAY_EVENTS") == "1"
+
+def emit_event(event: str, **data):
+    """Report an event (tool call, state change, metric) to the control plane"""
+    if not events_enabled:
+        return
+    data.setdefault("time", time.time())
+    print(EVENT_PREFIX + json.dumps({"event": event, **data}, default=str), flush=True)
@@ -1,7 +1,9 @@
 import logging
 import requests
 import os
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .tracing import start_span, http_span
 from ddgs import DDGS
 from datetime import datetime
 
@@ -9,7 +11,11 @@ from datetime import datetime
 cloud_api_key = os.getenv("CLOUD_API_KEY")
 deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
 
-@function_tool()
+# Chat-completions endpoints; override to use a proxy or a local stub
+CLOUD_API_BASE = os.getenv("CLOUD_API_BASE", "https://api.claude.ai/v1").rstrip("/")
+DEEPSEEK_API_BASE = os.getenv("DEEPSEEK_API_BASE", "https://api.deepseek.com/v1").rstrip("/")
+
+@metered_tool()
 async def ask_cloud_api_with_internet(
     context: RunContext,  # type: ignore
     question: str
@@ -24,8 +30,9 @@ async def ask_cloud_api_with_internet(
         logging.info(f"Asking Cloud API with internet context: {question}")
         
         # First get internet search results
-        with DDGS() as ddgs:
+        with start_span("ddgs.text", kind="client", attributes={"search.max_results": 5}) as span, DDGS() as ddgs:
             search_results = list(ddgs.text(question, max_results=5))
+            span.set_attribute("search.results", len(search_results))
         
         # Format search results for context
         context_info = ""
@@ -58,8 +65,10 @@ Current time: {datetime.now().strftime("%Y-%m-%d %H:%M")}"""
             'temperature': 0.7
         }
         
-        response = requests.post('https://api.claude.ai/v1/chat/completions', 
-                               headers=headers, json=data, timeout=30)
+        url = f'{CLOUD_API_BASE}/chat/completions'
+        with http_span("POST", url, headers) as span:
+            response = requests.post(url, headers=headers, json=data, timeout=30)
+            span.set_attribute("http.status_code", response.status_code)
         
         if response.status_code == 200:
             answer = response.json()['choices'][0]['message']['content']
@@ -74,7 +83,7 @@ Current time: {datetime.now().strftime("%Y-%m-%d %H:%M")}"""
         # Fallback to DeepSeek API
         return await ask_deepseek_with_internet(context, question)
 
-@function_tool()
+@metered_tool()
 async def ask_deepseek_with_internet(
     context: RunContext,  # type: ignore
     question: str
@@ -89,8 +98,9 @@ async def ask_deepseek_with_internet(
         logging.info(f"Asking DeepSeek API with internet context: {question}")
         
         # First get internet search results
-        with DDGS() as ddgs:
+        with start_span("ddgs.text", kind="client", attributes={"search.max_results": 5}) as span, DDGS() as ddgs:
             search_results = list(ddgs.text(question, max_results=5))
+            span.set_attribute("search.results", len(search_results))
         
         # Format search results for context
         context_info = ""
@@ -123,8 +133,10 @@ Current time: {datetime.now().strftime("%Y-%m-%d %H:%M")}"""
             'temperature': 0.7
         }
         
-        response = requests.post('https://api.deepseek.com/v1/chat/completions', 
-                               headers=headers, json=data, timeout=30)
+        url = f'{DEEPSEEK_API_BASE}/chat/completions'
+        with http_span("POST", url, headers) as span:
+            response = requests.post(url, headers=headers, json=data, timeout=30)
+            span.set_attribute("http.status_code", response.status_code)
         
         if response.status_code == 200:
             answer = response.json()['choices'][0]['message']['content']
@@ -0,0 +1,192 @@
+"""
+Which applications are running, cached, so close_application can skip apps
+that are not running and open_app can say whether it launched the app or only
+brought it to the front.
+
+The cache is filled from a single process listing and trusted for
+FRIDAY_APP_STATE_TTL seconds (default 60). Launches and quits made through
+the tools update it straight away; apps started or quit by hand are picked
+up at the next listing. A backend that can push launch/quit notifications
+(set_backend with a backend whose watch() returns True) keeps it current
+without re-listing. cached_apps() and known_running() never list processes,
+for callers that only want the answer when it is free.
+
+App names go through a precomputed alias table ("chrome", "vs code",
+"क्रोम" -> the name `open -a` and AppleScript expect).
+"""
+
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Optional
+
+from .contact_directory import normalize
+
+CACHE_TTL = float(os.getenv("FRIDAY_APP_STATE_TTL", "60"))
+
+# Application name -> what people call it
+APP_ALIASES = {
+    "Safari": ["safari", "सफारी"],
+    "Google Chrome": ["chrome", "google chrome", "क्रोम"],
+    "Firefox": ["firefox", "mozilla"],
+    "Calculator": ["calculator", "calc", "कैलकुलेटर"],
+    "Calendar": ["calendar", "कैलेंडर"],
+    "Mail": ["mail", "apple mail", "email"],
+    "Notes": ["notes", "नोट्स"],
+    "Finder": ["finder", "files"],
+    "Terminal": ["terminal", "टर्मिनल"],
+    "System Preferences": ["system preferences", "system settings", "settings", "preferences", "सेटिंग्स"],
+    "Activity Monitor": ["activity monitor", "task manager"],
+    "TextEdit": ["textedit", "text edit"],
+    "Preview": ["preview"],
+    "Music": ["music", "apple music", "itunes", "म्यूजिक"],
+    "Spotify": ["spotify"],
+    "Photos": ["photos", "फोटो"],
+    "Messages": ["messages", "imessage"],
+    "FaceTime": ["facetime"],
+    "WhatsApp": ["whatsapp", "व्हाट्सएप"],
+    "Maps": ["maps", "apple maps"],
+    "Visual Studio Code": ["vs code", "vscode", "code", "visual studio code"],
+    "Microsoft Word": ["word", "ms word"],
+    "Microsoft Excel": ["excel", "ms excel"],
+    "Microsoft PowerPoint": ["powerpoint", "ppt"],
+    "Slack": ["slack"],
+    "zoom.us": ["zoom"],
+    "App Store": ["app store"],
+    "Contacts": ["contacts"],
+    "Reminders": ["reminders"],
+    "Xcode": ["xcode"],
+}
+
+def alias_key(name: str) -> str:
+    """Lookup key: transliterated, lowercase, no ".app", no spaces"""
+    name = re.sub(r"\.app$", "", name.strip(), flags=re.IGNORECASE)
+    return normalize(name).replace(" ", "")
+
+ALIAS_TABLE: Dict[str, str] = {}
+for app, aliases in APP_ALIASES.items():
+    for alias in [app] + aliases:
+        ALIAS_TABLE.setdefault(alias_key(alias), app)
+
+class ProcessListBackend:
+    """
+    Running apps from one `ps` call: bundles whose own executable
+    (X.app/Contents/MacOS/...) is running. Helpers and command line tools
+    inside a bundle (Chrome's helper apps, Xcode's git) do not count as it.
+    """
+    BUNDLE = re.compile(r"/([^/]+)\.app/Contents/MacOS/[^/]+$")
+
+    def running(self) -> FrozenSet[str]:
+        result = subprocess.run(["ps", "-axo", "comm="], capture_output=True, text=True, timeout=5)
+        apps = set()
+        for line in result.stdout.splitlines():
+            bundle = self.BUNDLE.search(line)
+            if bundle:
+                apps.add(bundle.group(1))
+        return frozenset(apps)
+
+    def watch(self, on_change: Callable[[str, str], None]) -> bool:
+        """Push ("launched"|"quit", app) events to on_change; False when this backend cannot"""
+        return False
+
+class AppStateCache:
+    def __init__(self, backend=None, ttl: float = CACHE_TTL):
+        self.backend = backend or ProcessListBackend()
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.apps: Dict[str, str] = {}  # alias_key -> running app name
+        self.refreshed = 0.0
+        self.pushed = self.backend.watch(self.on_change)
+
+    def refresh(self):
+        apps = {}
+        for app in self.backend.running():
+            self.add(apps, app)
+        with self.lock:
+            self.apps = apps
+            self.refreshed = time.monotonic()
+
+    @staticmethod
+    def add(apps: Dict[str, str], app: str):
+        """Keyed by the app's own name and by its alias-table name ("System Settings" / "System Preferences")"""
+        key = alias_key(app)
+        apps[key] = app
+        apps.setdefault(alias_key(ALIAS_TABLE.get(key, app)), app)
+
+    def fresh(self) -> bool:
+        """Call with the lock held"""
+        return bool(self.refreshed) and (self.pushed or time.monotonic() - self.refreshed < self.ttl)
+
+    def running_apps(self) -> Dict[str, str]:
+        with self.lock:
+            fresh = self.fresh()
+        if not fresh:
+            self.refresh()
+        with self.lock:
+            return dict(self.apps)
+
+    def cached_apps(self) -> Optional[Dict[str, str]]:
+        """Running apps if the cache is fresh, else None; never lists processes"""
+        with self.lock:
+            return dict(self.apps) if self.fresh() else None
+
+    def known_running(self, app: str) -> Optional[bool]:
+        """Whether app is running according to a fresh cache, None when that needs a listing"""
+        apps = self.cached_apps()
+        return None if apps is None else alias_key(app) in apps
+
+    def running_name(self, app: str) -> Optional[str]:
+        """The running app's own name if app (any alias) is running, else None"""
+        return self.running_apps().get(alias_key(app))
+
+    def is_running(self, app: str) -> Optional[bool]:
+        """None when the process listing failed, so callers do what they would without a cache"""
+        try:
+            return self.running_name(app) is not None
+        except (OSError, subprocess.SubprocessError) as e:
+            logging.warning(f"Could not list running apps: {e}")
+            return None
+
+    def on_change(self, event: str, app: str):
+        with self.lock:
+            if event == "launched":
+                self.add(self.apps, app)
+            elif event == "quit":
+                keys = {alias_key(app), alias_key(ALIAS_TABLE.get(alias_key(app), app))}
+                gone = {self.apps[key] for key in keys if key in self.apps} | {app}
+                self.apps = {key: name for key, name in self.apps.items() if name not in gone}
+
+_cache: Optional[AppStateCache] = None
+_cache_lock = threading.Lock()
+
+def get_app_state() -> AppStateCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AppStateCache()
+        return _cache
+
+def set_backend(backend):
+    """Use another source of running apps (e.g. one fed by workspace notifications)"""
+    global _cache
+    with _cache_lock:
+        _cache = AppStateCache(backend)
+
+def resolve_app_name(name: str, list_processes: bool = True) -> str:
+    """
+    Application name for a spoken name: alias table first, then a running app,
+    else as given. With list_processes=False only a fresh cache is consulted.
+    """
+    key = alias_key(name)
+    if key in ALIAS_TABLE:
+        return ALIAS_TABLE[key]
+    app_state = get_app_state()
+    try:
+        apps = app_state.running_apps() if list_processes else (app_state.cached_apps() or {})
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.warning(f"Could not list running apps: {e}")
+        apps = {}
+    return apps.get(key) or name.strip()
@@ -1,14 +1,14 @@
+import asyncio
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
+from .app_state import get_app_state, resolve_app_name
+from .ui_wait import activate_and_wait
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def open_app(
     context: RunContext,  # type: ignore
     app_name: str
@@ -21,30 +21,17 @@ async def open_app(
     if not is_mac():
         return "This function is only supported on macOS."
     
-    # Map common app names to their actual application names
-    app_mapping = {
-        'safari': 'Safari',
-        'chrome': 'Google Chrome',
-        'calculator': 'Calculator',
-        'calendar': 'Calendar',
-        'mail': 'Mail',
-        'notes': 'Notes',
-        'finder': 'Finder',
-        'terminal': 'Terminal',
-        'system preferences': 'System Preferences',
-        'activity monitor': 'Activity Monitor',
-        'textedit': 'TextEdit',
-        'preview': 'Preview',
-        'music': 'Music',
-        'photos': 'Photos',
-        'messages': 'Messages',
-        'facetime': 'FaceTime'
-    }
-    
-    actual_app_name = app_mapping.get(app_name.lower(), app_name)
+    app_state = get_app_state()
+    actual_app_name = app_name
     
     try:
-        result = subprocess.run(
+        # Only what the cache already knows: listing processes would cost more than `open -a` itself
+        actual_app_name = resolve_app_name(app_name, list_processes=False)
+        running = app_state.known_running(actual_app_name)
+
+        # Still run for an open app: `open -a` brings it to the front (hidden, minimized or behind other windows)
+        result = await asyncio.to_thread(
+            subprocess.run,
             ["open", "-a", actual_app_name], 
             capture_output=True, 
             text=True, 
@@ -52,6 +39,9 @@ async def open_app(
         )
         
         if result.returncode == 0:
+            if running:
+                return f"✅ {actual_app_name} पहले से खुला है, सामने लाया गया / {actual_app_name} was already open, brought to front"
+            app_state.on_change("launched", actual_app_name)
             return f"✅ {actual_app_name} opened successfully / {actual_app_name} खोला गया"
         else:
             return f"❌ Application '{actual_app_name}' not found. Please check if it's installed."
@@ -60,7 +50,7 @@ async def open_app(
         logging.error(f"Error opening app {app_name}: {e}")
         return f"❌ Error opening {actual_app_name}: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def close_application(
     context: RunContext,  # type: ignore
     app_name: str
@@ -76,28 +66,15 @@ async def close_application(
         if not is_mac():
             return "यह फीचर केवल Mac पर उपलब्ध है। / This feature is only available on Mac."
         
-        # Map common app names to actual app names
-        app_mapping = {
-            "chrome": "Google Chrome",
-            "safari": "Safari", 
-            "firefox": "Firefox",
-            "finder": "Finder",
-            "mail": "Mail",
-            "music": "Music",
-            "spotify": "Spotify",
-            "whatsapp": "WhatsApp",
-            "facetime": "FaceTime",
-            "calendar": "Calendar",
-            "notes": "Notes",
-            "messages": "Messages",
-            "photos": "Photos",
-            "maps": "Maps"
-        }
+        actual_app_name = await asyncio.to_thread(resolve_app_name, app_name)
+        app_state = get_app_state()
+        # Telling an app that is not running to quit would launch it first
+        if await asyncio.to_thread(app_state.is_running, actual_app_name) is False:
+            return f"✅ {actual_app_name} पहले से बंद है। / {actual_app_name} is not running."
         
-        actual_app_name = app_mapping.get(app_name.lower(), app_name.title())
-        
-        # AppleScript to close application
+        # AppleScript to close application; checks again itself, since the cache may be up to a minute old
         applescript = f'''
+        if application "{actual_app_name}" is not running then return "Application not running"
         try
             tell application "{actual_app_name}"
                 quit
@@ -122,8 +99,12 @@ async def close_application(
                               capture_output=True, text=True, timeout=15)
         
         if result.returncode == 0:
+            if "not running" in result.stdout:
+                app_state.on_change("quit", actual_app_name)
+                return f"✅ {actual_app_name} पहले से बंद है। / {actual_app_name} is not running."
             if "successfully" in result.stdout or "force closed" in result.stdout:
                 logging.info(f"Application closed successfully: {actual_app_name}")
+                app_state.on_change("quit", actual_app_name)
                 return f"✅ {actual_app_name} बंद कर दिया। / {actual_app_name} closed successfully."
             else:
                 return f"❌ {actual_app_name} बंद करने में समस्या हुई।"
@@ -134,7 +115,7 @@ async def close_application(
         logging.error(f"Error closing application: {e}")
         return f"Application बंद करने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def control_music(
     context: RunContext,  # type: ignore
     action: str,
@@ -156,10 +137,8 @@ async def control_music(
             # Search and play specific song
             applescript = f'''
             try
+                {activate_and_wait("Music")}
                 tell application "Music"
-                    activate
-                    delay 1
-                    
                     -- Search for the song
                     set searchResults to (search playlist "Library" for "{song_name}")
                     
@@ -168,9 +147,8 @@ async def control_music(
                         return "Playing: {song_name}"
                     else
                         -- Try Spotify if available
+                        {activate_and_wait("Spotify")}
                         tell application "Spotify"
-                            activate
-                            delay 1
                             play track "{song_name}"
                             return "Playing on Spotify: {song_name}"
                         end tell
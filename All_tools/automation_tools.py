@@ -1,15 +1,13 @@
+import asyncio
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
 from typing import List, Dict
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def create_workflow(
     context: RunContext,  # type: ignore
     workflow_name: str,
@@ -54,44 +52,98 @@ async def create_workflow(
         logging.error(f"Error in workflow: {e}")
         return f"Workflow error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def batch_file_operations(
     context: RunContext,  # type: ignore
     operation: str,
     source_folder: str,
     file_pattern: str = "*",
-    destination: str = ""
+    destination: str = "",
+    recursive: bool = False,
+    regex: str = "",
+    exclude: str = "",
+    min_size_mb: float = 0,
+    max_size_mb: float = 0,
+    older_than_days: float = 0,
+    newer_than_days: float = 0,
+    dry_run: bool = False,
+    confirm: bool = False,
+    include_hidden: bool = False
 ) -> str:
     """
-    Perform batch operations on files.
+    Perform batch operations on files selected by glob, regex, size and age.
+    Without recursive, matching folders directly in source_folder are copied, moved or deleted whole.
+    Hidden files and folders (names starting with ".") are skipped unless include_hidden is set.
+    Large batches only return a plan until called again with confirm=True.
     Args:
-        operation: Operation to perform (copy, move, delete, rename)
+        operation: Operation to perform (copy, move, delete)
         source_folder: Source folder path
-        file_pattern: File pattern to match
+        file_pattern: Comma-separated globs ("*.pdf", "**/*.jpg") or a suffix like ".txt"
         destination: Destination folder (for copy/move)
+        recursive: Whether to pick files inside subfolders instead of whole folders (relative paths are kept;
+            a move removes the subfolders it leaves empty)
+        regex: Optional regular expression the relative path must match
+        exclude: Comma-separated globs to skip (e.g. "node_modules,*.tmp")
+        min_size_mb: Only files at least this big
+        max_size_mb: Only files at most this big (0 = no limit)
+        older_than_days: Only files last modified more than N days ago
+        newer_than_days: Only files modified within the last N days
+        dry_run: Only show the plan, do not change anything
+        confirm: Required to run batches above the confirmation limits
+        include_hidden: Also select hidden files and folders
     """
     try:
         logging.info(f"Batch file operation: {operation} on {source_folder}")
         
-        from .file_management import copy_file_or_folder, move_file_or_folder, delete_file
-        
-        results = []
-        
-        if operation == "copy":
-            for file in os.listdir(source_folder):
-                if file_pattern == "*" or file.endswith(file_pattern):
-                    result = await copy_file_or_folder(context, f"{source_folder}/{file}", f"{destination}/{file}")
-                    results.append(result)
-        elif operation == "move":
-            for file in os.listdir(source_folder):
-                if file_pattern == "*" or file.endswith(file_pattern):
-                    result = await move_file_or_folder(context, f"{source_folder}/{file}", f"{destination}/{file}")
-                    results.append(result)
-        elif operation == "delete":
-            for file in os.listdir(source_folder):
-                if file_pattern == "*" or file.endswith(file_pattern):
-                    result = await delete_file(context, f"{source_folder}/{file}")
-                    results.append(result)
+        from .file_management import trash_paths
+        from .copy_engine import transfer
+        from .file_selection import FileSelector, ExecutionPlan, prune_empty_directories, select_files
+        
+        operation = operation.lower()
+        if operation not in ("copy", "move", "delete"):
+            return f"Unknown batch operation: {operation}. Use copy, move or delete."
+        
+        source_folder = os.path.expanduser(source_folder)
+        destination = os.path.expanduser(destination) if operation != "delete" else ""
+        if not os.path.isdir(source_folder):
+            return f"❌ Folder not found: {source_folder}"
+        if operation in ("copy", "move") and not destination:
+            return f"Batch {operation} needs a destination folder."
+        
+        selector = FileSelector(
+            include=file_pattern,
+            regex=regex,
+            exclude=exclude,
+            min_size=int(min_size_mb * 1024 * 1024),
+            max_size=int(max_size_mb * 1024 * 1024),
+            older_than_days=older_than_days,
+            newer_than_days=newer_than_days,
+            recursive=recursive,
+            include_hidden=include_hidden
+        )
+        files = await asyncio.to_thread(select_files, source_folder, selector)
+        plan = ExecutionPlan(operation, source_folder, destination, files)
+        
+        if not plan.files:
+            return plan.summary() + "\nNothing to do."
+        if dry_run:
+            return plan.summary()
+        if plan.needs_confirmation and not confirm:
+            return plan.summary() + "\n⚠️ This is a large batch. Ask the user, then call again with confirm=True."
+        
+        results = [plan.summary()]
+        
+        if operation in ("copy", "move"):
+            # One transfer for every file so the engine can run them concurrently
+            outcome = await asyncio.to_thread(transfer, plan.pairs(), operation)
+            if operation == "move" and recursive:
+                await asyncio.to_thread(prune_empty_directories, source_folder, plan.files)
+            results.append(f"✅ {operation.title()} finished: {outcome.summary()}")
+            results.extend(f"❌ {error}" for error in outcome.errors[:20])
+        else:
+            trashed, errors = await asyncio.to_thread(trash_paths, [item.path for item in plan.files])
+            results.append(f"🗑️ Moved {trashed} files to trash")
+            results.extend(f"❌ {error}" for error in errors[:20])
         
         return f"Batch {operation} completed:\n" + "\n".join(results)
         
@@ -99,7 +151,7 @@ async def batch_file_operations(
         logging.error(f"Error in batch operation: {e}")
         return f"Batch operation error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def system_health_check(
     context: RunContext,  # type: ignore
 ) -> str:
@@ -151,7 +203,7 @@ async def system_health_check(
         logging.error(f"Error in system health check: {e}")
         return f"System health check error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def smart_automation(
     context: RunContext,  # type: ignore
     task_description: str
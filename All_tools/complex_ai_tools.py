@@ -1,7 +1,8 @@
 import logging
 import requests
 import os
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
 from typing import Optional
 import json
 from datetime import datetime
@@ -11,7 +12,7 @@ cloud_api_key = os.getenv("CLOUD_API_KEY")
 deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-@function_tool()
+@metered_tool()
 async def enhanced_internet_query(
     context: RunContext,  # type: ignore
     query: str,
@@ -57,7 +58,7 @@ RELATED NEWS:
         logging.error(f"Error in enhanced internet query: {e}")
         return f"Error in enhanced query: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def multi_source_analysis(
     context: RunContext,  # type: ignore
     topic: str,
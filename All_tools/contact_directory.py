@@ -0,0 +1,489 @@
+"""
+Local contact index so tools can turn a spoken name into a phone number or email before any UI automation.
+
+Contacts are imported from vCard (.vcf) and CSV files (Google, Outlook or any
+CSV with name/phone/email columns) in ~/.friday/contacts and FRIDAY_CONTACTS_FILES,
+and from the macOS Contacts app. The merged index is cached in
+~/.friday/contacts/index.json; a source file is re-imported only when it
+changes, and the Contacts app at most every FRIDAY_CONTACTS_REFRESH_HOURS
+(default 24) in the background.
+
+Every name token, nickname and the joined full name goes into a prefix trie,
+both as written and as a phonetic key, so lookups cover:
+  - prefixes ("rah" -> Rahul Sharma)
+  - spelling variants that sound alike ("Shweta" / "Sweta", "Vikas" / "Wikas")
+  - Devanagari names and queries, transliterated to Latin ("राहुल" -> rahul)
+  - typos, by edit distance over the trie
+A lookup takes microseconds.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from .system_backend import is_mac
+
+CONTACTS_DIR = os.path.expanduser(os.getenv("FRIDAY_CONTACTS_DIR", "~/.friday/contacts"))
+INDEX_PATH = os.path.join(CONTACTS_DIR, "index.json")
+EXTRA_FILES = [path.strip() for path in os.getenv("FRIDAY_CONTACTS_FILES", "").split(",") if path.strip()]
+MACOS_REFRESH_SECONDS = float(os.getenv("FRIDAY_CONTACTS_REFRESH_HOURS", "24")) * 3600
+MACOS_SOURCE = "macos:Contacts"
+
+# A match is used without asking when it is exact as written or as spoken (this score or better)
+# and clearly beats the runner-up, or when it is the only contact the name could mean.
+# Prefixes and typos are only offered as candidates: "Ravi" must not silently become "Ravindra".
+CONFIDENT_SCORE = 0.8
+CONFIDENT_MARGIN = 0.1
+PREFIX_SCORE = 0.75
+
+PHONE_PATTERN = re.compile(r"^\+?[\d\s\-().]{7,}$")
+
+# Devanagari to Latin, close to how Hindi names are usually spelled in English (राहुल -> rahul, not raahul)
+DEVANAGARI_VOWELS = {
+    "अ": "a", "आ": "a", "इ": "i", "ई": "ee", "उ": "u", "ऊ": "oo", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o",
+}
+DEVANAGARI_MATRAS = {
+    "ा": "a", "ि": "i", "ी": "ee", "ु": "u", "ू": "oo", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o",
+}
+DEVANAGARI_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n", "च": "ch", "छ": "chh", "ज": "j",
+    "झ": "jh", "ञ": "n", "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n", "त": "t",
+    "थ": "th", "द": "d", "ध": "dh", "न": "n", "प": "p", "फ": "ph", "ब": "b", "भ": "bh",
+    "म": "m", "य": "y", "र": "r", "ल": "l", "व": "v", "श": "sh", "ष": "sh", "स": "s",
+    "ह": "h", "क़": "q", "ख़": "kh", "ग़": "g", "ज़": "z", "ड़": "r", "ढ़": "rh", "फ़": "f",
+}
+VIRAMA, NUKTA = "्", "़"
+# Chandrabindu is usually not written in English (माँ -> ma)
+NASALS = {"ं": "n", "ँ": "", "ः": "h"}
+
+# Applied in order to build a phonetic key; covers the usual Hindi/English spelling variants
+PHONETIC_RULES = [
+    ("x", "ks"), ("chh", "x"), ("ch", "x"), ("c", "k"), ("sh", "s"), ("ph", "f"), ("kh", "k"), ("gh", "g"), ("jh", "j"),
+    ("th", "t"), ("dh", "d"), ("bh", "b"), ("ck", "k"), ("q", "k"), ("w", "v"), ("z", "j"),
+    ("ee", "i"), ("ii", "i"), ("oo", "u"), ("uu", "u"), ("aa", "a"),
+]
+
+def transliterate(text: str) -> str:
+    """Devanagari letters to Latin, with the final inherent 'a' dropped (राम -> ram); other text unchanged"""
+    out = []
+    pending_a = False
+    for char in unicodedata.normalize("NFC", text):
+        if char == NUKTA:
+            continue
+        consonant = DEVANAGARI_CONSONANTS.get(char)
+        if consonant is not None:
+            if pending_a:
+                out.append("a")
+            out.append(consonant)
+            pending_a = True
+            continue
+        if char in DEVANAGARI_MATRAS:
+            out.append(DEVANAGARI_MATRAS[char])
+            pending_a = False
+            continue
+        if char == VIRAMA:
+            pending_a = False
+            continue
+        if char in NASALS:
+            if pending_a:
+                out.append("a")
+            out.append(NASALS[char])
+            pending_a = False
+            continue
+        # Word boundary or non-Devanagari: the inherent vowel of the last consonant is silent
+        pending_a = False
+        out.append(DEVANAGARI_VOWELS.get(char, char))
+    return "".join(out)
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII words: transliterated, accents and punctuation removed"""
+    text = unicodedata.normalize("NFKD", transliterate(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+def phonetic(word: str) -> str:
+    """Sound-alike key: Shweta/Sweta -> sveta, Vikas/Wikas -> vikas, Pooja/Puja -> puja"""
+    key = word
+    for pattern, replacement in PHONETIC_RULES:
+        key = key.replace(pattern, replacement)
+    key = key[:1] + key[1:].replace("h", "").replace("y", "i")
+    key = re.sub(r"(.)\1+", r"\1", key)
+    if len(key) > 3 and key.endswith("a"):
+        key = key[:-1]
+    return key
+
+def normalize_phone(number: str) -> str:
+    """+<digits> for international numbers, plain digits otherwise"""
+    number = number.strip()
+    digits = re.sub(r"\D", "", number)
+    if number.startswith("+"):
+        return "+" + digits
+    if number.startswith("00") and len(digits) > 2:
+        return "+" + digits[2:]
+    return digits
+
+class Contact:
+    def __init__(self, name: str, phones: List[str] = None, emails: List[str] = None,
+                 nicknames: List[str] = None, source: str = ""):
+        self.name = name.strip()
+        self.phones = [p for p in dict.fromkeys(normalize_phone(p) for p in phones or []) if len(p.lstrip("+")) >= 5]
+        self.emails = list(dict.fromkeys(e.strip().lower() for e in emails or [] if "@" in e))
+        self.nicknames = [n.strip() for n in nicknames or [] if n.strip()]
+        self.source = source
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "phones": self.phones, "emails": self.emails,
+                "nicknames": self.nicknames, "source": self.source}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Contact":
+        return cls(data["name"], data.get("phones"), data.get("emails"), data.get("nicknames"), data.get("source", ""))
+
+    def describe(self) -> str:
+        handles = self.phones[:1] + self.emails[:1]
+        return f"{self.name} ({', '.join(handles)})" if handles else self.name
+
+class TrieNode:
+    __slots__ = ("children", "ids", "below")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.ids = set()    # contacts with exactly this key
+        self.below = set()  # contacts with a key starting here
+
+class PrefixTrie:
+    def __init__(self):
+        self.root = TrieNode()
+
+    def insert(self, key: str, contact_id: int):
+        node = self.root
+        node.below.add(contact_id)
+        for char in key:
+            node = node.children.setdefault(char, TrieNode())
+            node.below.add(contact_id)
+        node.ids.add(contact_id)
+
+    def exact(self, key: str) -> set:
+        node = self.find(key)
+        return node.ids if node else set()
+
+    def prefix(self, key: str) -> set:
+        node = self.find(key)
+        return node.below if node else set()
+
+    def find(self, key: str) -> Optional[TrieNode]:
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def fuzzy(self, key: str, max_distance: int) -> Dict[int, int]:
+        """contact id -> smallest edit distance of any key within max_distance (Levenshtein rows over the trie)"""
+        found = {}
+        first_row = list(range(len(key) + 1))
+        stack = [(child, char, first_row) for char, child in self.root.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for column in range(1, len(key) + 1):
+                row.append(min(row[column - 1] + 1, previous[column] + 1,
+                               previous[column - 1] + (key[column - 1] != char)))
+            if row[-1] <= max_distance:
+                for contact_id in node.ids:
+                    found[contact_id] = min(found.get(contact_id, max_distance), row[-1])
+            if min(row) <= max_distance:
+                stack.extend((child, next_char, row) for next_char, child in node.children.items())
+        return found
+
+def parse_vcard(text: str, source: str) -> List[Contact]:
+    contacts = []
+    # Unfold continuation lines (RFC 6350)
+    text = re.sub(r"\r?\n[ \t]", "", text)
+    for block in re.findall(r"BEGIN:VCARD(.*?)END:VCARD", text, re.S | re.I):
+        name, structured, phones, emails, nicknames = "", "", [], [], []
+        for line in block.splitlines():
+            key, _, value = line.partition(":")
+            field = key.split(";")[0].split(".")[-1].upper()
+            value = value.replace("\\,", ",").replace("\\;", ";").strip()
+            if field == "FN":
+                name = value
+            elif field == "N":
+                parts = [p for p in value.split(";")[:3] if p]
+                structured = " ".join(reversed(parts[:2])) if parts else ""
+            elif field == "TEL":
+                phones.append(value.replace("tel:", ""))
+            elif field == "EMAIL":
+                emails.append(value)
+            elif field == "NICKNAME":
+                nicknames.extend(value.split(","))
+        name = name or structured
+        if name:
+            contacts.append(Contact(name, phones, emails, nicknames, source))
+    return contacts
+
+def parse_csv(text: str, source: str) -> List[Contact]:
+    """Google/Outlook exports or any CSV with name, phone and email columns"""
+    reader = csv.DictReader(io.StringIO(text))
+    contacts = []
+    for row in reader:
+        fields = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+        name = fields.get("name") or fields.get("display name") or fields.get("full name") or " ".join(
+            filter(None, (fields.get("first name") or fields.get("given name"),
+                          fields.get("last name") or fields.get("family name"))))
+        phones = [value for key, value in fields.items() if value and ("phone" in key or "mobile" in key) and "type" not in key]
+        emails = [value for key, value in fields.items() if value and ("mail" in key) and "type" not in key]
+        nicknames = [fields[key] for key in ("nickname", "alias") if fields.get(key)]
+        # Google packs several values into one cell separated by " ::: "
+        phones = [p for value in phones for p in value.split(":::")]
+        emails = [e for value in emails for e in value.split(":::")]
+        if name:
+            contacts.append(Contact(name, phones, emails, nicknames, source))
+    return contacts
+
+MACOS_EXPORT_SCRIPT = '''
+set output to ""
+tell application "Contacts"
+    repeat with aPerson in every person
+        set personName to name of aPerson
+        set phoneList to value of every phone of aPerson
+        set emailList to value of every email of aPerson
+        set nick to nickname of aPerson
+        if nick is missing value then set nick to ""
+        set AppleScript's text item delimiters to ","
+        set output to output & personName & tab & (phoneList as text) & tab & (emailList as text) & tab & nick & linefeed
+        set AppleScript's text item delimiters to ""
+    end repeat
+end tell
+return output
+'''
+
+def parse_macos_export(text: str) -> List[Contact]:
+    contacts = []
+    for line in text.splitlines():
+        parts = line.split("\t")
+        if len(parts) >= 3 and parts[0].strip():
+            nick = parts[3] if len(parts) > 3 else ""
+            contacts.append(Contact(parts[0], parts[1].split(","), parts[2].split(","), [nick], MACOS_SOURCE))
+    return contacts
+
+class ContactDirectory:
+    def __init__(self, index_path: str = INDEX_PATH):
+        self.index_path = index_path
+        self.lock = threading.RLock()
+        self.contacts: List[Contact] = []
+        self.sources: Dict[str, float] = {}  # source -> mtime (or import time) it was loaded at
+        self.names = PrefixTrie()
+        self.sounds = PrefixTrie()
+        self.load_index()
+
+    # --- index -------------------------------------------------------------------------------
+
+    def load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.sources = data.get("sources", {})
+            self.rebuild([Contact.from_dict(c) for c in data.get("contacts", [])])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Contact index unreadable, rebuilding: {e}")
+
+    def save_index(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp = f"{self.index_path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources, "contacts": [c.to_dict() for c in self.contacts]}, f, ensure_ascii=False)
+        os.replace(temp, self.index_path)
+
+    def rebuild(self, contacts: List[Contact]):
+        names, sounds = PrefixTrie(), PrefixTrie()
+        for contact_id, contact in enumerate(contacts):
+            for label in [contact.name] + contact.nicknames:
+                words = normalize(label).split()
+                keys = set(words)
+                if len(words) > 1:
+                    keys.add("".join(words))
+                for key in keys:
+                    names.insert(key, contact_id)
+                    sounds.insert(phonetic(key), contact_id)
+        with self.lock:
+            self.contacts, self.names, self.sounds = contacts, names, sounds
+
+    def replace_source(self, source: str, contacts: List[Contact], stamp: float):
+        with self.lock:
+            kept = [c for c in self.contacts if c.source != source]
+            self.sources[source] = stamp
+            self.rebuild(kept + contacts)
+            self.save_index()
+        logging.info(f"Imported {len(contacts)} contacts from {source}")
+
+    # --- importing ---------------------------------------------------------------------------
+
+    def source_files(self) -> List[str]:
+        files = list(EXTRA_FILES)
+        try:
+            files += [os.path.join(CONTACTS_DIR, name) for name in sorted(os.listdir(CONTACTS_DIR))
+                      if name.lower().endswith((".vcf", ".csv"))]
+        except FileNotFoundError:
+            pass
+        return [os.path.expanduser(path) for path in files]
+
+    def import_file(self, path: str) -> int:
+        with open(path, encoding="utf-8-sig", errors="replace") as f:
+            text = f.read()
+        contacts = parse_vcard(text, path) if path.lower().endswith(".vcf") else parse_csv(text, path)
+        self.replace_source(path, contacts, os.path.getmtime(path))
+        return len(contacts)
+
+    def refresh_files(self):
+        """Re-import vCard/CSV sources that changed; drop sources that disappeared"""
+        files = self.source_files()
+        for path in files:
+            try:
+                if self.sources.get(path) != os.path.getmtime(path):
+                    self.import_file(path)
+            except OSError as e:
+                logging.warning(f"Could not import contacts from {path}: {e}")
+        gone = [s for s in self.sources if s != MACOS_SOURCE and s not in files]
+        if gone:
+            with self.lock:
+                for source in gone:
+                    self.sources.pop(source, None)
+                self.rebuild([c for c in self.contacts if c.source not in gone])
+                self.save_index()
+
+    def import_macos(self, force: bool = False) -> int:
+        """Read every person from the Contacts app (can take seconds; run off the event loop)"""
+        if not force and time.time() - self.sources.get(MACOS_SOURCE, 0) < MACOS_REFRESH_SECONDS:
+            return 0
+        result = subprocess.run(['osascript', '-e', MACOS_EXPORT_SCRIPT], capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            logging.warning(f"Could not read the Contacts app: {result.stderr.strip()}")
+            return 0
+        contacts = parse_macos_export(result.stdout)
+        self.replace_source(MACOS_SOURCE, contacts, time.time())
+        return len(contacts)
+
+    # --- lookup ------------------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[Contact, float]]:
+        """Best matches for a spoken or typed name, highest score first"""
+        words = normalize(query).split()
+        if not words:
+            return []
+        with self.lock:
+            contacts, names, sounds = self.contacts, self.names, self.sounds
+        scores: Dict[int, float] = {}
+        joined = "".join(words)
+        for contact_id in names.exact(joined):
+            scores[contact_id] = 1.0
+        # Every query word must match some word of the contact; the weakest match decides
+        per_word = []
+        for word in words:
+            matches = {}
+            for contact_id in names.exact(word):
+                matches[contact_id] = 0.95
+            for contact_id in names.prefix(word):
+                matches.setdefault(contact_id, PREFIX_SCORE if len(word) >= 3 else 0.6)
+            key = phonetic(word)
+            for contact_id in sounds.exact(key):
+                matches[contact_id] = max(matches.get(contact_id, 0), 0.8)
+            if len(key) >= 3:
+                for contact_id in sounds.prefix(key):
+                    matches[contact_id] = max(matches.get(contact_id, 0), 0.7)
+            # Typos: only when nothing matched as written or by sound (it is the slowest step)
+            if not matches and len(word) >= 4:
+                for contact_id, distance in names.fuzzy(word, 1 if len(word) < 7 else 2).items():
+                    matches[contact_id] = max(matches.get(contact_id, 0), 0.7 - 0.1 * distance)
+            per_word.append(matches)
+        common = set.intersection(*(set(m) for m in per_word)) if per_word else set()
+        for contact_id in common:
+            score = min(m[contact_id] for m in per_word)
+            scores[contact_id] = max(scores.get(contact_id, 0), score)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], contacts[item[0]].name))
+        return [(contacts[contact_id], round(score, 2)) for contact_id, score in ranked[:limit]]
+
+    def lookup(self, query: str, need: str = "phone") -> Tuple[Optional[Contact], List[Contact]]:
+        """
+        (the contact the query clearly means, else None; the contacts it may mean, best first),
+        among contacts that have a `need` ('phone' or 'email')
+        """
+        def reachable(contact: Contact) -> bool:
+            return bool(contact.phones if need == "phone" else contact.emails)
+        # Decided over every contact the name matches: "Ravi" is not Ravindra just because Ravi has no email
+        matches = self.search(query, limit=5)
+        if not matches:
+            return None, []
+        best, score = matches[0]
+        only = len(matches) == 1 and score >= PREFIX_SCORE
+        clear = score >= CONFIDENT_SCORE and (len(matches) == 1 or score - matches[1][1] >= CONFIDENT_MARGIN)
+        if only or clear:
+            return (best, [best]) if reachable(best) else (None, [])
+        return None, [contact for contact, _ in matches if reachable(contact)]
+
+    def resolve(self, query: str, need: str = "phone") -> Optional[Contact]:
+        return self.lookup(query, need)[0]
+
+    def __len__(self):
+        return len(self.contacts)
+
+directory = None
+directory_lock = threading.Lock()
+
+def get_directory() -> ContactDirectory:
+    """Process-wide directory; vCard/CSV sources are checked for changes on first use"""
+    global directory
+    with directory_lock:
+        if directory is None:
+            directory = ContactDirectory()
+            directory.refresh_files()
+        return directory
+
+def refresh_contacts():
+    """Startup refresh: changed files, and the macOS Contacts app when due"""
+    contacts = get_directory()
+    if is_mac() and os.getenv("FRIDAY_CONTACTS_MACOS", "1") != "0":
+        try:
+            contacts.import_macos()
+        except (OSError, subprocess.SubprocessError) as e:
+            logging.warning(f"Contacts app import failed: {e}")
+
+def lookup_contact(name: str, need: str = "phone") -> Tuple[Optional[Contact], List[Contact]]:
+    try:
+        return get_directory().lookup(name, need)
+    except Exception as e:
+        logging.warning(f"Contact lookup failed for {name}: {e}")
+        return None, []
+
+def resolve_contact(name: str, need: str = "phone") -> Optional[Contact]:
+    return lookup_contact(name, need)[0]
+
+def phone_for(name: str) -> Tuple[Optional[str], Optional[Contact], List[Contact]]:
+    """
+    (number to dial, contact, candidates) for a spoken name, or for a number
+    said directly. With no number, candidates are the contacts the name may
+    mean, for the user to choose from.
+    """
+    if PHONE_PATTERN.match(name.strip()):
+        return normalize_phone(name), None, []
+    contact, candidates = lookup_contact(name, "phone")
+    return (contact.phones[0], contact, candidates) if contact else (None, None, candidates)
+
+def which_contact(name: str, candidates: List[Contact]) -> str:
+    """Reply asking the user to pick one of several contacts"""
+    options = "; ".join(contact.describe() for contact in candidates)
+    return (f"❓ '{name}' could be: {options}. Ask the user which one they mean, "
+            f"then try again with the full name or number.")
@@ -0,0 +1,401 @@
+import logging
+import os
+import shutil
+import json
+import sys
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+# Files at or above this size are copied with copy_file_range/sendfile
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+ZERO_COPY_CHUNK = 64 * 1024 * 1024
+COPY_WORKERS = min(16, (os.cpu_count() or 2) * 2)
+
+# Journals let an interrupted batch pick up where it stopped. A journal is only
+# resumed while every source is unchanged and it is younger than this.
+JOURNAL_DIR = os.path.expanduser("~/.friday/copy_journals")
+JOURNAL_MAX_AGE = float(os.getenv("FRIDAY_COPY_JOURNAL_DAYS", "7")) * 86400
+
+# shutil.copyfile already copies in the kernel on macOS (fcopyfile); elsewhere large files use zero_copy
+USE_ZERO_COPY = sys.platform != "darwin"
+
+class CopyTask:
+    """A single file copy (or a whole-tree rename for same-filesystem moves)"""
+
+    def __init__(self, source: str, destination: str, size: int = 0, rename: bool = False, stamp: list = None):
+        self.source = source
+        self.destination = destination
+        self.size = size
+        self.rename = rename
+        # [size, mtime_ns] of the source when planned, to tell whether it changed since
+        self.stamp = stamp if stamp is not None else file_stamp(source)
+
+def file_stamp(path: str) -> Optional[list]:
+    """[size, mtime_ns] without following symlinks, or None when path is gone"""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return None
+    return [info.st_size, info.st_mtime_ns]
+
+class CopyPlan:
+    """Everything a copy/move will touch, computed before any data is written"""
+
+    def __init__(self, operation: str, pairs: List[Tuple[str, str]]):
+        self.operation = operation
+        self.pairs = pairs
+        self.directories = []
+        self.tasks = []
+        self.total_bytes = 0
+
+    @property
+    def plan_id(self) -> str:
+        key = json.dumps([self.operation, self.pairs])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+    def summary(self) -> str:
+        renames = sum(1 for task in self.tasks if task.rename)
+        files = len(self.tasks) - renames
+        text = f"{files} files, {format_bytes(self.total_bytes)}"
+        if renames:
+            text += f", {renames} renames"
+        return text
+
+class CopyResult:
+    """Outcome of executing a CopyPlan"""
+
+    def __init__(self):
+        self.files_done = 0
+        self.bytes_done = 0
+        self.skipped = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        rate = self.bytes_done / self.seconds if self.seconds > 0 else 0
+        text = f"{self.files_done} items, {format_bytes(self.bytes_done)} in {self.seconds:.2f}s ({format_bytes(rate)}/s)"
+        if self.skipped:
+            text += f", {self.skipped} already done (resumed)"
+        if self.errors:
+            text += f", {len(self.errors)} errors"
+        return text
+
+def format_bytes(size: float) -> str:
+    """Human readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+def existing_parent(path: str) -> str:
+    """Closest existing ancestor of path (used to compare filesystems)"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+def same_filesystem(source: str, destination: str) -> bool:
+    try:
+        return os.stat(source).st_dev == os.stat(existing_parent(destination)).st_dev
+    except OSError:
+        return False
+
+def plan_transfer(pairs: List[Tuple[str, str]], operation: str = "copy") -> CopyPlan:
+    """
+    Walk every source once and build the list of directories and file copies.
+    Moves within one filesystem become a single rename per source.
+    """
+    plan = CopyPlan(operation, [(os.path.abspath(s), os.path.abspath(d)) for s, d in pairs])
+    known_directories = set()
+
+    for source, destination in plan.pairs:
+        if operation == "move" and same_filesystem(source, destination):
+            plan.tasks.append(CopyTask(source, destination, rename=True))
+            continue
+
+        if not os.path.isdir(source):
+            size = os.path.getsize(source)
+            parent = os.path.dirname(destination)
+            if parent not in known_directories:
+                known_directories.add(parent)
+                plan.directories.append(parent)
+            plan.tasks.append(CopyTask(source, destination, size))
+            plan.total_bytes += size
+            continue
+
+        # Iterative scandir walk: one stat per entry, no recursion limit
+        plan.directories.append(destination)
+        stack = [(source, destination)]
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            with os.scandir(src_dir) as entries:
+                for entry in entries:
+                    dst_path = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        plan.directories.append(dst_path)
+                        stack.append((entry.path, dst_path))
+                    else:
+                        info = entry.stat(follow_symlinks=False)
+                        plan.tasks.append(CopyTask(entry.path, dst_path, info.st_size,
+                                                   stamp=[info.st_size, info.st_mtime_ns]))
+                        plan.total_bytes += info.st_size
+
+    return plan
+
+def zero_copy(source: str, destination: str, size: int):
+    """Copy file data in the kernel where the platform allows it"""
+    with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        copied = 0
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                while copied < size:
+                    sent = os.copy_file_range(in_fd, out_fd, min(ZERO_COPY_CHUNK, size - copied))
+                    if sent == 0:
+                        break
+                    copied += sent
+                return
+            except OSError:
+                pass  # e.g. cross-device on older kernels, fall through
+
+        if hasattr(os, "sendfile"):
+            # Linux sendfile accepts a regular file as the destination
+            try:
+                while copied < size:
+                    sent = os.sendfile(out_fd, in_fd, copied, min(ZERO_COPY_CHUNK, size - copied))
+                    if sent == 0:
+                        break
+                    copied += sent
+                return
+            except OSError:
+                pass
+
+        # Buffered loop for whatever the kernel did not copy
+        fsrc.seek(copied)
+        fdst.seek(copied)
+        shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+
+def copy_one(task: CopyTask):
+    if task.rename:
+        os.makedirs(os.path.dirname(task.destination) or ".", exist_ok=True)
+        os.rename(task.source, task.destination)
+        return
+
+    if os.path.islink(task.source):
+        if os.path.lexists(task.destination):
+            os.remove(task.destination)
+        os.symlink(os.readlink(task.source), task.destination)
+        return
+
+    if task.size >= LARGE_FILE_THRESHOLD and USE_ZERO_COPY:
+        zero_copy(task.source, task.destination, task.size)
+    else:
+        shutil.copyfile(task.source, task.destination)
+    shutil.copystat(task.source, task.destination)
+
+def journal_path(plan_id: str) -> str:
+    return os.path.join(JOURNAL_DIR, f"{plan_id}.journal")
+
+class CopyJournal:
+    """
+    Append-only journal: the first line is the serialized plan (with each
+    source's size and mtime), every following line is the index of a finished
+    task and the [size, mtime_ns] its destination had then. A finished task
+    only counts as done while its destination still looks like that.
+    """
+
+    def __init__(self, plan: CopyPlan):
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        self.path = journal_path(plan.plan_id)
+        self.lock = threading.Lock()
+        self.done = set()
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                next(f, None)
+                for line in f:
+                    try:
+                        index, size, mtime_ns = (int(field) for field in line.split())
+                    except ValueError:
+                        continue  # a line cut short by the interruption
+                    if 0 <= index < len(plan.tasks) and destination_matches(plan.tasks[index], [size, mtime_ns]):
+                        self.done.add(index)
+
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if self.file.tell() == 0:
+            self.file.write(json.dumps({
+                "operation": plan.operation,
+                "pairs": plan.pairs,
+                "directories": plan.directories,
+                "tasks": [[t.source, t.destination, t.size, t.rename, t.stamp] for t in plan.tasks],
+            }) + "\n")
+            self.file.flush()
+
+    def mark_done(self, task: CopyTask, index: int):
+        stamp = file_stamp(task.destination) or [-1, -1]
+        with self.lock:
+            self.file.write(f"{index} {stamp[0]} {stamp[1]}\n")
+            self.file.flush()
+
+    def close(self, finished: bool):
+        self.file.close()
+        if finished:
+            os.remove(self.path)
+
+def destination_matches(task: CopyTask, stamp: list) -> bool:
+    if task.rename:
+        return os.path.lexists(task.destination)
+    return file_stamp(task.destination) == stamp
+
+def source_unchanged(task: CopyTask) -> bool:
+    if task.rename:
+        # Done renames have no source left; pending ones must still have it
+        return os.path.lexists(task.source) or os.path.lexists(task.destination)
+    return task.stamp is not None and file_stamp(task.source) == task.stamp
+
+def drop_journal(path: str, reason: str):
+    logging.info(f"Discarding copy journal {os.path.basename(path)}: {reason}")
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def prune_journals():
+    """Remove journals older than JOURNAL_MAX_AGE"""
+    try:
+        names = os.listdir(JOURNAL_DIR)
+    except FileNotFoundError:
+        return
+    now = time.time()
+    for name in names:
+        path = os.path.join(JOURNAL_DIR, name)
+        try:
+            if name.endswith(".journal") and now - os.path.getmtime(path) > JOURNAL_MAX_AGE:
+                drop_journal(path, "too old")
+        except OSError:
+            pass
+
+def load_journaled_plan(plan_id: str) -> Optional[CopyPlan]:
+    """
+    Rebuild the plan of an interrupted run, or None if there is none, or if
+    it is too old or any of its sources changed since (the journal is dropped)
+    """
+    prune_journals()
+    path = journal_path(plan_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.loads(f.readline())
+        plan = CopyPlan(data["operation"], [tuple(pair) for pair in data["pairs"]])
+        plan.directories = data["directories"]
+        plan.tasks = [CopyTask(src, dst, size, rename, stamp) for src, dst, size, rename, stamp in data["tasks"]]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        drop_journal(path, f"unreadable ({e})")
+        return None
+
+    if not all(source_unchanged(task) for task in plan.tasks):
+        drop_journal(path, "sources changed since it was written")
+        return None
+    plan.total_bytes = sum(task.size for task in plan.tasks)
+    return plan
+
+def has_pending_journal(pairs: List[Tuple[str, str]], operation: str = "copy") -> bool:
+    """True if an earlier run of exactly this operation was interrupted and can still be resumed"""
+    plan = CopyPlan(operation, [(os.path.abspath(s), os.path.abspath(d)) for s, d in pairs])
+    return load_journaled_plan(plan.plan_id) is not None
+
+def log_progress(done_bytes: int, total_bytes: int, done_files: int, total_files: int):
+    percent = (done_bytes / total_bytes * 100) if total_bytes else 100.0
+    logging.info(f"Transfer progress: {done_files}/{total_files} files, "
+                 f"{format_bytes(done_bytes)}/{format_bytes(total_bytes)} ({percent:.0f}%)")
+
+def execute_plan(
+    plan: CopyPlan,
+    progress: Optional[Callable[[int, int, int, int], None]] = log_progress,
+    workers: int = COPY_WORKERS
+) -> CopyResult:
+    """
+    Run a plan: create directories, then copy files concurrently.
+    Finished tasks are journaled so re-running the same plan resumes it; the
+    journal is removed once the plan has run without errors.
+    """
+    result = CopyResult()
+    journal = CopyJournal(plan)
+    started = time.perf_counter()
+    lock = threading.Lock()
+    last_report = [0.0]
+    total_files = len(plan.tasks)
+
+    for directory in plan.directories:
+        os.makedirs(directory, exist_ok=True)
+
+    def finished(task: CopyTask, index: int):
+        journal.mark_done(task, index)
+        with lock:
+            result.files_done += 1
+            result.bytes_done += task.size
+            now = time.perf_counter()
+            if progress and (now - last_report[0] > 1.0 or result.files_done == total_files):
+                last_report[0] = now
+                progress(result.bytes_done, plan.total_bytes, result.files_done, total_files)
+
+    pending = []
+    for index, task in enumerate(plan.tasks):
+        if index in journal.done:
+            result.skipped += 1
+            continue
+        if task.rename:
+            # Renames are metadata-only, no need for the pool
+            try:
+                copy_one(task)
+                finished(task, index)
+            except OSError as e:
+                result.errors.append(f"{task.source}: {e}")
+        else:
+            pending.append((index, task))
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(copy_one, task): (index, task) for index, task in pending}
+            for future in as_completed(futures):
+                index, task = futures[future]
+                try:
+                    future.result()
+                    finished(task, index)
+                except Exception as e:
+                    logging.error(f"Error copying {task.source}: {e}")
+                    result.errors.append(f"{task.source}: {e}")
+
+    # Moves across filesystems delete the sources only after every copy succeeded
+    if plan.operation == "move" and not result.errors:
+        for source, _ in plan.pairs:
+            if not os.path.exists(source):
+                continue
+            if os.path.isdir(source) and not os.path.islink(source):
+                shutil.rmtree(source)
+            else:
+                os.remove(source)
+
+    result.seconds = time.perf_counter() - started
+    journal.close(finished=not result.errors)
+    return result
+
+def transfer(pairs: List[Tuple[str, str]], operation: str = "copy") -> CopyResult:
+    """Plan and execute a copy or move, resuming an interrupted run of the same pairs"""
+    plan_id = CopyPlan(operation, [(os.path.abspath(s), os.path.abspath(d)) for s, d in pairs]).plan_id
+    plan = load_journaled_plan(plan_id)
+    if plan:
+        logging.info(f"Resuming interrupted {operation}: {plan.summary()}")
+    else:
+        plan = plan_transfer(pairs, operation)
+        logging.info(f"Planned {operation}: {plan.summary()}")
+    return execute_plan(plan)
@@ -0,0 +1,152 @@
+"""
+Volume and brightness go through one controller per device, so a burst of
+requests ("louder, louder, louder") becomes one absolute change instead of a
+process per step.
+
+Each controller keeps the current level in memory and collects requests for
+FRIDAY_DEVICE_COALESCE_MS (default 50). Relative steps add up on top of the
+pending target, and an absolute level replaces it. Only the final value is
+applied, and applies are at least FRIDAY_DEVICE_MIN_INTERVAL_MS (default 100)
+apart. Every request in the burst gets the level that was actually set. The
+level is read back from the system when it is older than
+FRIDAY_DEVICE_STALE_SECONDS (default 5), because keyboard keys change it too.
+
+Levels are read and written through the platform's system backend
+(system_backend.py). set_device_backend(FakeDeviceBackend()) swaps the system
+for an in-memory one.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List, Optional
+
+from .system_backend import get_system_backend
+
+COALESCE_SECONDS = float(os.getenv("FRIDAY_DEVICE_COALESCE_MS", "50")) / 1000
+MIN_INTERVAL_SECONDS = float(os.getenv("FRIDAY_DEVICE_MIN_INTERVAL_MS", "100")) / 1000
+STALE_SECONDS = float(os.getenv("FRIDAY_DEVICE_STALE_SECONDS", "5"))
+# Level assumed when the system will not report one
+UNKNOWN_LEVEL = 50
+
+class FakeDeviceBackend:
+    """In memory, for tests and benchmarks; writes records every level applied"""
+
+    def __init__(self, volume: int = 50, brightness: int = 50, latency: float = 0.0):
+        self.levels = {"volume": volume, "brightness": brightness}
+        self.latency = latency
+        self.writes: List[tuple] = []
+
+    def get_volume(self) -> int:
+        return self.levels["volume"]
+
+    def set_volume(self, level: int):
+        self.write("volume", level)
+
+    def get_brightness(self) -> int:
+        return self.levels["brightness"]
+
+    def set_brightness(self, level: int):
+        self.write("brightness", level)
+
+    def write(self, device: str, level: int):
+        time.sleep(self.latency)
+        self.levels[device] = level
+        self.writes.append((device, level))
+
+class LevelController:
+    """Serializes and coalesces changes to one 0-100 level"""
+
+    def __init__(self, name: str, read: Callable[[], int], write: Callable[[int], None]):
+        self.name = name
+        self.read = read
+        self.write = write
+        self.level: Optional[int] = None
+        self.synced = 0.0  # monotonic time the level was last read or written
+        self.target: Optional[int] = None
+        self.waiters: List[asyncio.Future] = []
+        self.flusher: Optional[asyncio.Task] = None
+        self.last_applied = 0.0
+        self.requests = 0
+        self.applies = 0
+
+    async def current(self) -> int:
+        if self.level is None or time.monotonic() - self.synced > STALE_SECONDS:
+            try:
+                self.level = max(0, min(100, int(await asyncio.to_thread(self.read))))
+            except Exception as e:
+                logging.warning(f"Could not read {self.name} level: {e}")
+                if self.level is None:
+                    self.level = UNKNOWN_LEVEL
+            self.synced = time.monotonic()
+        return self.level
+
+    async def adjust(self, delta: int) -> int:
+        """Change by delta on top of any change still pending; returns the level set"""
+        if self.target is None:
+            await self.current()
+        base = self.target if self.target is not None else self.level
+        return await self.request(base + delta)
+
+    async def set(self, level: int) -> int:
+        return await self.request(level)
+
+    async def request(self, level: int) -> int:
+        self.requests += 1
+        self.target = max(0, min(100, int(level)))
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        if self.flusher is None or self.flusher.done():
+            self.flusher = asyncio.create_task(self.flush())
+        return await waiter
+
+    async def flush(self):
+        while self.waiters:
+            await asyncio.sleep(COALESCE_SECONDS)
+            wait = MIN_INTERVAL_SECONDS - (time.monotonic() - self.last_applied)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            value, waiters = self.target, self.waiters
+            self.waiters = []
+            try:
+                if value != self.level or time.monotonic() - self.synced > STALE_SECONDS:
+                    await asyncio.to_thread(self.write, value)
+                    self.applies += 1
+                    self.last_applied = time.monotonic()
+                self.level, self.synced = value, time.monotonic()
+            except Exception as e:
+                logging.error(f"Setting {self.name} to {value} failed: {e}")
+                self.level = None
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(value)
+            if not self.waiters:
+                self.target = None
+
+class DeviceControl:
+    def __init__(self, backend=None):
+        self.backend = backend or get_system_backend()
+        self.volume = LevelController("volume", self.backend.get_volume, self.backend.set_volume)
+        self.brightness = LevelController("brightness", self.backend.get_brightness, self.backend.set_brightness)
+
+    def log_summary(self):
+        for controller in (self.volume, self.brightness):
+            if controller.requests:
+                logging.info(f"{controller.name}: {controller.requests} requests applied in {controller.applies} changes")
+
+_device_control: Optional[DeviceControl] = None
+
+def get_device_control() -> DeviceControl:
+    global _device_control
+    if _device_control is None:
+        _device_control = DeviceControl()
+    return _device_control
+
+def set_device_backend(backend):
+    global _device_control
+    _device_control = DeviceControl(backend)
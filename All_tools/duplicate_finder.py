@@ -0,0 +1,196 @@
+import logging
+import os
+import sqlite3
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .file_catalog import CATALOG_PATH
+
+# Prefer the fastest hash that is installed
+try:
+    import blake3
+
+    def new_hasher():
+        return blake3.blake3()
+    HASH_NAME = "blake3"
+except ImportError:
+    try:
+        import xxhash
+
+        def new_hasher():
+            return xxhash.xxh3_128()
+        HASH_NAME = "xxh3_128"
+    except ImportError:
+        def new_hasher():
+            return hashlib.blake2b(digest_size=20)
+        HASH_NAME = "blake2b"
+
+EDGE_BYTES = 64 * 1024
+READ_SIZE = 1024 * 1024
+HASH_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+class DuplicateGroup:
+    """Files with identical content"""
+
+    def __init__(self, digest: str, size: int, paths: List[str]):
+        self.digest = digest
+        self.size = size
+        self.paths = sorted(paths)
+
+    @property
+    def reclaimable(self) -> int:
+        return self.size * (len(self.paths) - 1)
+
+class HashCache:
+    """Persistent partial/full hashes keyed by device, inode, size and mtime"""
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with sqlite3.connect(path, timeout=10) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS hash_cache ("
+                " dev INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, algorithm TEXT,"
+                " partial TEXT, full TEXT, PRIMARY KEY (dev, inode))"
+            )
+        self.entries = {}
+
+    def load(self, keys: Iterable[Tuple[int, int, int, int]]):
+        keys = list(keys)
+        with sqlite3.connect(self.path, timeout=10) as db:
+            for dev, inode, size, mtime_ns in keys:
+                row = db.execute(
+                    "SELECT partial, full FROM hash_cache WHERE dev = ? AND inode = ? AND size = ? "
+                    "AND mtime_ns = ? AND algorithm = ?",
+                    (dev, inode, size, mtime_ns, HASH_NAME)
+                ).fetchone()
+                if row:
+                    self.entries[(dev, inode, size, mtime_ns)] = [row[0], row[1]]
+
+    def get(self, key) -> List[Optional[str]]:
+        return self.entries.setdefault(key, [None, None])
+
+    def save(self):
+        with sqlite3.connect(self.path, timeout=10) as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO hash_cache (dev, inode, size, mtime_ns, algorithm, partial, full) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*key, HASH_NAME, partial, full) for key, (partial, full) in self.entries.items() if partial]
+            )
+
+def partial_hash(path: str, size: int) -> Optional[str]:
+    """Hash of the first and last 64 KiB (the whole file when it is small)"""
+    hasher = new_hasher()
+    try:
+        with open(path, 'rb') as f:
+            hasher.update(f.read(EDGE_BYTES))
+            if size > 2 * EDGE_BYTES:
+                f.seek(size - EDGE_BYTES)
+                hasher.update(f.read(EDGE_BYTES))
+            elif size > EDGE_BYTES:
+                hasher.update(f.read())
+    except OSError as e:
+        logging.warning(f"Could not read {path}: {e}")
+        return None
+    return hasher.hexdigest()
+
+def full_hash(path: str) -> Optional[str]:
+    hasher = new_hasher()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_SIZE), b''):
+                hasher.update(chunk)
+    except OSError as e:
+        logging.warning(f"Could not read {path}: {e}")
+        return None
+    return hasher.hexdigest()
+
+def scan_folders(folders: List[str], recursive: bool = True, min_size: int = 1) -> List[str]:
+    """Regular files under folders (hidden entries skipped), each inode once"""
+    paths = []
+    seen = set()
+    stack = [os.path.expanduser(folder) for folder in folders]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            logging.warning(f"Skipping unreadable folder {directory}: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    # .app bundles are treated as one item elsewhere, skip their internals
+                    if recursive and not entry.name.endswith('.app'):
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat_info = entry.stat(follow_symlinks=False)
+                    key = (stat_info.st_dev, stat_info.st_ino)
+                    if stat_info.st_size >= min_size and key not in seen:
+                        seen.add(key)
+                        paths.append(entry.path)
+    return paths
+
+def find_duplicates(paths: List[str], workers: int = HASH_WORKERS) -> List[DuplicateGroup]:
+    """
+    Three-stage duplicate detection: group by size, then by a partial hash
+    of the file edges, then by a full hash only where partial hashes collide.
+    """
+    by_size: Dict[int, List[Tuple[str, tuple]]] = {}
+    for path in paths:
+        try:
+            stat_info = os.stat(path)
+        except OSError:
+            continue
+        key = (stat_info.st_dev, stat_info.st_ino, stat_info.st_size, stat_info.st_mtime_ns)
+        by_size.setdefault(stat_info.st_size, []).append((path, key))
+
+    candidates = [item for group in by_size.values() if len(group) > 1 for item in group]
+    if not candidates:
+        return []
+
+    cache = HashCache()
+    cache.load(key for _, key in candidates)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Stage 2: partial hashes
+        missing = [(path, key) for path, key in candidates if cache.get(key)[0] is None]
+        for (path, key), digest in zip(missing, pool.map(lambda item: partial_hash(item[0], item[1][2]), missing)):
+            cache.get(key)[0] = digest
+
+        by_partial: Dict[Tuple[int, str], List[Tuple[str, tuple]]] = {}
+        for path, key in candidates:
+            digest = cache.get(key)[0]
+            if digest:
+                by_partial.setdefault((key[2], digest), []).append((path, key))
+
+        # Stage 3: full hashes, only for files too big to be covered by the partial hash
+        collisions = [group for group in by_partial.values() if len(group) > 1]
+        needs_full = [
+            (path, key) for group in collisions for path, key in group
+            if key[2] > 2 * EDGE_BYTES and cache.get(key)[1] is None
+        ]
+        for (path, key), digest in zip(needs_full, pool.map(lambda item: full_hash(item[0]), needs_full)):
+            cache.get(key)[1] = digest
+
+    cache.save()
+
+    groups: Dict[str, DuplicateGroup] = {}
+    for group in collisions:
+        for path, key in group:
+            partial, full = cache.get(key)
+            digest = partial if key[2] <= 2 * EDGE_BYTES else full
+            if not digest:
+                continue
+            if digest not in groups:
+                groups[digest] = DuplicateGroup(digest, key[2], [])
+            groups[digest].paths.append(path)
+
+    result = [group for group in groups.values() if len(group.paths) > 1]
+    for group in result:
+        group.paths.sort()
+    result.sort(key=lambda group: group.reclaimable, reverse=True)
+    return result
@@ -0,0 +1,217 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+
+CATALOG_PATH = os.path.expanduser("~/.friday/catalog.sqlite3")
+
+# A folder whose mtime has not changed is not rescanned more often than this
+RESCAN_INTERVAL = 60.0
+
+CATEGORY_EXTENSIONS = {
+    "images": {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic'},
+    "documents": {'.pdf', '.doc', '.docx', '.txt', '.rtf', '.pages', '.xlsx', '.xls', '.ppt', '.pptx'},
+    "videos": {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v', '.flv'},
+    "music": {'.mp3', '.m4a', '.wav', '.flac', '.aac', '.ogg'},
+    "apps": {'.dmg', '.pkg', '.app', '.zip', '.rar', '.7z'},
+}
+
+# One lookup per file instead of walking every category set
+EXTENSION_CATEGORY = {
+    ext: category for category, extensions in CATEGORY_EXTENSIONS.items() for ext in extensions
+}
+
+def classify(name: str, is_dir: bool) -> str:
+    if is_dir and not name.lower().endswith('.app'):
+        return "folders"
+    return EXTENSION_CATEGORY.get(os.path.splitext(name.lower())[1], "other")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    inode INTEGER NOT NULL,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS files_by_category ON files (root, category, name);
+CREATE INDEX IF NOT EXISTS files_by_size ON files (root, size);
+CREATE INDEX IF NOT EXISTS files_by_mtime ON files (root, mtime);
+CREATE TABLE IF NOT EXISTS rollups (
+    root TEXT NOT NULL,
+    category TEXT NOT NULL,
+    file_count INTEGER NOT NULL,
+    total_bytes INTEGER NOT NULL,
+    PRIMARY KEY (root, category)
+);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    dir_mtime REAL NOT NULL,
+    scanned_at REAL NOT NULL
+);
+"""
+
+class FileCatalog:
+    """
+    Persistent per-folder catalog of top-level items with rollups by category.
+    refresh() only writes rows for items that were added, changed or removed.
+    """
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.connect() as db:
+            db.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def refresh(self, root: str, force: bool = False) -> Dict[str, int]:
+        """Bring the catalog for root up to date; returns counts of changes"""
+        root = os.path.realpath(os.path.expanduser(root))
+        changes = {"added": 0, "updated": 0, "removed": 0}
+
+        with self.lock, self.connect() as db:
+            dir_mtime = os.stat(root).st_mtime
+            row = db.execute("SELECT dir_mtime, scanned_at FROM roots WHERE root = ?", (root,)).fetchone()
+            if row and not force and row[0] == dir_mtime and time.time() - row[1] < RESCAN_INTERVAL:
+                return changes
+
+            known = {
+                path: (size, mtime, inode, category)
+                for path, size, mtime, inode, category in db.execute(
+                    "SELECT path, size, mtime, inode, category FROM files WHERE root = ?", (root,)
+                )
+            }
+            deltas = {}
+
+            def bump(category: str, count: int, size: int):
+                current = deltas.setdefault(category, [0, 0])
+                current[0] += count
+                current[1] += size
+
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    try:
+                        stat_info = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    size = 0 if is_dir else stat_info.st_size
+                    category = classify(entry.name, is_dir)
+                    previous = known.pop(entry.path, None)
+
+                    if previous == (size, stat_info.st_mtime, stat_info.st_ino, category):
+                        continue
+                    if previous:
+                        bump(previous[3], -1, -previous[0])
+                        changes["updated"] += 1
+                    else:
+                        changes["added"] += 1
+                    bump(category, 1, size)
+                    db.execute(
+                        "INSERT OR REPLACE INTO files (path, root, name, category, size, mtime, inode, content_hash) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+                        (entry.path, root, entry.name, category, size, stat_info.st_mtime, stat_info.st_ino)
+                    )
+
+            for path, (size, _, _, category) in known.items():
+                bump(category, -1, -size)
+                changes["removed"] += 1
+            if known:
+                db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in known])
+
+            for category, (count, size) in deltas.items():
+                db.execute(
+                    "INSERT INTO rollups (root, category, file_count, total_bytes) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (root, category) DO UPDATE SET "
+                    "file_count = file_count + excluded.file_count, total_bytes = total_bytes + excluded.total_bytes",
+                    (root, category, count, size)
+                )
+            db.execute("DELETE FROM rollups WHERE root = ? AND file_count <= 0", (root,))
+            db.execute("INSERT OR REPLACE INTO roots (root, dir_mtime, scanned_at) VALUES (?, ?, ?)",
+                       (root, dir_mtime, time.time()))
+
+        if any(changes.values()):
+            logging.info(f"Catalog refreshed for {root}: {changes}")
+        return changes
+
+    def category_totals(self, root: str) -> List[Tuple[str, int, int]]:
+        """(category, file_count, total_bytes), largest first, straight from the rollups"""
+        root = os.path.realpath(os.path.expanduser(root))
+        with self.connect() as db:
+            return db.execute(
+                "SELECT category, file_count, total_bytes FROM rollups WHERE root = ? ORDER BY total_bytes DESC",
+                (root,)
+            ).fetchall()
+
+    def names_in_category(self, root: str, category: str, limit: int) -> List[str]:
+        root = os.path.realpath(os.path.expanduser(root))
+        with self.connect() as db:
+            return [name for (name,) in db.execute(
+                "SELECT name FROM files WHERE root = ? AND category = ? ORDER BY name LIMIT ?",
+                (root, category, limit)
+            )]
+
+    def largest(self, root: str, limit: int = 10) -> List[Tuple[str, int]]:
+        root = os.path.realpath(os.path.expanduser(root))
+        with self.connect() as db:
+            return db.execute(
+                "SELECT name, size FROM files WHERE root = ? AND category != 'folders' ORDER BY size DESC LIMIT ?",
+                (root, limit)
+            ).fetchall()
+
+    def stale(self, root: str, days: float, limit: int = 20) -> Tuple[List[Tuple[str, int, float]], int, int]:
+        """Items not modified for `days`; returns (oldest items, total count, total bytes)"""
+        root = os.path.realpath(os.path.expanduser(root))
+        cutoff = time.time() - days * 86400
+        with self.connect() as db:
+            count, total = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files WHERE root = ? AND mtime < ?", (root, cutoff)
+            ).fetchone()
+            items = db.execute(
+                "SELECT name, size, mtime FROM files WHERE root = ? AND mtime < ? ORDER BY mtime LIMIT ?",
+                (root, cutoff, limit)
+            ).fetchall()
+        return items, count, total
+
+    def duplicates(self, root: str) -> List[Tuple[str, int, List[str]]]:
+        """
+        Groups of identical files as (hash, size, names). Only files that share
+        a size are hashed; see duplicate_finder for the staged comparison.
+        """
+        from .duplicate_finder import find_duplicates
+
+        root = os.path.realpath(os.path.expanduser(root))
+        with self.connect() as db:
+            candidates = [path for (path,) in db.execute(
+                "SELECT path FROM files WHERE root = ? AND category != 'folders' AND size > 0 AND size IN ("
+                "  SELECT size FROM files WHERE root = ? AND category != 'folders' AND size > 0 "
+                "  GROUP BY size HAVING COUNT(*) > 1)",
+                (root, root)
+            )]
+
+        groups = find_duplicates(candidates)
+        with self.lock, self.connect() as db:
+            db.executemany(
+                "UPDATE files SET content_hash = ? WHERE path = ?",
+                [(group.digest, path) for group in groups for path in group.paths]
+            )
+        return [(group.digest, group.size, [os.path.basename(path) for path in group.paths]) for group in groups]
+
+catalog_instance = None
+
+def get_catalog() -> FileCatalog:
+    """Shared catalog for the agent process"""
+    global catalog_instance
+    if catalog_instance is None:
+        catalog_instance = FileCatalog()
+    return catalog_instance
@@ -1,11 +1,190 @@
+import asyncio
 import logging
 import os
 import shutil
 import subprocess
 from datetime import datetime
-from livekit.agents import function_tool, RunContext
+from collections import OrderedDict
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .copy_engine import transfer, has_pending_journal
 
-@function_tool()
+# Paging limits for read_file_content so large files never reach the LLM in one piece
+DEFAULT_PAGE_BYTES = 64 * 1024
+MAX_PAGE_BYTES = 1024 * 1024
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Line-offset index: one byte offset checkpoint every LINE_INDEX_STRIDE lines
+LINE_INDEX_STRIDE = 1000
+LINE_INDEX_CACHE_SIZE = 32
+line_index_cache = OrderedDict()
+
+class LineIndex:
+    """Sparse map from line numbers to byte offsets for one version of a file"""
+    
+    def __init__(self, mtime_ns: int, size: int, checkpoints: list, total_lines: int):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checkpoints = checkpoints  # checkpoints[i] = offset of line i * stride + 1
+        self.total_lines = total_lines
+    
+    def offset_of_line(self, file_path: str, line_no: int) -> int:
+        """Seek to the nearest checkpoint and skip forward to the start of line_no"""
+        checkpoint, remainder = divmod(line_no - 1, LINE_INDEX_STRIDE)
+        offset = self.checkpoints[checkpoint]
+        if remainder:
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                for _ in range(remainder):
+                    f.readline()
+                offset = f.tell()
+        return offset
+
+def get_line_index(file_path: str, stat_info: os.stat_result) -> LineIndex:
+    """Return the cached line index for file_path, rebuilding it if the file changed"""
+    key = os.path.realpath(file_path)
+    index = line_index_cache.get(key)
+    if index and index.mtime_ns == stat_info.st_mtime_ns and index.size == stat_info.st_size:
+        line_index_cache.move_to_end(key)
+        return index
+    
+    checkpoints = [0]
+    total_lines = 0
+    offset = 0
+    last_byte = b'\n'
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            pos = chunk.find(b'\n')
+            while pos != -1:
+                total_lines += 1
+                if total_lines % LINE_INDEX_STRIDE == 0:
+                    checkpoints.append(offset + pos + 1)
+                pos = chunk.find(b'\n', pos + 1)
+            offset += len(chunk)
+            last_byte = chunk[-1:]
+    
+    # A trailing line without a newline still counts as a line
+    if last_byte != b'\n':
+        total_lines += 1
+    
+    index = LineIndex(stat_info.st_mtime_ns, stat_info.st_size, checkpoints, total_lines)
+    line_index_cache[key] = index
+    if len(line_index_cache) > LINE_INDEX_CACHE_SIZE:
+        line_index_cache.popitem(last=False)
+    return index
+
+def utf8_boundary(data: bytes, end: int) -> int:
+    """Move end back so it does not split a multi-byte UTF-8 character"""
+    while end > 0 and end < len(data) and (data[end] & 0xC0) == 0x80:
+        end -= 1
+    return end
+
+def read_page(file_path: str, offset: int, line_no: int, end_line, max_bytes: int):
+    """
+    Read up to max_bytes starting at offset, stopping after end_line if given.
+    Returns (text, next_offset, next_line, complete).
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(max_bytes + 1)
+    
+    more_data = len(data) > max_bytes
+    data = data[:max_bytes]
+    
+    # Stop at the requested end line
+    if end_line is not None:
+        wanted = end_line - line_no + 1
+        pos = -1
+        for _ in range(max(wanted, 0)):
+            pos = data.find(b'\n', pos + 1)
+            if pos == -1:
+                break
+        if wanted <= 0:
+            data, more_data, pos = b'', False, -1
+        if pos != -1:
+            data = data[:pos + 1]
+            more_data = False
+    
+    # Only cut on a line boundary when the page is full
+    if more_data:
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            cut = utf8_boundary(data, len(data))
+        data = data[:cut]
+    
+    next_line = line_no + data.count(b'\n')
+    return data.decode('utf-8', errors='replace'), offset + len(data), next_line, not more_data
+
+def read_tail_lines(file_path: str, line_count: int, max_bytes: int) -> str:
+    """Read the last line_count lines by scanning backwards from the end of the file"""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        # One extra newline is needed to find the start of the first wanted line
+        while position > 0 and data.count(b'\n') <= line_count and len(data) < max_bytes:
+            step = min(READ_CHUNK_SIZE, position, max_bytes - len(data) + 1)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    
+    body = data[:-1] if data.endswith(b'\n') else data
+    lines = body.split(b'\n')
+    if position > 0 or len(data) >= max_bytes:
+        lines = lines[1:]  # first piece may be a partial line
+    data = b'\n'.join(lines[-line_count:]) if line_count else b''
+    if len(data) > max_bytes:
+        start = len(data) - max_bytes
+        while start < len(data) and (data[start] & 0xC0) == 0x80:
+            start += 1
+        data = data[start:]
+    return data.decode('utf-8', errors='replace')
+
+def make_page_token(offset: int, line_no: int, stat_info: os.stat_result) -> str:
+    """Encode where the next page starts, tied to the current file version"""
+    return f"{offset}:{line_no}:{stat_info.st_mtime_ns}"
+
+def parse_page_token(page_token: str, stat_info: os.stat_result):
+    """Decode a page token, rejecting tokens issued for an older version of the file"""
+    try:
+        offset, line_no, mtime_ns = (int(part) for part in page_token.split(':'))
+    except ValueError:
+        raise ValueError(f"Invalid page_token: {page_token}")
+    if mtime_ns != stat_info.st_mtime_ns:
+        raise ValueError("File changed since page_token was issued. Start reading again without a token.")
+    if offset < 0 or offset > stat_info.st_size:
+        raise ValueError(f"Invalid page_token: {page_token}")
+    return offset, line_no
+
+# Finder handles one trash request at a time, so batches are sent as lists
+TRASH_BATCH_SIZE = 200
+
+def trash_paths(paths: list):
+    """
+    Move many files to the trash with one Finder call per batch.
+    Returns (count_trashed, errors).
+    """
+    trashed = 0
+    errors = []
+    for start in range(0, len(paths), TRASH_BATCH_SIZE):
+        batch = paths[start:start + TRASH_BATCH_SIZE]
+        items = ", ".join(
+            'POSIX file "{}"'.format(path.replace('\\', '\\\\').replace('"', '\\"')) for path in batch
+        )
+        result = subprocess.run(
+            ['osascript', '-e', f'tell application "Finder" to delete {{{items}}}'],
+            capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            trashed += len(batch)
+        else:
+            errors.append(result.stderr.strip() or f"Could not trash {len(batch)} files")
+    return trashed, errors
+
+@metered_tool()
 async def create_file(
     context: RunContext,  # type: ignore
     file_path: str,
@@ -41,7 +220,7 @@ async def create_file(
         logging.error(f"Error creating file: {e}")
         return f"❌ Error creating file: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def delete_file(
     context: RunContext,  # type: ignore
     file_path: str,
@@ -77,20 +256,26 @@ async def delete_file(
         logging.error(f"Error deleting file: {e}")
         return f"❌ Error deleting file: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def read_file_content(
     context: RunContext,  # type: ignore
     file_path: str,
     start_line: int = 1,
-    end_line: int = None
+    end_line: int = None,
+    max_bytes: int = DEFAULT_PAGE_BYTES,
+    page_token: str = "",
+    tail_lines: int = 0
 ) -> str:
     """
-    Read content from a file (optionally specific lines)
+    Read content from a file (optionally specific lines, one page at a time)
     
     Args:
         file_path: Path of file to read
         start_line: Starting line number (1-based)
-        end_line: Ending line number (inclusive), if None reads entire file
+        end_line: Ending line number (inclusive), if None reads until the page is full
+        max_bytes: Maximum bytes returned per call; longer reads return a page_token
+        page_token: Continuation token from a previous call to read the next page
+        tail_lines: If set, return only the last N lines of the file (like `tail -n`)
     """
     try:
         logging.info(f"Reading file: {file_path}")
@@ -102,30 +287,55 @@ async def read_file_content(
         if not os.path.isfile(file_path):
             return f"❌ Path is not a file: {file_path}"
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # If specific lines requested
-        if end_line is not None:
-            if start_line < 1 or start_line > len(lines):
-                return f"❌ Invalid start line: {start_line}. File has {len(lines)} lines."
-            
-            if end_line > len(lines):
-                end_line = len(lines)
-            
-            selected_lines = lines[start_line - 1:end_line]
-            content = ''.join(selected_lines)
-            return f"📄 Lines {start_line}-{end_line} from {file_path}:\n\n{content}"
+        stat_info = os.stat(file_path)
+        file_size = stat_info.st_size
+        max_bytes = max(1, min(max_bytes or DEFAULT_PAGE_BYTES, MAX_PAGE_BYTES))
+        
+        # Tail mode only touches the end of the file
+        if tail_lines and tail_lines > 0:
+            content = read_tail_lines(file_path, tail_lines, max_bytes)
+            return f"📄 Last {tail_lines} lines of {file_path}:\n\n{content}"
+        
+        # Resume from a continuation token, or seek to the requested start line
+        if page_token:
+            try:
+                offset, line_no = parse_page_token(page_token, stat_info)
+            except ValueError as e:
+                return f"❌ {str(e)}"
+        elif start_line > 1:
+            index = get_line_index(file_path, stat_info)
+            if start_line > index.total_lines:
+                return f"❌ Invalid start line: {start_line}. File has {index.total_lines} lines."
+            offset, line_no = index.offset_of_line(file_path, start_line), start_line
+        elif start_line < 1:
+            return f"❌ Invalid start line: {start_line}."
         else:
-            content = ''.join(lines)
-            file_size = os.path.getsize(file_path)
-            return f"📄 File: {file_path}\n📏 Size: {file_size} bytes\n\n{content}"
+            offset, line_no = 0, 1
+        
+        content, next_offset, next_line, complete = read_page(
+            file_path, offset, line_no, end_line, max_bytes
+        )
+        last_line = next_line - 1 if content.endswith('\n') or not content else next_line
+        
+        if end_line is not None or start_line > 1:
+            header = f"📄 Lines {line_no}-{max(line_no, last_line)} from {file_path}:\n\n"
+        else:
+            header = f"📄 File: {file_path}\n📏 Size: {file_size} bytes\n\n"
+        
+        result = header + content
+        if not complete:
+            token = make_page_token(next_offset, next_line, stat_info)
+            result += (
+                f"\n\n⏭️ Showing bytes {offset}-{next_offset} of {file_size}. "
+                f"Call again with page_token=\"{token}\" to continue."
+            )
+        return result
         
     except Exception as e:
         logging.error(f"Error reading file: {e}")
         return f"❌ Error reading file: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def write_file_content(
     context: RunContext,  # type: ignore
     file_path: str,
@@ -158,7 +368,7 @@ async def write_file_content(
         logging.error(f"Error writing to file: {e}")
         return f"❌ Error writing to file: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def create_folder(
     context: RunContext,  # type: ignore
     folder_path: str
@@ -198,7 +408,7 @@ async def create_folder(
         logging.error(f"Error creating folder: {e}")
         return f"❌ Folder बनाने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def list_folder_contents(
     context: RunContext,  # type: ignore
     folder_path: str,
@@ -290,7 +500,7 @@ async def list_folder_contents(
         logging.error(f"Error listing folder contents: {e}")
         return f"❌ Folder contents लिस्ट करने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def copy_file_or_folder(
     context: RunContext,  # type: ignore
     source_path: str,
@@ -313,11 +523,14 @@ async def copy_file_or_folder(
         if not os.path.exists(source_path):
             return f"❌ Source not found: {source_path}"
         
-        if os.path.exists(destination_path) and not overwrite:
+        # An interrupted copy of the same paths is resumed instead of restarted
+        resuming = has_pending_journal([(source_path, destination_path)], "copy")
+        
+        if os.path.exists(destination_path) and not overwrite and not resuming:
             return f"❌ Destination already exists: {destination_path}. Use overwrite=True to replace."
         
         # Remove destination if overwriting
-        if os.path.exists(destination_path) and overwrite:
+        if os.path.exists(destination_path) and overwrite and not resuming:
             if os.path.isdir(destination_path):
                 shutil.rmtree(destination_path)
             else:
@@ -328,19 +541,20 @@ async def copy_file_or_folder(
         if dest_dir:
             os.makedirs(dest_dir, exist_ok=True)
         
-        # Copy file or folder
-        if os.path.isdir(source_path):
-            shutil.copytree(source_path, destination_path)
-            return f"✅ Folder copied: {source_path} → {destination_path}"
-        else:
-            shutil.copy2(source_path, destination_path)
-            return f"✅ File copied: {source_path} → {destination_path}"
+        # Copy file or folder off the event loop
+        is_folder = os.path.isdir(source_path)
+        result = await asyncio.to_thread(transfer, [(source_path, destination_path)], "copy")
+        if result.errors:
+            return f"❌ Copy incomplete ({result.summary()}). Run again to resume:\n" + "\n".join(result.errors[:5])
+        
+        item_type = "Folder" if is_folder else "File"
+        return f"✅ {item_type} copied: {source_path} → {destination_path} ({result.summary()})"
         
     except Exception as e:
         logging.error(f"Error copying: {e}")
         return f"❌ Error copying: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def move_file_or_folder(
     context: RunContext,  # type: ignore
     source_path: str,
@@ -360,14 +574,17 @@ async def move_file_or_folder(
         source_path = os.path.expanduser(source_path)
         destination_path = os.path.expanduser(destination_path)
         
-        if not os.path.exists(source_path):
+        # An interrupted cross-filesystem move of the same paths is resumed
+        resuming = has_pending_journal([(source_path, destination_path)], "move")
+        
+        if not os.path.exists(source_path) and not resuming:
             return f"❌ Source not found: {source_path}"
         
-        if os.path.exists(destination_path) and not overwrite:
+        if os.path.exists(destination_path) and not overwrite and not resuming:
             return f"❌ Destination already exists: {destination_path}. Use overwrite=True to replace."
         
         # Remove destination if overwriting
-        if os.path.exists(destination_path) and overwrite:
+        if os.path.exists(destination_path) and overwrite and not resuming:
             if os.path.isdir(destination_path):
                 shutil.rmtree(destination_path)
             else:
@@ -378,8 +595,10 @@ async def move_file_or_folder(
         if dest_dir:
             os.makedirs(dest_dir, exist_ok=True)
         
-        # Move file or folder
-        shutil.move(source_path, destination_path)
+        # Move file or folder: a rename on the same filesystem, copy + delete otherwise
+        result = await asyncio.to_thread(transfer, [(source_path, destination_path)], "move")
+        if result.errors:
+            return f"❌ Move incomplete ({result.summary()}). Run again to resume:\n" + "\n".join(result.errors[:5])
         
         item_type = "Folder" if os.path.isdir(destination_path) else "File"
         return f"✅ {item_type} moved: {source_path} → {destination_path}"
@@ -1,9 +1,10 @@
 import logging
 import os
 import re
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
 
-@function_tool()
+@metered_tool()
 async def find_and_replace_in_file(
     context: RunContext,  # type: ignore
     file_path: str,
@@ -56,7 +57,7 @@ async def find_and_replace_in_file(
         logging.error(f"Error in find and replace: {e}")
         return f"Error in find and replace: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def search_in_files(
     context: RunContext,  # type: ignore
     folder_path: str,
@@ -0,0 +1,255 @@
+import logging
+import os
+import re
+import time
+from typing import List, Optional
+
+from .copy_engine import format_bytes
+
+# Batches above these limits are only planned until the agent confirms them
+CONFIRM_FILE_COUNT = 200
+CONFIRM_TOTAL_BYTES = 1024 * 1024 * 1024
+
+GLOB_CHARS = set("*?[")
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a glob into a regex over '/'-separated relative paths.
+    '**' spans directories, '*' and '?' stay inside one path segment.
+    """
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+def compile_globs(patterns: List[str]) -> Optional[re.Pattern]:
+    """
+    Compile globs into one regex. Patterns without '/' match the file name
+    at any depth; bare suffixes like ".pdf" keep the old endswith behaviour.
+    """
+    parts = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if not GLOB_CHARS & set(pattern):
+            pattern = "*" + pattern
+        regex = glob_to_regex(pattern.lstrip("/"))
+        if "/" not in pattern:
+            regex = "(?:.*/)?" + regex
+        parts.append(regex)
+    if not parts:
+        return None
+    return re.compile("^(?:" + "|".join(parts) + ")$")
+
+def split_patterns(value: str) -> List[str]:
+    return [part for part in (value or "").split(",") if part.strip()]
+
+class FileSelector:
+    """Compiled selection rules, evaluated once per directory entry"""
+
+    def __init__(
+        self,
+        include: str = "*",
+        regex: str = "",
+        exclude: str = "",
+        min_size: int = 0,
+        max_size: int = 0,
+        older_than_days: float = 0,
+        newer_than_days: float = 0,
+        recursive: bool = False,
+        include_hidden: bool = False
+    ):
+        include_patterns = split_patterns(include)
+        self.include = None if include_patterns in ([], ["*"]) else compile_globs(include_patterns)
+        self.regex = re.compile(regex) if regex else None
+        self.exclude = compile_globs(split_patterns(exclude))
+        self.min_size = min_size
+        self.max_size = max_size
+        now = time.time()
+        self.modified_before = now - older_than_days * 86400 if older_than_days else None
+        self.modified_after = now - newer_than_days * 86400 if newer_than_days else None
+        self.recursive = recursive
+        self.include_hidden = include_hidden
+
+    def skip_directory(self, rel_path: str, name: str) -> bool:
+        if not self.include_hidden and name.startswith("."):
+            return True
+        return bool(self.exclude and self.exclude.match(rel_path))
+
+    def matches_directory(self, rel_path: str, name: str) -> bool:
+        """
+        Whether a non-recursive selection takes this top-level folder whole, as the
+        tool always did. Size and age rules describe files, so with any of them set
+        folders are left out.
+        """
+        if self.min_size or self.max_size or self.modified_before is not None or self.modified_after is not None:
+            return False
+        if self.skip_directory(rel_path, name):
+            return False
+        if self.include and not self.include.match(rel_path):
+            return False
+        return not (self.regex and not self.regex.search(rel_path))
+
+    def matches(self, rel_path: str, name: str, stat_info: os.stat_result) -> bool:
+        if not self.include_hidden and name.startswith("."):
+            return False
+        if self.exclude and self.exclude.match(rel_path):
+            return False
+        if self.include and not self.include.match(rel_path):
+            return False
+        if self.regex and not self.regex.search(rel_path):
+            return False
+        size = stat_info.st_size
+        if self.min_size and size < self.min_size:
+            return False
+        if self.max_size and size > self.max_size:
+            return False
+        if self.modified_before is not None and stat_info.st_mtime > self.modified_before:
+            return False
+        if self.modified_after is not None and stat_info.st_mtime < self.modified_after:
+            return False
+        return True
+
+class SelectedFile:
+    def __init__(self, path: str, rel_path: str, size: int, mtime: float, is_dir: bool = False):
+        self.path = path
+        self.rel_path = rel_path
+        self.size = size  # for a folder, the total size of the files in it
+        self.mtime = mtime
+        self.is_dir = is_dir
+
+def tree_size(path: str) -> int:
+    """Total size of the files under path"""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+def select_files(root: str, selector: FileSelector) -> List[SelectedFile]:
+    """
+    Single scandir pass over root, pruning excluded directories as it goes.
+    Recursive selections pick files at any depth; otherwise matching files and
+    folders directly in root are picked, folders as a whole.
+    """
+    selected = []
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            logging.warning(f"Skipping unreadable folder {directory}: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if selector.recursive:
+                        if not selector.skip_directory(rel_path, entry.name):
+                            stack.append((entry.path, rel_path + "/"))
+                    elif selector.matches_directory(rel_path, entry.name):
+                        try:
+                            mtime = entry.stat(follow_symlinks=False).st_mtime
+                        except OSError:
+                            continue
+                        selected.append(SelectedFile(entry.path, rel_path, tree_size(entry.path), mtime, is_dir=True))
+                    continue
+                try:
+                    stat_info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if selector.matches(rel_path, entry.name, stat_info):
+                    selected.append(SelectedFile(entry.path, rel_path, stat_info.st_size, stat_info.st_mtime))
+    selected.sort(key=lambda item: item.rel_path)
+    return selected
+
+def prune_empty_directories(root: str, moved: List[SelectedFile]):
+    """After a move: remove the folders under root that the moved files left empty, deepest first"""
+    directories = set()
+    for item in moved:
+        parts = item.rel_path.split("/")[:-1]
+        for depth in range(1, len(parts) + 1):
+            directories.add("/".join(parts[:depth]))
+    for rel_dir in sorted(directories, key=lambda rel: rel.count("/"), reverse=True):
+        try:
+            os.rmdir(os.path.join(root, *rel_dir.split("/")))
+        except OSError:
+            pass  # still holds files that were not selected (or is gone already)
+
+class ExecutionPlan:
+    """What a batch operation will do, summarised before anything runs"""
+
+    def __init__(self, operation: str, source: str, destination: str, files: List[SelectedFile]):
+        self.operation = operation
+        self.source = source
+        self.destination = destination
+        self.files = []
+        self.conflicts = []
+        self.total_bytes = 0
+
+        for item in files:
+            if destination and os.path.lexists(self.target_for(item)):
+                self.conflicts.append(item)
+            else:
+                self.files.append(item)
+                self.total_bytes += item.size
+
+    def target_for(self, item: SelectedFile) -> str:
+        return os.path.join(self.destination, *item.rel_path.split("/"))
+
+    def pairs(self):
+        return [(item.path, self.target_for(item)) for item in self.files]
+
+    @property
+    def needs_confirmation(self) -> bool:
+        return len(self.files) > CONFIRM_FILE_COUNT or self.total_bytes > CONFIRM_TOTAL_BYTES
+
+    def summary(self, preview: int = 10) -> str:
+        noun = "items" if any(item.is_dir for item in self.files) else "files"
+        lines = [
+            f"📋 Plan: {self.operation} {len(self.files)} {noun} ({format_bytes(self.total_bytes)}) from {self.source}"
+            + (f" → {self.destination}" if self.destination else "")
+        ]
+        if self.conflicts:
+            lines.append(f"⏭️ {len(self.conflicts)} files skipped because the destination already exists")
+        for item in self.files[:preview]:
+            lines.append(f"  {'📁' if item.is_dir else '📄'} {item.rel_path} ({format_bytes(item.size)})")
+        if len(self.files) > preview:
+            lines.append(f"  ... और {len(self.files) - preview} files")
+        return "\n".join(lines)
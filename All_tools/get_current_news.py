@@ -1,9 +1,10 @@
 import logging
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
 from ddgs import DDGS
 from datetime import datetime
 
-@function_tool()
+@metered_tool()
 async def get_current_news(
     context: RunContext,  # type: ignore
     topic: str = "general"
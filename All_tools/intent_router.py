@@ -0,0 +1,278 @@
+"""
+Fast path for common system commands ("volume up", "आवाज़ कम करो", "open safari"):
+the final transcript of a turn is classified locally and, when the whole
+utterance is one of these commands, the tool runs straight away instead of
+waiting for the realtime model to decide to call it. The model is told
+afterwards so it can confirm in its own words; if it calls the same tool for
+that turn anyway, with the same arguments, the call is answered with the
+result already produced.
+
+Enable with FRIDAY_INTENT_FASTPATH=1.
+
+Classification: every phrase (English, Hindi in Devanagari and Hinglish) is
+reduced to phonetic word keys and compiled into one keyword automaton, so
+spelling variants and Devanagari transcripts match the same phrase. A word
+that matches nothing may be corrected to the nearest phrase word by edit
+distance ("volum up"). Anything left over that is not a filler word ("please",
+"zara", "karo") sends the turn to the model as usual, so "why is the volume
+up?" or "volume up mat karo" are never short-circuited.
+
+The session summary reports how many turns were short-circuited and how
+much sooner their tool started than tool calls made by the model.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import statistics
+import time
+from collections import Counter, deque
+from typing import List, Optional
+
+from .agent_events import emit_event
+from .app_state import APP_ALIASES, resolve_app_name
+from .keyword_automaton import FILLER_KEYS, PhraseMatcher, leftover_words, phrase_key
+from .mac_system_control import MAC_COMMANDS, match_mac_command
+from .tool_metrics import add_call_guard, remove_call_guard
+
+FAST_PATH_ENABLED = os.getenv("FRIDAY_INTENT_FASTPATH") == "1"
+# A model tool call this soon after the fast path ran the same tool is the same request
+GUARD_SECONDS = float(os.getenv("FRIDAY_INTENT_GUARD_SECONDS", "8"))
+MAX_WORDS = 10
+MAX_ACTIONS = 3
+
+class Intent:
+    """A command the fast path can run: phrases that mean it and the tool call it becomes"""
+
+    def __init__(self, name: str, tool: str, phrases: List[str], kwargs: dict = None, slot: str = None):
+        self.name = name
+        self.tool = tool
+        self.phrases = phrases
+        self.kwargs = kwargs or {}
+        # Argument filled from the one number in the utterance ("volume 40")
+        self.slot = slot
+
+class IntentMatch:
+    def __init__(self, intent: Intent, kwargs: dict, phrase: str):
+        self.intent = intent
+        self.tool = intent.tool
+        self.kwargs = kwargs
+        self.phrase = phrase
+
+def mac_command_intents() -> List[Intent]:
+    """execute_mac_command's table, minus commands it marks as not for the fast path"""
+    return [
+        Intent(entry.name.replace(" ", "_"), "execute_mac_command", entry.phrases, {"command": entry.name})
+        for entry in MAC_COMMANDS if entry.fast_path
+    ]
+
+INTENTS = [
+    Intent("set_volume", "set_volume_precise", [
+        "set volume", "set volume to", "set the volume to", "volume to", "volume at", "volume",
+        "awaaz", "आवाज़", "वॉल्यूम",
+    ], slot="percentage"),
+    Intent("set_brightness", "set_brightness_precise", [
+        "set brightness", "set brightness to", "set the brightness to", "brightness to", "brightness at",
+        "brightness", "ब्राइटनेस",
+    ], slot="percentage"),
+    Intent("music_pause", "control_music", [
+        "pause music", "pause the music", "pause the song", "stop the music", "gaana roko", "गाना रोको",
+    ], {"action": "pause"}),
+    Intent("music_play", "control_music", [
+        "play music", "resume music", "resume the music", "gaana chalao", "गाना चलाओ",
+    ], {"action": "play"}),
+    Intent("music_next", "control_music", [
+        "next song", "next track", "skip song", "skip this song", "agla gaana", "अगला गाना",
+    ], {"action": "next"}),
+    Intent("music_previous", "control_music", [
+        "previous song", "previous track", "last song", "pichla gaana", "पिछला गाना",
+    ], {"action": "previous"}),
+]
+
+def app_intents() -> List[Intent]:
+    """open/close for every app in the alias table"""
+    intents = []
+    for app, aliases in APP_ALIASES.items():
+        names = [app.lower()] + aliases
+        intents.append(Intent(f"open {app}", "open_app", [
+            phrase for name in names
+            for phrase in (f"open {name}", f"launch {name}", f"start {name}", f"{name} kholo", f"{name} खोलो")
+        ], {"app_name": app}))
+        intents.append(Intent(f"close {app}", "close_application", [
+            phrase for name in names
+            for phrase in (f"close {name}", f"quit {name}", f"{name} band karo", f"{name} बंद करो")
+        ], {"app_name": app}))
+    return intents
+
+class IntentRouter:
+    def __init__(self, intents: List[Intent] = None):
+        self.intents = intents if intents is not None else mac_command_intents() + INTENTS + app_intents()
+        self.matcher = PhraseMatcher(skip=FILLER_KEYS)
+        for intent in self.intents:
+            for phrase in intent.phrases:
+                self.matcher.add(phrase, intent)
+        self.matcher.build()
+        self.tools = {intent.tool for intent in self.intents}
+
+    def classify(self, text: str) -> List[IntentMatch]:
+        """The commands the utterance consists of, or [] when it is anything more than that"""
+        words = phrase_key(text)
+        if not words or len(words) > MAX_WORDS:
+            return []
+        if self.matcher.correct_words(words) > 1:
+            return []
+        found = self.matcher.find(words)
+        if not found:
+            return []
+        if leftover_words(words, found):
+            return []
+
+        numbers = [int(word) for word in words if word.isdigit()]
+        matches = []
+        for first, last, intent in found:
+            kwargs = dict(intent.kwargs)
+            if intent.slot:
+                if len(numbers) != 1 or not 0 <= numbers[0] <= 100:
+                    return []
+                kwargs[intent.slot] = numbers[0]
+            matches.append(IntentMatch(intent, kwargs, " ".join(words[first:last])))
+        if numbers and not any(match.intent.slot for match in matches):
+            return []  # "volume up by 20": let the model work out what that means
+        if any(match.intent.slot for match in matches) and len(matches) > 1:
+            return []
+        return matches[:MAX_ACTIONS]
+
+class FastPathStats:
+    def __init__(self):
+        self.turns = 0
+        self.short_circuited = 0
+        self.intents = Counter()
+        # Milliseconds from the end of the utterance to the tool starting
+        self.fast_start_ms = deque(maxlen=500)
+        self.model_start_ms = deque(maxlen=500)
+
+    def summary(self) -> dict:
+        fast = statistics.median(self.fast_start_ms) if self.fast_start_ms else None
+        model = statistics.median(self.model_start_ms) if self.model_start_ms else None
+        saved = (model - fast) * self.short_circuited if fast is not None and model is not None else None
+        return {
+            "turns": self.turns,
+            "short_circuited": self.short_circuited,
+            "intents": dict(self.intents),
+            "fast_start_ms_p50": fast,
+            "model_start_ms_p50": model,
+            "saved_ms_total": saved,
+        }
+
+    def log_summary(self):
+        if not self.turns:
+            return
+        summary = self.summary()
+        logging.info(f"Intent fast path: {self.short_circuited} of {self.turns} turns short-circuited "
+                     f"({', '.join(f'{name} {count}' for name, count in self.intents.most_common(5))})")
+        if summary["saved_ms_total"] is not None:
+            logging.info(f"  tool started after {summary['fast_start_ms_p50']:.0f}ms instead of "
+                         f"{summary['model_start_ms_p50']:.0f}ms via the model; about "
+                         f"{summary['saved_ms_total'] / 1000:.1f}s saved in total")
+
+running_fast_path = contextvars.ContextVar("friday_fast_path_call", default=False)
+
+def call_key(tool: str, arguments: dict) -> tuple:
+    """What a call asks for, so "increase volume" and "volume up" are the same call"""
+    normalized = {}
+    for name, value in arguments.items():
+        if tool == "execute_mac_command" and name == "command":
+            matched = match_mac_command(str(value))
+            value = matched.name if matched else str(value).strip().lower()
+        elif tool in ("open_app", "close_application") and name == "app_name":
+            value = resolve_app_name(str(value))
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized[name] = value
+    return tool, tuple(sorted(normalized.items(), key=lambda item: item[0]))
+
+class FastPath:
+    """Hooks an IntentRouter into a session: run matched commands, then let the model confirm"""
+
+    def __init__(self, tools, router: IntentRouter = None):
+        self.router = router or IntentRouter()
+        self.tools = {getattr(tool, "__name__", ""): tool for tool in tools}
+        self.stats = FastPathStats()
+        self.handled = deque()  # (call_key, monotonic time, result) for guard()
+        self.utterance_ended = None  # when the last turn the model is handling ended
+        # The loop only keeps weak references to tasks; a run must not be collected mid-tool
+        self.tasks = set()
+        add_call_guard(self.guard)
+
+    def on_transcript(self, session, text: str, is_final: bool):
+        if not is_final or not text.strip():
+            return
+        ended = time.perf_counter()
+        self.stats.turns += 1
+        matches = self.router.classify(text)
+        if not matches or any(match.tool not in self.tools for match in matches):
+            self.utterance_ended = ended
+            return
+        self.utterance_ended = None
+        task = asyncio.create_task(self.run(session, text, matches, ended))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run(self, session, text: str, matches: List[IntentMatch], ended: float):
+        running_fast_path.set(True)
+        try:
+            session.interrupt()
+        except Exception as e:
+            logging.debug(f"Could not interrupt the model's reply: {e}")
+        started = time.perf_counter()
+        results = []
+        for match in matches:
+            try:
+                result = await self.tools[match.tool](None, **match.kwargs)
+            except Exception as e:
+                logging.error(f"Fast path {match.intent.name} failed: {e}")
+                result = f"Failed: {e}"
+            results.append(str(result))
+            self.handled.append((call_key(match.tool, match.kwargs), time.monotonic(), result))
+            self.stats.intents[match.intent.name] += 1
+        start_ms = (started - ended) * 1000
+        self.stats.short_circuited += 1
+        self.stats.fast_start_ms.append(start_ms)
+        emit_event("intent_fast_path", intents=[match.intent.name for match in matches],
+                   start_ms=round(start_ms, 2), total_ms=round((time.perf_counter() - ended) * 1000, 2))
+        logging.info(f"Fast path handled '{text}': {'; '.join(results)}")
+
+        done = "; ".join(results)
+        await session.generate_reply(instructions=(
+            f'The user said "{text}". That was already done, no tool call is needed: {done}. '
+            "Confirm it in one short sentence, in the language the user spoke."
+        ))
+
+    def guard(self, tool: str, arguments: dict):
+        """Answers the model's own call for a turn the fast path already handled"""
+        if running_fast_path.get():
+            return None
+        now = time.monotonic()
+        while self.handled and now - self.handled[0][1] > GUARD_SECONDS:
+            self.handled.popleft()
+        if self.handled and tool in self.router.tools:
+            key = call_key(tool, arguments)
+            for entry in self.handled:
+                if entry[0] == key:
+                    self.handled.remove(entry)
+                    return f"Already done: {entry[2]}"
+        if self.utterance_ended is not None and tool in self.router.tools:
+            self.stats.model_start_ms.append((time.perf_counter() - self.utterance_ended) * 1000)
+            self.utterance_ended = None
+        return None
+
+    def close(self):
+        """Stop answering tool calls; call when the session ends"""
+        remove_call_guard(self.guard)
+
+def start_fast_path(tools) -> Optional[FastPath]:
+    """A FastPath for the session when FRIDAY_INTENT_FASTPATH=1, else None"""
+    if not FAST_PATH_ENABLED:
+        return None
+    return FastPath(tools)
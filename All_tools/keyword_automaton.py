@@ -0,0 +1,231 @@
+"""
+Aho-Corasick keyword automaton: finds every phrase of a fixed set in one pass
+over the text, however many phrases there are.
+
+Phrases and text are matched on whole words only ("mute" does not match
+inside "commute"). KeywordAutomaton expects normalized text (lowercase words
+separated by single spaces). PhraseMatcher does that itself: phrases and
+utterances are reduced to phonetic word keys (Devanagari transliterated,
+Hindi/English spelling variants merged), words that match nothing can be
+corrected to the nearest phrase word, and a miss can be answered with the
+closest phrases.
+"""
+
+from collections import Counter, deque
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .contact_directory import normalize, phonetic
+
+class KeywordAutomaton:
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # Per state: (phrase length, value) of every phrase that ends there, via fail links too
+        self.output: List[List[Tuple[int, Any]]] = [[]]
+        self.built = False
+
+    def add(self, phrase: str, value: Any):
+        if self.built:
+            raise RuntimeError("add() after build()")
+        state = 0
+        for char in phrase:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append((len(phrase), value))
+
+    def build(self) -> "KeywordAutomaton":
+        """Compute fail links (breadth first); call once after adding every phrase"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+        self.built = True
+        return self
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """(start, end, value) for every whole-word occurrence of every phrase"""
+        matches = []
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = index + 1
+            if end < len(text) and text[end] != " ":
+                continue
+            for length, value in output[state]:
+                start = end - length
+                if start == 0 or text[start - 1] == " ":
+                    matches.append((start, end, value))
+        return matches
+
+    def find(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Leftmost-longest matches that do not overlap"""
+        chosen, covered_to = [], 0
+        for start, end, value in sorted(self.find_all(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start >= covered_to:
+                chosen.append((start, end, value))
+                covered_to = end
+        return chosen
+
+@lru_cache(maxsize=4096)
+def word_key(word: str) -> str:
+    return phonetic(word)
+
+def phrase_key(text: str) -> List[str]:
+    """Phonetic word keys: "आवाज़ बढ़ाओ" and "awaaz badhao" give the same words"""
+    return [word_key(word) for word in normalize(text).split()]
+
+# Words that may surround a command, or sit inside one ("brightness thoda kam karo"), without changing it
+FILLER_WORDS = """
+    please pls plz hey hi ok okay friday can could would will you just the a my it its this that
+    bit little more some now right and then also for me thoda zara jara jra kar karo kardo kijiye
+    kijie dijiye do de dena na ji yaar bhai abhi fir phir aur bhi to sa
+    थोड़ा ज़रा करो कर दो कीजिए दीजिए ना जी यार अभी फिर और भी
+"""
+
+FILLER_KEYS = frozenset(key for word in FILLER_WORDS.split() for key in phrase_key(word))
+
+# Words that turn a command into its opposite ("do not empty the trash", "volume mat badhao");
+# "don't" splits into "don" and "t"
+NEGATION_WORDS = "not no never dont don nahi nahin mat मत नहीं"
+
+NEGATION_KEYS = frozenset(key for word in NEGATION_WORDS.split() for key in phrase_key(word))
+
+def leftover_words(words: List[str], found: List[Tuple[int, int, Any]]) -> List[str]:
+    """Words outside every match that are neither fillers nor numbers"""
+    covered = {index for first, last, _ in found for index in range(first, last)}
+    return [word for index, word in enumerate(words)
+            if index not in covered and word not in FILLER_KEYS and not word.isdigit()]
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def deletions(word: str, depth: int) -> set:
+    """word and every string made by deleting up to depth letters from it"""
+    variants, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+class PhraseMatcher:
+    """Phrases mapped to values, matched on phonetic word keys; words in skip are ignored on both sides"""
+
+    def __init__(self, skip=frozenset()):
+        self.skip = skip
+        self.automaton = KeywordAutomaton()
+        self.phrases: List[Tuple[str, str, Any]] = []  # (key, phrase as written, value)
+        self.vocabulary: Dict[int, set] = {}  # word length -> phrase words
+        self.word_counts = Counter()
+        # Deletion variant -> phrase words: two words within edit distance d share a variant of depth d
+        self.variants: Dict[str, set] = {}
+
+    def add(self, phrase: str, value: Any):
+        words = [word for word in phrase_key(phrase) if word not in self.skip]
+        if not words:
+            return
+        key = " ".join(words)
+        self.automaton.add(key, value)
+        self.phrases.append((key, phrase, value))
+        for word in words:
+            if word not in self.word_counts:
+                self.vocabulary.setdefault(len(word), set()).add(word)
+                for variant in deletions(word, 2):
+                    self.variants.setdefault(variant, set()).add(word)
+            self.word_counts[word] += 1
+
+    def build(self) -> "PhraseMatcher":
+        self.automaton.build()
+        return self
+
+    def known(self, word: str) -> bool:
+        return word in self.vocabulary.get(len(word), ())
+
+    def correct(self, word: str) -> Optional[str]:
+        """The closest phrase word within a typo of word; ties go to the word more phrases use"""
+        limit = 1 if len(word) < 8 else 2
+        candidates = set()
+        for variant in deletions(word, limit):
+            candidates |= self.variants.get(variant, set())
+        best, best_distance = [], limit + 1
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, limit)
+            if distance < best_distance:
+                best, best_distance = [candidate], distance
+            elif distance == best_distance and distance <= limit:
+                best.append(candidate)
+        if best_distance > limit:
+            return None
+        best.sort(key=lambda candidate: -self.word_counts[candidate])
+        if len(best) > 1 and self.word_counts[best[0]] == self.word_counts[best[1]]:
+            return None
+        return best[0]
+
+    def correct_words(self, words: List[str], ignore=frozenset()) -> int:
+        """Replace unknown words (4+ letters, not in ignore) by their correction; returns how many changed"""
+        corrections = 0
+        for index, word in enumerate(words):
+            if len(word) < 4 or word.isdigit() or word in ignore or word in self.skip or self.known(word):
+                continue
+            fixed = self.correct(word)
+            if fixed:
+                words[index] = fixed
+                corrections += 1
+        return corrections
+
+    def find(self, words: List[str]) -> List[Tuple[int, int, Any]]:
+        """(first word, last word + 1, value) of the leftmost-longest phrases in words"""
+        kept, starts, ends, offset = [], {}, {}, 0
+        for index, word in enumerate(words):
+            if word in self.skip:
+                continue
+            kept.append(word)
+            starts[offset] = index
+            offset += len(word)
+            ends[offset] = index + 1
+            offset += 1
+        return [(starts[start], ends[end], value) for start, end, value in self.automaton.find(" ".join(kept))]
+
+    def suggest(self, words: List[str], limit: int = 3, cutoff: float = 0.6) -> List[Tuple[Any, str, float]]:
+        """(value, phrase, score) of the phrases closest to words, best first, one per value"""
+        key = " ".join(word for word in words if word not in self.skip)
+        best: Dict[int, Tuple[Any, str, float]] = {}
+        matcher = SequenceMatcher(b=key, autojunk=False)
+        for phrase_key_text, phrase, value in self.phrases:
+            matcher.set_seq1(phrase_key_text)
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff and score > best.get(id(value), (None, None, 0.0))[2]:
+                best[id(value)] = (value, phrase, score)
+        return sorted(best.values(), key=lambda item: -item[2])[:limit]
@@ -1,6 +1,7 @@
 import logging
 import re
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
 
 # Language detection patterns
 HINDI_PATTERNS = [
@@ -12,7 +13,7 @@ ENGLISH_PATTERNS = [
     r'\b(hello|hi|hey|what|when|where|why|how|yes|no|thanks|thank|you|please|can|could|would|should|will|do|does|did|am|is|are|was|were|have|has|had|sir|boss)\b'
 ]
 
-@function_tool()
+@metered_tool()
 async def detect_language(
     context: RunContext,  # type: ignore
     text: str) -> str:
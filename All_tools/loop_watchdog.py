@@ -0,0 +1,206 @@
+"""
+Event-loop watchdog for the agent process, enabled with FRIDAY_LOOP_WATCHDOG=1.
+
+A heartbeat coroutine measures loop lag every FRIDAY_LOOP_PROBE_MS (default 20).
+A sampling thread notices when the heartbeat stalls for longer than
+FRIDAY_LOOP_BLOCK_MS (default 100) and samples the loop thread's stack until it
+resumes. Each blocking episode is logged with the tool that was running and
+its most frequent stack, sent to the control plane as a loop_block event (see
+/metrics), and appended to FRIDAY_LOOP_BLOCK_FILE (default
+~/.friday/loop_blocks/agent-<pid>.jsonl) for scripts/blocking_report.py.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from .agent_events import emit_event
+
+WATCHDOG_ENABLED = os.getenv("FRIDAY_LOOP_WATCHDOG") == "1"
+BLOCK_THRESHOLD = float(os.getenv("FRIDAY_LOOP_BLOCK_MS", "100")) / 1000
+PROBE_INTERVAL = float(os.getenv("FRIDAY_LOOP_PROBE_MS", "20")) / 1000
+REPORT_INTERVAL = float(os.getenv("FRIDAY_LOOP_REPORT_SECONDS", "15"))
+BLOCK_FILE = os.getenv("FRIDAY_LOOP_BLOCK_FILE") or os.path.expanduser(
+    f"~/.friday/loop_blocks/agent-{os.getpid()}.jsonl"
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Frames of these files are plumbing, never the call site to blame
+PLUMBING_FILES = ("tool_metrics.py", "tracing.py", "loop_watchdog.py")
+MAX_STACK_DEPTH = 40
+
+def frame_stack(frame):
+    """(filename, line, function) from outermost to innermost"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+def running_tool(frame) -> str:
+    """Innermost metered tool on the stack, read from its wrapper's locals"""
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "wrapper" and os.path.basename(code.co_filename) == "tool_metrics.py":
+            return frame.f_locals.get("tool") or ""
+        frame = frame.f_back
+    return ""
+
+def relative(filename: str) -> str:
+    if filename.startswith(REPO_ROOT + os.sep):
+        return filename[len(REPO_ROOT) + 1:]
+    return filename
+
+def call_site(stack) -> str:
+    """Innermost frame in this repo (the code that made the blocking call), else the innermost frame"""
+    for filename, line, function in reversed(stack):
+        if filename.startswith(REPO_ROOT + os.sep) and os.path.basename(filename) not in PLUMBING_FILES:
+            return f"{relative(filename)}:{line} in {function}"
+    if stack:
+        filename, line, function = stack[-1]
+        return f"{relative(filename)}:{line} in {function}"
+    return "(not sampled)"
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = BLOCK_THRESHOLD, interval: float = PROBE_INTERVAL,
+                 report_interval: float = REPORT_INTERVAL, block_file: str = BLOCK_FILE):
+        self.threshold = threshold
+        self.interval = interval
+        self.report_interval = report_interval
+        self.block_file = block_file
+        self.loop_thread = None
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        # Written by the heartbeat, read by the sampler
+        self.beat = 0
+        self.last_beat = time.perf_counter()
+        self.max_lag = 0.0  # worst lag since the sampler last looked
+        self.window = []
+        # Totals per call site for the end-of-session summary
+        self.sites = Counter()
+        self.site_seconds = Counter()
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self.task = loop.create_task(self.heartbeat())
+        self.thread = threading.Thread(target=self.sample, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        task = getattr(self, "task", None)
+        if task is not None:
+            task.cancel()
+
+    async def heartbeat(self):
+        self.loop_thread = threading.get_ident()
+        next_report = time.perf_counter() + self.report_interval
+        while not self.stopping.is_set():
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            with self.lock:
+                self.max_lag = max(self.max_lag, lag)
+                self.last_beat = now
+                self.beat += 1
+                self.window.append(lag)
+            if now >= next_report:
+                self.report_lag()
+                next_report = now + self.report_interval
+
+    def report_lag(self):
+        with self.lock:
+            window, self.window = sorted(self.window), []
+        if window:
+            p99 = window[min(len(window) - 1, int(0.99 * len(window)))]
+            emit_event("loop_lag", max_ms=round(window[-1] * 1000, 2), p99_ms=round(p99 * 1000, 2), samples=len(window))
+
+    def sample(self):
+        """Sampling thread: watch the heartbeat, collect stacks while it is stalled"""
+        blocked_since = None
+        stacks, tools = Counter(), Counter()
+        seen_beat = 0
+        while not self.stopping.wait(self.interval / 2):
+            with self.lock:
+                beat, last_beat, max_lag = self.beat, self.last_beat, self.max_lag
+                self.max_lag = 0.0
+            stalled = time.perf_counter() - last_beat - self.interval
+            if stalled > self.threshold:
+                if blocked_since is None:
+                    blocked_since = beat
+                frame = sys._current_frames().get(self.loop_thread)
+                if frame is not None:
+                    stacks[frame_stack(frame)] += 1
+                    tools[running_tool(frame)] += 1
+                    del frame
+            elif blocked_since is not None and beat > blocked_since:
+                self.finish_block(max_lag, stacks, tools)
+                blocked_since = None
+                stacks, tools = Counter(), Counter()
+                seen_beat = beat
+            elif beat > seen_beat:
+                # A block the thread could not sample, e.g. C code holding the GIL
+                if max_lag > self.threshold:
+                    self.finish_block(max_lag, stacks, tools)
+                seen_beat = beat
+
+    def finish_block(self, duration: float, stacks: Counter, tools: Counter):
+        stack = stacks.most_common(1)[0][0] if stacks else ()
+        tool = tools.most_common(1)[0][0] if tools else ""
+        site = call_site(stack)
+        record = {
+            "time": time.time(),
+            "duration_ms": round(duration * 1000, 1),
+            "tool": tool,
+            "site": site,
+            "samples": sum(stacks.values()),
+            "stack": [f"{relative(filename)}:{line} in {function}" for filename, line, function in stack],
+            "worker_id": os.getenv("FRIDAY_WORKER_ID"),
+        }
+        with self.lock:
+            self.sites[site] += 1
+            self.site_seconds[site] += duration
+        logging.warning(
+            f"Event loop blocked for {record['duration_ms']:.0f}ms"
+            f"{f' in tool {tool}' if tool else ''} at {site}"
+        )
+        if record["stack"]:
+            logging.debug("Blocking stack:\n  " + "\n  ".join(record["stack"][-12:]))
+        emit_event("loop_block", duration_ms=record["duration_ms"], tool=tool, site=site)
+        self.write(record)
+
+    def write(self, record: dict):
+        try:
+            os.makedirs(os.path.dirname(self.block_file), exist_ok=True)
+            with open(self.block_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logging.warning(f"Could not write loop block record: {e}")
+
+    def log_summary(self, limit: int = 5):
+        with self.lock:
+            worst = self.site_seconds.most_common(limit)
+        if not worst:
+            return
+        logging.info("Event loop blocking (most total time first):")
+        for site, seconds in worst:
+            logging.info(f"  {site}: {self.sites[site]} blocks, {seconds * 1000:.0f}ms total")
+
+watchdog = None
+
+def start_watchdog():
+    """Start the process-wide watchdog on the running loop when FRIDAY_LOOP_WATCHDOG=1"""
+    global watchdog
+    if not WATCHDOG_ENABLED:
+        return None
+    if watchdog is None:
+        watchdog = LoopWatchdog()
+        watchdog.start(asyncio.get_running_loop())
+        logging.info(f"Loop watchdog started (block threshold {BLOCK_THRESHOLD * 1000:.0f}ms)")
+    return watchdog
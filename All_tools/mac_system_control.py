@@ -1,14 +1,153 @@
+import asyncio
 import logging
-import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+import time
+from typing import Callable, List, Optional
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .keyword_automaton import FILLER_KEYS, NEGATION_KEYS, PhraseMatcher, leftover_words, phrase_key
+from .device_control import get_device_control
+from .system_backend import (
+    BRIGHTNESS, EMPTY_TRASH, LOCK_SCREEN, MUTE, OPEN_APP, OPEN_PATH, SCREENSHOT, SCREENSHOT_CLIPBOARD, VOLUME,
+    get_system_backend,
+)
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
+# Percentage points per "up"/"down"; a volume step is one press of the volume key
+VOLUME_STEP = 6
+BRIGHTNESS_STEP = 20
 
-@function_tool()
+def system_action(method: str, reply: str, *args):
+    """Handler calling the system backend's method(*args)"""
+    def handler():
+        getattr(get_system_backend(), method)(*args)
+        return reply
+    return handler
+
+def adjust_level(device: str, delta: int, reply: str):
+    async def handler():
+        # Steps said in quick succession are merged into one change
+        level = await getattr(get_device_control(), device).adjust(delta)
+        return f"{reply} to {level}%"
+    return handler
+
+def screenshot_folder() -> str:
+    """~/Desktop, or ~/Pictures on desktops without one"""
+    for folder in ("~/Desktop", "~/Pictures"):
+        if os.path.isdir(os.path.expanduser(folder)):
+            return os.path.expanduser(folder)
+    return os.path.expanduser("~")
+
+def screenshot_to_desktop():
+    folder = screenshot_folder()
+    filename = f"Screenshot_{time.strftime('%Y%m%d_%H%M%S')}.png"
+    get_system_backend().screenshot(os.path.join(folder, filename))
+    return f"Screenshot saved to {os.path.basename(folder)} as {filename}"
+
+class MacCommand:
+    """One execute_mac_command action: the phrases that ask for it and its handler"""
+
+    def __init__(self, name: str, phrases: List[str], handler: Callable[[], str], requires: str,
+                 fast_path: bool = True, fuzzy: bool = True):
+        self.name = name
+        self.phrases = [name] + phrases
+        self.handler = handler
+        # The system backend operation it needs (see system_backend)
+        self.requires = requires
+        # Whether the intent fast path may run it without the model (see intent_router)
+        self.fast_path = fast_path
+        # Whether a typo-corrected command, or one with other words around the phrase, may run it;
+        # destructive commands need the exact phrase and nothing else but fillers
+        self.fuzzy = fuzzy
+
+# When a command mentions several, the one listed first wins
+MAC_COMMANDS = [
+    MacCommand("brightness up", [
+        "increase brightness", "increase the brightness", "brighter", "brightness badhao", "roshni badhao",
+        "ब्राइटनेस बढ़ाओ", "रोशनी बढ़ाओ",
+    ], adjust_level("brightness", BRIGHTNESS_STEP, "Screen brightness increased"), BRIGHTNESS),
+    MacCommand("brightness down", [
+        "decrease brightness", "decrease the brightness", "dimmer", "dim the screen", "brightness kam",
+        "roshni kam", "ब्राइटनेस कम", "रोशनी कम",
+    ], adjust_level("brightness", -BRIGHTNESS_STEP, "Screen brightness decreased"), BRIGHTNESS),
+    MacCommand("volume up", [
+        "increase volume", "increase the volume", "turn up the volume", "turn the volume up", "louder",
+        "volume badhao", "volume badha", "awaaz badhao", "awaz tez", "आवाज़ बढ़ाओ", "आवाज़ तेज़", "वॉल्यूम बढ़ाओ",
+    ], adjust_level("volume", VOLUME_STEP, "Volume increased"), VOLUME),
+    MacCommand("volume down", [
+        "decrease volume", "decrease the volume", "lower the volume", "turn down the volume",
+        "turn the volume down", "quieter", "volume kam", "awaaz kam", "आवाज़ कम", "वॉल्यूम कम", "आवाज़ धीमी",
+    ], adjust_level("volume", -VOLUME_STEP, "Volume decreased"), VOLUME),
+    MacCommand("mute", [
+        "mute volume", "mute the volume", "awaaz band", "आवाज़ बंद", "म्यूट",
+    ], system_action("mute", "Volume muted"), MUTE),
+    MacCommand("open downloads", [
+        "open the downloads folder", "open downloads folder", "downloads kholo", "डाउनलोड्स खोलो",
+    ], system_action("open_path", "Opened Downloads folder", "~/Downloads"), OPEN_PATH),
+    MacCommand("open desktop", [
+        "open the desktop folder", "open desktop folder", "desktop kholo", "डेस्कटॉप खोलो",
+    ], system_action("open_path", "Opened Desktop folder", "~/Desktop"), OPEN_PATH),
+    MacCommand("open documents", [
+        "open the documents folder", "open documents folder", "documents kholo", "डॉक्यूमेंट्स खोलो",
+    ], system_action("open_path", "Opened Documents folder", "~/Documents"), OPEN_PATH),
+    # Apps: the fast path opens these through open_app instead
+    MacCommand("open safari", ["safari kholo", "सफारी खोलो"],
+               system_action("open_app", "Opened Safari browser", "Safari"), OPEN_APP, fast_path=False),
+    MacCommand("open chrome", ["open google chrome", "chrome kholo", "क्रोम खोलो"],
+               system_action("open_app", "Opened Google Chrome browser", "Google Chrome"), OPEN_APP, fast_path=False),
+    MacCommand("open browser", ["open the browser", "open web browser", "browser kholo", "ब्राउज़र खोलो"],
+               system_action("open_app", "Opened default web browser", "Safari"), OPEN_APP, fast_path=False),
+    MacCommand("open finder", ["finder kholo"],
+               system_action("open_app", "Opened Finder", "Finder"), OPEN_APP, fast_path=False),
+    MacCommand("open terminal", ["terminal kholo", "टर्मिनल खोलो"],
+               system_action("open_app", "Opened Terminal", "Terminal"), OPEN_APP, fast_path=False),
+    MacCommand("open calculator", ["calculator kholo", "कैलकुलेटर खोलो"],
+               system_action("open_app", "Opened Calculator", "Calculator"), OPEN_APP, fast_path=False),
+    MacCommand("open calendar", ["calendar kholo", "कैलेंडर खोलो"],
+               system_action("open_app", "Opened Calendar", "Calendar"), OPEN_APP, fast_path=False),
+    MacCommand("open notes", ["notes kholo", "नोट्स खोलो"],
+               system_action("open_app", "Opened Notes", "Notes"), OPEN_APP, fast_path=False),
+    MacCommand("open system preferences", ["open settings", "open system settings", "settings kholo", "सेटिंग्स खोलो"],
+               system_action("open_app", "Opened System Preferences", "System Preferences"), OPEN_APP, fast_path=False),
+    MacCommand("open activity monitor", ["open task manager", "activity monitor kholo"],
+               system_action("open_app", "Opened Activity Monitor", "Activity Monitor"), OPEN_APP, fast_path=False),
+    MacCommand("take screenshot", [
+        "take a screenshot", "screenshot lo", "screenshot le", "स्क्रीनशॉट लो",
+    ], screenshot_to_desktop, SCREENSHOT),
+    MacCommand("lock screen", [
+        "lock the screen", "lock my mac", "lock the mac", "screen lock", "स्क्रीन लॉक",
+    ], system_action("lock_screen", "Screen locked"), LOCK_SCREEN),
+    # Not undoable, so never run without the model or on a corrected typo ("empty the crash")
+    MacCommand("empty trash", ["empty the trash", "clear trash", "trash khali karo", "कचरा खाली करो"],
+               system_action("empty_trash", "Trash emptied successfully"), EMPTY_TRASH,
+               fast_path=False, fuzzy=False),
+]
+
+COMMAND_MATCHER = PhraseMatcher(skip=FILLER_KEYS)
+for command_entry in MAC_COMMANDS:
+    for phrase in command_entry.phrases:
+        COMMAND_MATCHER.add(phrase, command_entry)
+COMMAND_MATCHER.build()
+COMMAND_PRIORITY = {id(command_entry): index for index, command_entry in enumerate(MAC_COMMANDS)}
+
+def match_mac_command(command: str) -> Optional[MacCommand]:
+    words = phrase_key(command)
+    if NEGATION_KEYS.intersection(words):
+        return None  # "do not empty the trash", "never lock the screen", "don't mute"
+    found = COMMAND_MATCHER.find(words)
+    if not found and COMMAND_MATCHER.correct_words(words):
+        found = [match for match in COMMAND_MATCHER.find(words) if match[2].fuzzy]
+    if not found:
+        return None
+    entry = min((entry for _, _, entry in found), key=lambda entry: COMMAND_PRIORITY[id(entry)])
+    if not entry.fuzzy and leftover_words(words, found):
+        return None  # "empty the trash and the downloads folder": leave it to the model
+    return entry
+
+def suggest_mac_commands(command: str, limit: int = 3) -> List[str]:
+    """Closest supported commands, best first"""
+    return [entry.name for entry, _, _ in COMMAND_MATCHER.suggest(phrase_key(command), limit)]
+
+@metered_tool()
 async def execute_mac_command(
     context: RunContext,  # type: ignore
     command: str
@@ -18,244 +157,116 @@ async def execute_mac_command(
     Args:
         command: The command to execute (e.g. "increase brightness", "open safari", etc.)
     """
-    if not is_mac():
-        return "Mac control features are only available on macOS."
-    
-    command = command.lower()
-    
     try:
-        # Brightness controls
-        if "increase brightness" in command or "brightness up" in command:
-            script = '''
-            tell application "System Events"
-                set currentBrightness to brightness of (first display)
-                set newBrightness to currentBrightness + 0.2
-                if newBrightness > 1 then set newBrightness to 1
-                set brightness of (first display) to newBrightness
-            end tell
-            '''
-            subprocess.run(["osascript", "-e", script], check=True)
-            return "Screen brightness increased"
-        
-        elif "decrease brightness" in command or "brightness down" in command:
-            script = '''
-            tell application "System Events"
-                set currentBrightness to brightness of (first display)
-                set newBrightness to currentBrightness - 0.2
-                if newBrightness < 0 then set newBrightness to 0
-                set brightness of (first display) to newBrightness
-            end tell
-            '''
-            subprocess.run(["osascript", "-e", script], check=True)
-            return "Screen brightness decreased"
-        
-        # Volume controls
-        elif "increase volume" in command or "volume up" in command:
-            script = 'set volume output volume (output volume of (get volume settings) + 1)'
-            subprocess.run(["osascript", "-e", script], check=True)
-            return "Volume increased"
-        
-        elif "decrease volume" in command or "volume down" in command:
-            script = 'set volume output volume (output volume of (get volume settings) - 1)'
-            subprocess.run(["osascript", "-e", script], check=True)
-            return "Volume decreased"
-        
-        elif "mute" in command or "mute volume" in command:
-            script = 'set volume with output muted'
-            subprocess.run(["osascript", "-e", script], check=True)
-            return "Volume muted"
-        
-        # Folder commands
-        elif "open downloads" in command:
-            downloads_path = os.path.expanduser("~/Downloads")
-            subprocess.run(["open", downloads_path])
-            return "Opened Downloads folder in Finder"
-        
-        elif "open desktop" in command:
-            desktop_path = os.path.expanduser("~/Desktop")
-            subprocess.run(["open", desktop_path])
-            return "Opened Desktop folder in Finder"
-        
-        elif "open documents" in command:
-            documents_path = os.path.expanduser("~/Documents")
-            subprocess.run(["open", documents_path])
-            return "Opened Documents folder in Finder"
-        
-        # Browser commands
-        elif "open safari" in command:
-            subprocess.run(["open", "-a", "Safari"])
-            return "Opened Safari browser"
-        
-        elif "open chrome" in command:
-            subprocess.run(["open", "-a", "Google Chrome"])
-            return "Opened Google Chrome browser"
-        
-        elif "open browser" in command:
-            subprocess.run(["open", "-a", "Safari"])
-            return "Opened default web browser"
-        
-        # Application commands
-        elif "open finder" in command:
-            subprocess.run(["open", "-a", "Finder"])
-            return "Opened Finder"
-        
-        elif "open terminal" in command:
-            subprocess.run(["open", "-a", "Terminal"])
-            return "Opened Terminal"
-        
-        elif "open calculator" in command:
-            subprocess.run(["open", "-a", "Calculator"])
-            return "Opened Calculator"
-        
-        elif "open calendar" in command:
-            subprocess.run(["open", "-a", "Calendar"])
-            return "Opened Calendar"
-        
-        elif "open notes" in command:
-            subprocess.run(["open", "-a", "Notes"])
-            return "Opened Notes"
-        
-        elif "open system preferences" in command:
-            subprocess.run(["open", "-a", "System Preferences"])
-            return "Opened System Preferences"
-        
-        elif "open activity monitor" in command:
-            subprocess.run(["open", "-a", "Activity Monitor"])
-            return "Opened Activity Monitor"
-        
-        # System commands
-        elif "take screenshot" in command:
-            desktop_path = os.path.expanduser("~/Desktop")
-            timestamp = subprocess.check_output(["date", "+%Y%m%d_%H%M%S"]).decode().strip()
-            filename = f"Screenshot_{timestamp}.png"
-            filepath = os.path.join(desktop_path, filename)
-            subprocess.run(["screencapture", filepath])
-            return f"Screenshot saved to Desktop as {filename}"
-        
-        elif "lock screen" in command:
-            script = 'tell application "System Events" to keystroke "q" using {command down, control down}'
-            subprocess.run(["osascript", "-e", script])
-            return "Screen locked"
-        
-        elif "empty trash" in command:
-            script = '''
-            tell application "Finder"
-                empty trash
-            end tell
-            '''
-            subprocess.run(["osascript", "-e", script])
-            return "Trash emptied successfully"
-        
-        else:
-            return None  # No Mac command recognized
+        matched = match_mac_command(command)
+        if matched is None:
+            suggestions = suggest_mac_commands(command)
+            if suggestions:
+                return f"Command not recognized: '{command}'. Did you mean: {', '.join(suggestions)}?"
+            return f"Command not recognized: '{command}'."
+        backend = get_system_backend()
+        if not backend.supports(matched.requires):
+            return backend.unavailable(matched.requires)
+        if asyncio.iscoroutinefunction(matched.handler):
+            return await matched.handler()
+        return await asyncio.to_thread(matched.handler)
             
     except Exception as e:
         return f"Failed to execute command: {e}"
 
-@function_tool()
+@metered_tool()
 async def set_brightness(
     context: RunContext,  # type: ignore
     level: int
 ) -> str:
     """
-    Set screen brightness level (0-100) on Mac.
+    Set screen brightness level (0-100).
     """
-    if not is_mac():
-        return "This function is only supported on macOS."
+    backend = get_system_backend()
+    if not backend.supports(BRIGHTNESS):
+        return backend.unavailable(BRIGHTNESS)
     try:
         if not 0 <= level <= 100:
             return "Brightness level must be between 0 and 100."
         
-        # Convert to AppleScript brightness scale (0.0 to 1.0)
-        brightness_value = level / 100.0
-        script = f'tell application "System Events" to set brightness of (first display) to {brightness_value}'
-        subprocess.run(["osascript", "-e", script], check=True)
-        return f"Screen brightness set to {level}%"
+        applied = await get_device_control().brightness.set(level)
+        return f"Screen brightness set to {applied}%"
     except Exception as e:
         logging.error(f"Error setting brightness: {e}")
         return f"Failed to set brightness: {e}"
 
-@function_tool()
+@metered_tool()
 async def set_volume(
     context: RunContext,  # type: ignore
     level: int
 ) -> str:
     """
-    Set system volume level (0-100) on Mac.
+    Set system volume level (0-100).
     """
-    if not is_mac():
-        return "This function is only supported on macOS."
+    backend = get_system_backend()
+    if not backend.supports(VOLUME):
+        return backend.unavailable(VOLUME)
     try:
         if not 0 <= level <= 100:
             return "Volume level must be between 0 and 100."
         
-        # Convert to AppleScript volume scale (0-7)
-        volume_value = int((level / 100) * 7)
-        script = f'set volume output volume {volume_value}'
-        subprocess.run(["osascript", "-e", script], check=True)
-        return f"Volume set to {level}%"
+        applied = await get_device_control().volume.set(level)
+        return f"Volume set to {applied}%"
     except Exception as e:
         logging.error(f"Error setting volume: {e}")
         return f"Failed to set volume: {e}"
 
-@function_tool()
+@metered_tool()
 async def take_screenshot(
     context: RunContext,  # type: ignore
     save_to_desktop: bool = True
 ) -> str:
     """
-    Take a screenshot on Mac.
+    Take a screenshot.
     """
-    if not is_mac():
-        return "This function is only supported on macOS."
+    backend = get_system_backend()
+    operation = SCREENSHOT if save_to_desktop else SCREENSHOT_CLIPBOARD
+    if not backend.supports(operation):
+        return backend.unavailable(operation)
     try:
         if save_to_desktop:
-            desktop_path = os.path.expanduser("~/Desktop")
-            timestamp = subprocess.check_output(["date", "+%Y%m%d_%H%M%S"]).decode().strip()
-            filename = f"Screenshot_{timestamp}.png"
-            filepath = os.path.join(desktop_path, filename)
-            subprocess.run(["screencapture", filepath])
-            return f"Screenshot saved to Desktop as {filename}"
+            return await asyncio.to_thread(screenshot_to_desktop)
         else:
-            subprocess.run(["screencapture", "-c"])  # Save to clipboard
+            await asyncio.to_thread(backend.screenshot, None)  # Save to clipboard
             return "Screenshot saved to clipboard"
     except Exception as e:
         logging.error(f"Error taking screenshot: {e}")
         return f"Failed to take screenshot: {e}"
 
-@function_tool()
+@metered_tool()
 async def lock_screen(
     context: RunContext,  # type: ignore
 ) -> str:
     """
-    Lock the Mac screen.
+    Lock the screen.
     """
-    if not is_mac():
-        return "This function is only supported on macOS."
+    backend = get_system_backend()
+    if not backend.supports(LOCK_SCREEN):
+        return backend.unavailable(LOCK_SCREEN)
     try:
-        script = 'tell application "System Events" to keystroke "q" using {command down, control down}'
-        subprocess.run(["osascript", "-e", script])
+        await asyncio.to_thread(backend.lock_screen)
         return "Screen locked"
     except Exception as e:
         logging.error(f"Error locking screen: {e}")
         return f"Failed to lock screen: {e}"
 
-@function_tool()
+@metered_tool()
 async def empty_trash(
     context: RunContext,  # type: ignore
 ) -> str:
     """
-    Empty the Trash on Mac.
+    Empty the Trash.
     """
-    if not is_mac():
-        return "This function is only supported on macOS."
+    backend = get_system_backend()
+    if not backend.supports(EMPTY_TRASH):
+        return backend.unavailable(EMPTY_TRASH)
     try:
-        script = '''
-        tell application "Finder"
-            empty trash
-        end tell
-        '''
-        subprocess.run(["osascript", "-e", script])
+        await asyncio.to_thread(backend.empty_trash)
         return "Trash emptied successfully"
     except Exception as e:
         logging.error(f"Error emptying trash: {e}")
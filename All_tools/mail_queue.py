@@ -0,0 +1,698 @@
+"""
+Outbound mail: a durable outbox drained by background senders over pooled SMTP connections.
+
+send_email only writes the message to the outbox (~/.friday/outbox, one JSON
+file per message) and returns; sender threads deliver it over authenticated
+connections that are kept open between messages (NOOP keep-alive, reconnect
+on failure) and retry transient failures with exponential backoff. Messages
+left in the outbox by a previous run are picked up again at startup.
+
+Several agent processes (the worker pool) share one outbox. A process claims
+a message before scheduling it by renaming the file into
+inflight/<host>-<pid>/; a rename that fails means another process got it
+first. Messages a process writes itself go straight into its own inflight
+directory. Claims held by a process that is no longer running on this host
+are handed back to the outbox when the next queue starts.
+
+send_bulk_email renders one message per recipient from a string.Template and
+queues them as a batch, so they share the same pooled connections and rate
+limit, then waits for the per-recipient outcomes.
+
+Settings (Gmail by default; point them at a local aiosmtpd to test):
+  SMTP_HOST, SMTP_PORT             smtp.gmail.com, 587
+  SMTP_SECURITY                    starttls (default), ssl or none
+  SMTP_USER, SMTP_PASSWORD         default to GMAIL_USER, GMAIL_APP_PASSWORD
+  SMTP_FROM                        sender address (default SMTP_USER)
+  SMTP_POOL_SIZE                   connections / sender threads (default 2)
+  SMTP_RATE_PER_SECOND, SMTP_BURST messages per second across all senders (default 5, burst 10)
+  FRIDAY_OUTBOX_DIR                default ~/.friday/outbox
+"""
+
+import asyncio
+import csv
+import heapq
+import io
+import json
+import logging
+import os
+import random
+import smtplib
+import socket
+import threading
+import time
+import uuid
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from string import Template
+from typing import List, Optional
+
+from .agent_events import emit_event
+from .contact_directory import lookup_contact
+
+OUTBOX_DIR = os.path.expanduser(os.getenv("FRIDAY_OUTBOX_DIR", "~/.friday/outbox"))
+FAILED_DIR_NAME = "failed"
+INFLIGHT_DIR_NAME = "inflight"
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+# Retry: 30s, 1m, 2m ... capped at 30m, then give up after MAX_ATTEMPTS
+RETRY_INITIAL = 30.0
+RETRY_MAX = 1800.0
+MAX_ATTEMPTS = int(os.getenv("FRIDAY_MAIL_MAX_ATTEMPTS", "10"))
+
+# Idle connections get a NOOP this often and are closed after SMTP_MAX_IDLE
+KEEPALIVE_SECONDS = 30.0
+SMTP_MAX_IDLE = float(os.getenv("SMTP_MAX_IDLE_SECONDS", "300"))
+CONNECT_TIMEOUT = 20.0
+
+# Providers throttle or block bursts (Gmail: a few messages per second)
+RATE_PER_SECOND = float(os.getenv("SMTP_RATE_PER_SECOND", "5"))
+RATE_BURST = int(os.getenv("SMTP_BURST", "10"))
+BULK_MAX_RECIPIENTS = 500
+
+class SmtpConfig:
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.security = os.getenv("SMTP_SECURITY", "starttls").lower()
+        self.port = int(os.getenv("SMTP_PORT", "465" if self.security == "ssl" else "587"))
+        self.user = os.getenv("SMTP_USER") or os.getenv("GMAIL_USER") or ""
+        self.password = os.getenv("SMTP_PASSWORD") or os.getenv("GMAIL_APP_PASSWORD") or ""
+        self.sender = os.getenv("SMTP_FROM") or self.user
+        self.pool_size = max(1, int(os.getenv("SMTP_POOL_SIZE", "2")))
+
+    def missing(self) -> Optional[str]:
+        """Why mail cannot be sent with this configuration, or None"""
+        if not self.sender:
+            return "Gmail credentials not configured."
+        if self.user and not self.password:
+            return "Gmail credentials not configured."
+        return None
+
+class OutboxMessage:
+    def __init__(self, to: List[str], subject: str, body: str, cc: List[str] = None,
+                 sender: str = "", message_id: str = None, created: float = None,
+                 attempts: int = 0, next_attempt: float = 0.0, last_error: str = None,
+                 batch: str = None):
+        self.id = message_id or uuid.uuid4().hex
+        self.to = to
+        self.cc = cc or []
+        self.subject = subject
+        self.body = body
+        self.sender = sender
+        self.created = created or time.time()
+        self.attempts = attempts
+        self.next_attempt = next_attempt
+        self.last_error = last_error
+        self.batch = batch
+
+    @property
+    def recipients(self) -> List[str]:
+        return self.to + self.cc
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id, "to": self.to, "cc": self.cc, "subject": self.subject, "body": self.body,
+            "sender": self.sender, "created": self.created, "attempts": self.attempts,
+            "next_attempt": self.next_attempt, "last_error": self.last_error, "batch": self.batch,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OutboxMessage":
+        return cls(data["to"], data["subject"], data["body"], data.get("cc"), data.get("sender", ""),
+                   data["id"], data.get("created"), data.get("attempts", 0), data.get("next_attempt", 0.0),
+                   data.get("last_error"), data.get("batch"))
+
+    def as_mime(self, sender: str) -> str:
+        msg = MIMEMultipart()
+        msg['From'] = self.sender or sender
+        msg['To'] = ", ".join(self.to)
+        if self.cc:
+            msg['Cc'] = ", ".join(self.cc)
+        msg['Subject'] = self.subject
+        msg['Date'] = formatdate(self.created, localtime=True)
+        # Stable across retries, so a resend after an ambiguous failure can be deduplicated
+        msg['Message-ID'] = make_msgid(idstring=self.id[:16], domain=(self.sender or sender).rpartition("@")[2] or None)
+        msg.attach(MIMEText(self.body, 'plain'))
+        return msg.as_string()
+
+class PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()  # any command, including keep-alive NOOPs
+        self.last_sent = self.last_used
+        self.messages = 0
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                self.smtp.close()
+            except OSError:
+                pass
+
+class SmtpConnectionPool:
+    """Authenticated connections reused across messages; at most `size` open at once"""
+
+    def __init__(self, config: SmtpConfig, size: int):
+        self.config = config
+        self.size = size
+        self.idle: List[PooledConnection] = []
+        self.open_count = 0
+        self.condition = threading.Condition()
+        self.connects = 0
+
+    def connect(self) -> PooledConnection:
+        config = self.config
+        if config.security == "ssl":
+            smtp = smtplib.SMTP_SSL(config.host, config.port, timeout=CONNECT_TIMEOUT)
+        else:
+            smtp = smtplib.SMTP(config.host, config.port, timeout=CONNECT_TIMEOUT)
+            if config.security == "starttls":
+                smtp.starttls()
+        if config.user:
+            smtp.login(config.user, config.password)
+        self.connects += 1
+        return PooledConnection(smtp)
+
+    def acquire(self) -> PooledConnection:
+        with self.condition:
+            while not self.idle and self.open_count >= self.size:
+                self.condition.wait()
+            if self.idle:
+                connection = self.idle.pop()
+            else:
+                self.open_count += 1
+                connection = None
+        if connection is not None:
+            if time.monotonic() - connection.last_used < KEEPALIVE_SECONDS or self.alive(connection):
+                return connection
+            connection.close()
+        try:
+            return self.connect()
+        except BaseException:
+            with self.condition:
+                self.open_count -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection: PooledConnection, broken: bool = False, sent: bool = False):
+        if broken:
+            connection.close()
+        else:
+            connection.last_used = time.monotonic()
+            if sent:
+                connection.last_sent = connection.last_used
+        with self.condition:
+            if broken:
+                self.open_count -= 1
+            else:
+                self.idle.append(connection)
+            self.condition.notify()
+
+    def alive(self, connection: PooledConnection) -> bool:
+        try:
+            return connection.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def keepalive(self):
+        """NOOP idle connections so the next message skips the handshake; close stale ones"""
+        now = time.monotonic()
+        with self.condition:
+            due = [c for c in self.idle if now - c.last_used >= KEEPALIVE_SECONDS]
+            for connection in due:
+                self.idle.remove(connection)
+        for connection in due:
+            if now - connection.last_sent < SMTP_MAX_IDLE and self.alive(connection):
+                self.release(connection)
+            else:
+                self.release(connection, broken=True)
+
+    def close_all(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.open_count -= len(idle)
+            self.condition.notify_all()
+        for connection in idle:
+            connection.close()
+
+class TokenBucket:
+    """Thread-safe rate limiter: take() blocks until a token is available"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError, socket.timeout))
+
+class MailQueue:
+    """Durable outbox plus sender threads; enqueue() is safe to call from any thread"""
+
+    def __init__(self, config: SmtpConfig = None, outbox_dir: str = OUTBOX_DIR):
+        self.config = config or SmtpConfig()
+        self.outbox_dir = outbox_dir
+        self.failed_dir = os.path.join(outbox_dir, FAILED_DIR_NAME)
+        self.claim_dir = os.path.join(outbox_dir, INFLIGHT_DIR_NAME, WORKER_ID)
+        os.makedirs(self.failed_dir, exist_ok=True)
+        os.makedirs(self.claim_dir, exist_ok=True)
+        self.pool = SmtpConnectionPool(self.config, self.config.pool_size)
+        self.rate = TokenBucket(RATE_PER_SECOND, RATE_BURST)
+        self.condition = threading.Condition()
+        self.heap = []
+        self.messages = {}
+        self.sequence = 0
+        self.stopping = False
+        self.sent = 0
+        self.failed = 0
+        # Latest outcome of batch messages, for send_bulk_email: id -> (status, error).
+        # Only recorded while the message is watched (from enqueue until wait_for returns)
+        self.outcomes = {}
+        self.watched = set()
+        self.load()
+        self.threads = [
+            threading.Thread(target=self.run, name=f"mail-sender-{i + 1}", daemon=True)
+            for i in range(self.config.pool_size)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def path(self, message_id: str) -> str:
+        """Where this process keeps a message it has claimed"""
+        return os.path.join(self.claim_dir, f"{message_id}.json")
+
+    def save(self, message: OutboxMessage, directory: str = None):
+        """Atomic write (temp file, fsync, rename) so a crash never leaves half a message"""
+        path = os.path.join(directory, f"{message.id}.json") if directory else self.path(message.id)
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(message.to_dict(), f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+
+    def load(self):
+        """Claim and resume messages left in the outbox by an earlier run or a stopped worker"""
+        release_orphaned_claims(self.outbox_dir)
+        for name in sorted(os.listdir(self.outbox_dir)):
+            if not name.endswith(".json"):
+                continue
+            claimed = os.path.join(self.claim_dir, name)
+            try:
+                os.rename(os.path.join(self.outbox_dir, name), claimed)
+            except FileNotFoundError:
+                continue  # another worker claimed it first
+            try:
+                with open(claimed, encoding="utf-8") as f:
+                    message = OutboxMessage.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Skipping unreadable outbox file {name}: {e}")
+                continue
+            self.schedule(message)
+        if self.messages:
+            logging.info(f"Mail queue resumed {len(self.messages)} pending messages")
+
+    def schedule(self, message: OutboxMessage):
+        with self.condition:
+            self.messages[message.id] = message
+            self.sequence += 1
+            heapq.heappush(self.heap, (message.next_attempt, self.sequence, message.id))
+            self.condition.notify()
+
+    def enqueue(self, to: List[str], subject: str, body: str, cc: List[str] = None, batch: str = None) -> OutboxMessage:
+        message = OutboxMessage(to, subject, body, cc, self.config.sender, batch=batch)
+        if batch:
+            with self.condition:
+                self.watched.add(message.id)
+        self.save(message)
+        self.schedule(message)
+        return message
+
+    def next_due(self, timeout: float) -> Optional[OutboxMessage]:
+        deadline = time.time() + timeout
+        with self.condition:
+            while not self.stopping:
+                now = time.time()
+                if self.heap and self.heap[0][0] <= now:
+                    _, _, message_id = heapq.heappop(self.heap)
+                    message = self.messages.get(message_id)
+                    if message is not None:
+                        return message
+                    continue
+                if now >= deadline:
+                    return None
+                wait = deadline - now
+                if self.heap:
+                    wait = min(wait, self.heap[0][0] - now)
+                self.condition.wait(wait)
+        return None
+
+    def run(self):
+        while not self.stopping:
+            message = self.next_due(KEEPALIVE_SECONDS)
+            if message is None:
+                self.pool.keepalive()
+                continue
+            self.deliver(message)
+
+    def deliver(self, message: OutboxMessage):
+        message.attempts += 1
+        self.rate.take()
+        for fresh_retry in (False, True):
+            try:
+                connection = self.pool.acquire()
+            except Exception as e:
+                self.retry_or_fail(message, e)
+                return
+            try:
+                refused = connection.smtp.sendmail(message.sender or self.config.sender, message.recipients,
+                                                   message.as_mime(self.config.sender))
+                break
+            except Exception as e:
+                # A rejected recipient leaves the session usable; anything else may not
+                broken = not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused,
+                                            smtplib.SMTPDataError))
+                self.pool.release(connection, broken=broken)
+                # The server may have dropped a pooled connection since its last use
+                if isinstance(e, smtplib.SMTPServerDisconnected) and connection.messages and not fresh_retry:
+                    continue
+                self.retry_or_fail(message, e)
+                return
+        connection.messages += 1
+        self.pool.release(connection, sent=True)
+        if refused:
+            logging.warning(f"Email {message.id[:8]}: server refused {', '.join(refused)}")
+        self.finish(message, "sent", f"refused {', '.join(refused)}" if refused else None)
+        try:
+            os.remove(self.path(message.id))
+        except FileNotFoundError:
+            pass
+        self.sent += 1
+        logging.info(f"Email {message.id[:8]} sent to {', '.join(message.to)} (attempt {message.attempts})")
+        emit_event("mail", id=message.id, status="sent", attempts=message.attempts, batch=message.batch)
+
+    def retry_or_fail(self, message: OutboxMessage, error: Exception):
+        message.last_error = f"{type(error).__name__}: {error}"[:500]
+        if is_transient(error) and message.attempts < MAX_ATTEMPTS:
+            backoff = min(RETRY_MAX, RETRY_INITIAL * 2 ** (message.attempts - 1))
+            message.next_attempt = time.time() + backoff * random.uniform(0.8, 1.2)
+            self.save(message)
+            if message.id in self.watched:
+                with self.condition:
+                    self.outcomes[message.id] = ("retrying", message.last_error)
+            logging.warning(f"Email {message.id[:8]} attempt {message.attempts} failed "
+                            f"({message.last_error}); retrying in {backoff:.0f}s")
+            emit_event("mail", id=message.id, status="retrying", attempts=message.attempts,
+                       error=message.last_error, batch=message.batch)
+            self.schedule(message)
+            return
+        self.save(message, self.failed_dir)
+        try:
+            os.remove(self.path(message.id))
+        except FileNotFoundError:
+            pass
+        self.finish(message, "failed", message.last_error)
+        self.failed += 1
+        logging.error(f"Email {message.id[:8]} to {', '.join(message.to)} failed: {message.last_error}")
+        emit_event("mail", id=message.id, status="failed", attempts=message.attempts,
+                   error=message.last_error, batch=message.batch)
+
+    def finish(self, message: OutboxMessage, status: str, error: str = None):
+        with self.condition:
+            self.messages.pop(message.id, None)
+            if message.id in self.watched:
+                self.outcomes[message.id] = (status, error)
+            self.condition.notify_all()
+
+    def wait_for(self, message_ids: List[str], timeout: float) -> dict:
+        """Wait until the messages are sent or failed; id -> (status, error), "queued" if still pending"""
+        deadline = time.time() + timeout
+        with self.condition:
+            try:
+                while any(i in self.messages for i in message_ids) and time.time() < deadline:
+                    self.condition.wait(min(0.5, deadline - time.time()))
+                results = {}
+                for message_id in message_ids:
+                    if message_id in self.messages:
+                        results[message_id] = self.outcomes.get(message_id, ("queued", None))
+                    else:
+                        results[message_id] = self.outcomes.get(message_id, ("sent", None))
+                return results
+            finally:
+                # Messages still pending are sent in the background; nobody reads their outcome any more
+                for message_id in message_ids:
+                    self.watched.discard(message_id)
+                    self.outcomes.pop(message_id, None)
+
+    def pending(self) -> int:
+        with self.condition:
+            return len(self.messages)
+
+    def flush(self, timeout: float) -> bool:
+        """Wait until nothing is due before the deadline; True when the outbox is empty"""
+        deadline = time.time() + timeout
+        with self.condition:
+            while self.messages and time.time() < deadline:
+                self.condition.wait(min(0.1, deadline - time.time()))
+            return not self.messages
+
+    def stop(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        self.pool.close_all()
+
+def process_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def orphaned_claims(outbox_dir: str) -> List[str]:
+    """Inflight directories of processes on this host that are no longer running"""
+    inflight = os.path.join(outbox_dir, INFLIGHT_DIR_NAME)
+    host = socket.gethostname()
+    orphans = []
+    try:
+        names = os.listdir(inflight)
+    except FileNotFoundError:
+        return orphans
+    for name in names:
+        owner, _, pid = name.rpartition("-")
+        if owner == host and pid.isdigit() and int(pid) != os.getpid() and not process_running(int(pid)):
+            orphans.append(os.path.join(inflight, name))
+    return orphans
+
+def release_orphaned_claims(outbox_dir: str):
+    """Hand messages claimed by a stopped process back to the outbox"""
+    for directory in orphaned_claims(outbox_dir):
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                try:
+                    os.rename(os.path.join(directory, name), os.path.join(outbox_dir, name))
+                except FileNotFoundError:
+                    continue  # another worker released it first
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+mail_queue = None
+mail_queue_lock = threading.Lock()
+
+def get_mail_queue() -> MailQueue:
+    global mail_queue
+    with mail_queue_lock:
+        if mail_queue is None:
+            mail_queue = MailQueue()
+        return mail_queue
+
+def resume_outbox():
+    """Start the senders at startup if an earlier run left mail in the outbox"""
+    try:
+        pending = any(name.endswith(".json") for name in os.listdir(OUTBOX_DIR))
+    except FileNotFoundError:
+        return
+    pending = pending or any(
+        name.endswith(".json") for directory in orphaned_claims(OUTBOX_DIR) for name in os.listdir(directory)
+    )
+    if pending and SmtpConfig().missing() is None:
+        get_mail_queue()
+
+def split_addresses(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [address.strip() for address in value.replace(";", ",").split(",") if address.strip()]
+
+def resolve_addresses(names: List[str]):
+    """
+    (addresses, [(name, candidate contacts)] for names with no clear address);
+    names without an @ are looked up in the contact directory
+    """
+    addresses, unknown = [], []
+    for name in names:
+        if "@" in name:
+            addresses.append(name)
+            continue
+        contact, candidates = lookup_contact(name, "email")
+        if contact:
+            addresses.append(contact.emails[0])
+        else:
+            unknown.append((name, candidates))
+    return addresses, unknown
+
+async def queue_email(to_email: str, subject: str, message: str, cc_email: Optional[str] = None) -> str:
+    """Shared body of the send_email tools: validate, write to the outbox, return immediately"""
+    problem = SmtpConfig().missing()
+    if problem:
+        logging.error("Mail credentials not found in environment variables")
+        return f"Email sending failed: {problem}"
+    if not split_addresses(to_email):
+        return "Email sending failed: no recipient address given."
+    to, unknown = await asyncio.to_thread(resolve_addresses, split_addresses(to_email))
+    cc, unknown_cc = await asyncio.to_thread(resolve_addresses, split_addresses(cc_email))
+    unclear = [(name, candidates) for name, candidates in unknown + unknown_cc if candidates]
+    if unclear:
+        options = " ".join(
+            f"'{name}' could be: {'; '.join(contact.describe() for contact in candidates)}."
+            for name, candidates in unclear
+        )
+        return f"Email not sent yet: {options} Ask the user which one they mean, then try again."
+    if unknown or unknown_cc:
+        names = ", ".join(f"'{name}'" for name, _ in unknown + unknown_cc)
+        return f"Email sending failed: no email address found for {names}."
+    queue = await asyncio.to_thread(get_mail_queue)
+    queued = await asyncio.to_thread(queue.enqueue, to, subject, message, cc)
+    logging.info(f"Email {queued.id[:8]} to {', '.join(to)} queued")
+    return f"Email to {', '.join(to)} queued and will be sent in the background (id {queued.id[:8]})."
+
+
+def parse_recipients(text: str) -> List[dict]:
+    """
+    Recipients with their template fields, from any of:
+      - a JSON list of addresses or of objects with an "email" key
+      - CSV with a header row that has an email column
+      - addresses separated by commas, semicolons or new lines
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        rows = json.loads(text)
+        return [{"email": row} if isinstance(row, str) else {str(k): str(v) for k, v in row.items()} for row in rows]
+    first_line = text.splitlines()[0]
+    delimiter = "\t" if "\t" in first_line else ","
+    # A header row names an "email" column; "john@email.com, jane@email.com" is just addresses
+    if any(field.strip().lower() == "email" for field in first_line.split(delimiter)):
+        dialect = csv.excel_tab if delimiter == "\t" else csv.excel
+        reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+        key = next(name for name in reader.fieldnames if name.strip().lower() == "email")
+        return [
+            {**{name.strip(): (value or "").strip() for name, value in row.items() if name}, "email": row[key].strip()}
+            for row in reader if (row.get(key) or "").strip()
+        ]
+    return [{"email": address} for address in split_addresses(text.replace("\n", ","))]
+
+def template_fields(template: Template) -> List[str]:
+    """Names of the $name / ${name} placeholders; a $ not followed by a name ("$20") is left as text"""
+    names = []
+    for match in template.pattern.finditer(template.template):
+        name = match.group("named") or match.group("braced")
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def render_batch(recipients: List[dict], subject: str, body: str):
+    """(rendered [(to, subject, body)], errors [(email, reason)]); templates are parsed once"""
+    subject_template, body_template = Template(subject), Template(body)
+    placeholders = template_fields(subject_template) + template_fields(body_template)
+    rendered, errors = [], []
+    for fields in recipients:
+        email = fields.get("email", "")
+        if "@" not in email:
+            errors.append((email or "(blank)", "not an email address"))
+            continue
+        fields = {"name": email.split("@")[0], **fields}
+        missing = [name for name in placeholders if name not in fields]
+        if missing:
+            errors.append((email, f"no value for ${missing[0]}"))
+            continue
+        rendered.append((email, subject_template.safe_substitute(fields), body_template.safe_substitute(fields)))
+    return rendered, errors
+
+async def queue_bulk_email(recipients: str, subject: str, message: str, wait_seconds: float = 60) -> str:
+    """Body of send_bulk_email: render, queue as one batch, report per-recipient outcomes"""
+    problem = SmtpConfig().missing()
+    if problem:
+        return f"Bulk email failed: {problem}"
+    try:
+        rows = parse_recipients(recipients)
+    except (ValueError, StopIteration) as e:
+        return f"Bulk email failed: could not read the recipient list ({e})."
+    if not rows:
+        return "Bulk email failed: no recipients given."
+    if len(rows) > BULK_MAX_RECIPIENTS:
+        return f"Bulk email failed: {len(rows)} recipients is more than the limit of {BULK_MAX_RECIPIENTS}."
+    rendered, errors = render_batch(rows, subject, message)
+
+    started = time.perf_counter()
+    queue = await asyncio.to_thread(get_mail_queue)
+    batch = uuid.uuid4().hex[:8]
+
+    def enqueue_all():
+        return [queue.enqueue([to], text_subject, text_body, batch=batch) for to, text_subject, text_body in rendered]
+
+    queued = await asyncio.to_thread(enqueue_all)
+    logging.info(f"Bulk email batch {batch}: {len(queued)} queued, {len(errors)} skipped")
+    outcomes = await asyncio.to_thread(queue.wait_for, [m.id for m in queued], max(0.0, float(wait_seconds)))
+    elapsed = time.perf_counter() - started
+
+    sent, failed, pending = [], [], []
+    for m in queued:
+        status, error = outcomes[m.id]
+        entry = (m.to[0], error)
+        (sent if status == "sent" else failed if status == "failed" else pending).append(entry)
+    failed = [(email, reason) for email, reason in errors] + failed
+
+    lines = [
+        f"📧 Bulk email {batch}: {len(sent)} sent, {len(failed)} failed, {len(pending)} still queued "
+        f"of {len(rows)} recipients in {elapsed:.1f}s ({len(sent) / elapsed if elapsed else 0:.1f} emails/s)"
+    ]
+    for email, note in sent[:20]:
+        lines.append(f"✅ {email}" + (f" ({note})" if note else ""))
+    if len(sent) > 20:
+        lines.append(f"✅ ... and {len(sent) - 20} more")
+    for email, reason in failed:
+        lines.append(f"❌ {email}: {reason}")
+    for email, reason in pending:
+        lines.append(f"⏳ {email}: " + (f"retrying ({reason})" if reason else "queued, will be sent in the background"))
+    return "\n".join(lines)
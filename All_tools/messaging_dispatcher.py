@@ -0,0 +1,338 @@
+"""
+One path for every WhatsApp send: backend selection, per-contact queues and duplicate suppression.
+
+Backends, fastest first:
+  desktop  the WhatsApp app; phone numbers open the chat directly through whatsapp://send
+  web      WhatsApp Web in Safari; phone numbers open web.whatsapp.com/send
+FRIDAY_WHATSAPP_BACKEND=desktop|web pins one; by default the desktop app is
+used when it is installed, and web is the fallback when a send fails there.
+
+Messages are queued per contact. Whatever is waiting for a contact when its
+turn comes is sent in one UI session (the chat is opened once), and only one
+session drives the keyboard at a time. Instead of fixed `delay` steps, each
+script polls (ui_wait) for the UI state it needs (app frontmost, search text entered,
+compose box focused, compose box cleared after sending) and only falls back to
+a short fixed wait when that state cannot be read (no Accessibility access,
+or JavaScript from Apple Events disabled in Safari).
+
+The same text to the same contact again within FRIDAY_WHATSAPP_DEDUPE_SECONDS
+(default 30) is dropped, so a repeated tool call does not message anyone twice.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import subprocess
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import List, Optional
+
+from .agent_events import emit_event
+from .contact_directory import phone_for, which_contact
+from .ui_wait import activate_and_wait, applescript_string, wait_for_frontmost, wait_until
+
+BACKEND_SETTING = os.getenv("FRIDAY_WHATSAPP_BACKEND", "auto").lower()
+DEDUPE_SECONDS = float(os.getenv("FRIDAY_WHATSAPP_DEDUPE_SECONDS", "30"))
+SCRIPT_TIMEOUT = 60
+DESKTOP_APP_PATHS = ("/Applications/WhatsApp.app", os.path.expanduser("~/Applications/WhatsApp.app"))
+
+PHONE_PATTERN = re.compile(r"^\+?[\d\s\-().]{7,}$")
+
+def phone_digits(contact: str) -> Optional[str]:
+    """Digits to dial if contact is a phone number rather than a name"""
+    if PHONE_PATTERN.match(contact.strip()):
+        return re.sub(r"\D", "", contact)
+    return None
+
+def paste_and_send(process: str, message: str, target: str, compose_ready: str, compose_empty: str) -> str:
+    """Paste message into the focused compose box, press Enter and wait until it clears"""
+    return f'''
+    set the clipboard to {applescript_string(message)}
+    {wait_until(target, compose_ready, 5, "compose box not ready", fallback=0.5, kind="element")}
+    tell application "System Events" to tell process "{process}" to keystroke "v" using {{command down}}
+    {wait_until(target, f'not ({compose_empty})', 2, "message was not pasted", fallback=0.2, kind="element")}
+    tell application "System Events" to tell process "{process}" to key code 36
+    {wait_until(target, compose_empty, 5, "message was not sent", fallback=0.3, kind="element")}
+    set sentCount to sentCount + 1
+    '''
+
+def script_wrapper(body: str) -> str:
+    """Report how many messages went out before any failure; keeps the user's clipboard"""
+    return f'''
+    set sentCount to 0
+    set savedClipboard to missing value
+    try
+        set savedClipboard to the clipboard
+    end try
+    try
+        {body}
+        try
+            if savedClipboard is not missing value then set the clipboard to savedClipboard
+        end try
+        return "sent"
+    on error errorMessage
+        try
+            if savedClipboard is not missing value then set the clipboard to savedClipboard
+        end try
+        return "Error (sent " & sentCount & "): " & errorMessage
+    end try
+    '''
+
+class DesktopBackend:
+    name = "desktop"
+    label = "WhatsApp Desktop"
+    target = 'application "System Events"'
+
+    def available(self) -> bool:
+        return any(os.path.isdir(path) for path in DESKTOP_APP_PATHS)
+
+    def focused_is(self, text: str) -> str:
+        """Condition: the focused field (search box or compose box) holds exactly text"""
+        return f'(value of (value of attribute "AXFocusedUIElement" of process "WhatsApp") as text) is {applescript_string(text)}'
+
+    def script(self, contact: str, messages: List[str]) -> str:
+        digits = phone_digits(contact)
+        if digits:
+            # The chat opens straight from the URL, with the first message already in the compose box
+            url = f"whatsapp://send?phone={digits}&text={urllib.parse.quote(messages[0])}"
+            steps = f'''
+            open location {applescript_string(url)}
+            {wait_for_frontmost("WhatsApp", 10, fallback=2)}
+            {wait_until(self.target, self.focused_is(messages[0]), 8, "chat did not open", fallback=1.5, kind="element")}
+            tell application "System Events" to tell process "WhatsApp" to key code 36
+            {wait_until(self.target, self.focused_is(""), 5, "message was not sent", fallback=0.3, kind="element")}
+            set sentCount to 1
+            '''
+            remaining = messages[1:]
+        else:
+            steps = f'''
+            {activate_and_wait("WhatsApp", window=True, fallback=2)}
+            tell application "System Events" to tell process "WhatsApp"
+                keystroke "f" using {{command down}}
+                keystroke {applescript_string(contact)}
+            end tell
+            {wait_until(self.target, self.focused_is(contact), 3, "contact search did not respond", fallback=0.5, kind="element")}
+            delay 0.3 -- search results render after the text is in the box
+            tell application "System Events" to tell process "WhatsApp" to key code 36
+            {wait_until(self.target, f"not ({self.focused_is(contact)})", 3, f"no chat found for {contact}", fallback=0.5, kind="element")}
+            '''
+            remaining = messages
+        for message in remaining:
+            steps += paste_and_send("WhatsApp", message, self.target, self.focused_is(""), self.focused_is(""))
+        return script_wrapper(steps)
+
+    def open_manually(self):
+        subprocess.run(['open', '-a', 'WhatsApp'], timeout=10)
+
+class WebBackend:
+    name = "web"
+    label = "WhatsApp Web"
+    target = 'application "Safari"'
+
+    def available(self) -> bool:
+        return True
+
+    @staticmethod
+    def javascript(expression: str) -> str:
+        """Condition for Safari: a JavaScript expression is true in the WhatsApp tab"""
+        code = applescript_string(f"String({expression})")
+        return f'(do JavaScript {code} in current tab of front window) is "true"'
+
+    def script(self, contact: str, messages: List[str]) -> str:
+        digits = phone_digits(contact)
+        compose = "document.querySelector('footer [contenteditable=\"true\"]')"
+        compose_ready = self.javascript(f"{compose} !== null && document.activeElement === {compose}")
+        compose_empty = self.javascript(f"{compose} !== null && {compose}.innerText.trim() === ''")
+        url = f"https://web.whatsapp.com/send?phone={digits}" if digits else "https://web.whatsapp.com"
+        steps = f'''
+        tell application "Safari"
+            activate
+            if (count of windows) = 0 then make new document
+            set whatsappFound to false
+            repeat with thisTab in every tab of front window
+                if URL of thisTab contains "web.whatsapp.com" then
+                    set current tab of front window to thisTab
+                    set whatsappFound to true
+                    exit repeat
+                end if
+            end repeat
+            if {"true" if digits else "not whatsappFound"} then
+                if whatsappFound then
+                    set URL of current tab of front window to {applescript_string(url)}
+                else
+                    tell front window to set current tab to (make new tab with properties {{URL:{applescript_string(url)}}})
+                end if
+            end if
+        end tell
+        {wait_until(self.target, self.javascript("document.readyState === 'complete' && document.querySelector('#side') !== null"),
+                    20, "WhatsApp Web did not load (is it logged in?)", fallback=3, kind="page")}
+        {wait_for_frontmost("Safari", 10, fallback=0.5)}
+        '''
+        if not digits:
+            focus_search = applescript_string("document.querySelector('#side [contenteditable=\"true\"]').focus()")
+            results_shown = self.javascript("document.querySelector('#pane-side [role=\"listitem\"], #pane-side [role=\"row\"]') !== null")
+            steps += f'''
+            try
+                tell application "Safari" to do JavaScript {focus_search} in current tab of front window
+            end try
+            tell application "System Events" to tell process "Safari" to keystroke {applescript_string(contact)}
+            {wait_until(self.target, results_shown, 5, f"no chat found for {contact}", fallback=1.5, kind="element")}
+            tell application "System Events" to tell process "Safari" to key code 36
+            '''
+        steps += f'''
+        {wait_until(self.target, compose_ready, 10, "chat did not open", fallback=1, kind="element")}
+        '''
+        for message in messages:
+            steps += paste_and_send("Safari", message, self.target, compose_ready, compose_empty)
+        return script_wrapper(steps)
+
+    def open_manually(self):
+        subprocess.run(['open', 'https://web.whatsapp.com'], timeout=10)
+
+BACKENDS = {backend.name: backend for backend in (DesktopBackend(), WebBackend())}
+
+class PendingMessage:
+    def __init__(self, contact: str, message: str, dedupe_key: tuple, backend: Optional[str],
+                 future: asyncio.Future, label: str = None):
+        self.contact = contact
+        self.label = label or contact
+        self.message = message
+        self.dedupe_key = dedupe_key
+        self.backend = backend
+        self.future = future
+
+def run_osascript(script: str) -> str:
+    result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=SCRIPT_TIMEOUT)
+    if result.returncode != 0:
+        return f"Error (sent 0): {result.stderr.strip() or 'osascript failed'}"
+    return result.stdout.strip()
+
+def parse_outcome(output: str, count: int):
+    """(messages sent, error or None) from a script's return value"""
+    if output == "sent":
+        return count, None
+    match = re.match(r"Error \(sent (\d+)\): (.*)", output, re.S)
+    if match:
+        return min(count, int(match.group(1))), match.group(2).strip()
+    return 0, output or "no response from osascript"
+
+class MessagingDispatcher:
+    def __init__(self, runner=run_osascript, dedupe_seconds: float = DEDUPE_SECONDS):
+        self.runner = runner
+        self.dedupe_seconds = dedupe_seconds
+        self.queues = {}  # contact key -> [PendingMessage]
+        self.workers = {}  # contact key -> asyncio.Task
+        self.ui_lock = asyncio.Lock()  # one keyboard: one UI session at a time
+        self.recent = OrderedDict()  # dedupe key -> time sent
+        self.in_flight = {}  # dedupe key -> PendingMessage
+
+    def backend_order(self, preferred: Optional[str]) -> List:
+        setting = preferred or BACKEND_SETTING
+        if setting in BACKENDS:
+            first = BACKENDS[setting]
+            return [first] + [b for b in BACKENDS.values() if b is not first and b.available()]
+        return [b for b in BACKENDS.values() if b.available()]
+
+    def duplicate_of(self, key: tuple) -> Optional[str]:
+        now = time.monotonic()
+        while self.recent and next(iter(self.recent.values())) < now - self.dedupe_seconds:
+            self.recent.popitem(last=False)
+        if key in self.in_flight:
+            return "is already being sent"
+        if key in self.recent:
+            return f"was already sent {now - self.recent[key]:.0f}s ago"
+        return None
+
+    async def send(self, contact: str, message: str, backend: Optional[str] = None, label: str = None) -> str:
+        """contact is what the UI is driven with (a name or a number); label is how results name it"""
+        contact_key = " ".join(contact.lower().split())
+        dedupe_key = (contact_key, " ".join(message.split()))
+        duplicate = self.duplicate_of(dedupe_key)
+        if duplicate:
+            logging.info(f"Dropping duplicate WhatsApp message to {contact}")
+            emit_event("whatsapp", contact=contact, status="duplicate")
+            return f"⚠️ Same message to {label or contact} {duplicate}; not sending it again."
+
+        pending = PendingMessage(contact, message, dedupe_key, backend, asyncio.get_running_loop().create_future(), label)
+        self.in_flight[dedupe_key] = pending
+        self.queues.setdefault(contact_key, []).append(pending)
+        if contact_key not in self.workers:
+            self.workers[contact_key] = asyncio.create_task(self.drain(contact_key))
+        return await pending.future
+
+    async def drain(self, contact_key: str):
+        """Send everything queued for one contact, a UI session per batch"""
+        try:
+            while self.queues.get(contact_key):
+                async with self.ui_lock:
+                    batch, self.queues[contact_key] = self.queues[contact_key], []
+                    try:
+                        await self.deliver(batch)
+                    except Exception as e:
+                        logging.error(f"Error sending WhatsApp message: {e}")
+                        for pending in batch:
+                            self.complete(pending, f"WhatsApp message भेजने में error: {str(e)}. Manual भेजना होगा।",
+                                          sent=False)
+        finally:
+            self.queues.pop(contact_key, None)
+            self.workers.pop(contact_key, None)
+
+    async def deliver(self, batch: List[PendingMessage]):
+        contact, label = batch[0].contact, batch[0].label
+        remaining = batch
+        errors = []
+        for backend in self.backend_order(batch[0].backend):
+            started = time.perf_counter()
+            output = await asyncio.to_thread(self.runner, backend.script(contact, [p.message for p in remaining]))
+            sent, error = parse_outcome(output, len(remaining))
+            elapsed = time.perf_counter() - started
+            for pending in remaining[:sent]:
+                self.complete(pending, f"✅ WhatsApp message sent to {label} via {backend.label}: '{pending.message}'")
+            emit_event("whatsapp", contact=contact, backend=backend.name, sent=sent,
+                       failed=len(remaining) - sent, seconds=round(elapsed, 3), error=error)
+            remaining = remaining[sent:]
+            if not remaining:
+                logging.info(f"WhatsApp: {sent} message(s) to {contact} via {backend.name} in {elapsed:.2f}s")
+                return
+            logging.warning(f"WhatsApp {backend.name} send to {contact} failed: {error}")
+            errors.append(f"{backend.label}: {error}")
+
+        # Every backend failed: leave WhatsApp open so the user can send by hand
+        fallback = self.backend_order(batch[0].backend)
+        try:
+            if fallback:
+                await asyncio.to_thread(fallback[-1].open_manually)
+        except Exception as e:
+            logging.error(f"Could not open WhatsApp: {e}")
+        detail = "; ".join(errors) or "no WhatsApp backend available"
+        for pending in remaining:
+            self.complete(pending, f"📱 WhatsApp खोला गया। Please manually send message to {label}: "
+                                   f"'{pending.message}' ({detail})", sent=False)
+
+    def complete(self, pending: PendingMessage, result: str, sent: bool = True):
+        self.in_flight.pop(pending.dedupe_key, None)
+        if sent:
+            self.recent[pending.dedupe_key] = time.monotonic()
+            self.recent.move_to_end(pending.dedupe_key)
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+dispatcher = None
+
+def get_dispatcher() -> MessagingDispatcher:
+    global dispatcher
+    if dispatcher is None:
+        dispatcher = MessagingDispatcher()
+    return dispatcher
+
+async def send_whatsapp(contact_name: str, message: str, backend: Optional[str] = None) -> str:
+    """Shared body of the WhatsApp tools"""
+    logging.info(f"Sending WhatsApp message to {contact_name}: {message}")
+    # A number from the contact directory opens the chat directly instead of searching by name
+    number, contact, candidates = await asyncio.to_thread(phone_for, contact_name)
+    if number is None and candidates:
+        return which_contact(contact_name, candidates)
+    label = contact.describe() if contact else contact_name
+    return await get_dispatcher().send(number or contact_name, message, backend, label)
@@ -1,14 +1,11 @@
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def get_screen_info(
     context: RunContext,  # type: ignore
 ) -> str:
@@ -139,7 +136,7 @@ async def get_screen_info(
         logging.error(f"Error getting screen info: {e}")
         return f"❌ Screen information लेने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def get_open_windows_info(
     context: RunContext,  # type: ignore
 ) -> str:
@@ -204,7 +201,7 @@ async def get_open_windows_info(
         logging.error(f"Error getting windows info: {e}")
         return f"❌ Windows information लेने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def get_browser_tabs_detailed(
     context: RunContext,  # type: ignore
     browser: str = "all"
@@ -6,15 +6,12 @@ from PIL import Image
 import pytesseract
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
 import time
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def read_screen_content(
     context: RunContext,  # type: ignore
     area: str = "full_screen"
@@ -70,7 +67,7 @@ async def read_screen_content(
         logging.error(f"Error reading screen: {e}")
         return f"Error reading screen content: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def read_browser_tab_content(
     context: RunContext,  # type: ignore
     browser_name: str = "chrome"
@@ -126,7 +123,7 @@ async def read_browser_tab_content(
         logging.error(f"Error reading browser tab: {e}")
         return f"Error reading browser tab content: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def monitor_active_application(
     context: RunContext,  # type: ignore
 ) -> str:
@@ -180,7 +177,7 @@ async def monitor_active_application(
         logging.error(f"Error monitoring application: {e}")
         return f"Error monitoring active application: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def find_text_on_screen(
     context: RunContext,  # type: ignore
     search_text: str
@@ -1,14 +1,11 @@
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def read_screen_text(
     context: RunContext,  # type: ignore,
     region: str = "full"
@@ -66,7 +63,7 @@ async def read_screen_text(
     except Exception as e:
         return f"Error reading screen text: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def analyze_screen_content(
     context: RunContext,  # type: ignore,
     analysis_type: str = "general"
@@ -199,7 +196,7 @@ SCREEN ANALYSIS:
     except Exception as e:
         return f"Error analyzing screen content: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def fill_input_field(
     context: RunContext,  # type: ignore,
     text_to_fill: str,
@@ -286,7 +283,7 @@ async def fill_input_field(
     except Exception as e:
         return f"Error filling input field: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def get_active_application_info(
     context: RunContext,  # type: ignore,
 ) -> str:
@@ -1,9 +1,11 @@
 import logging
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .tracing import start_span
 from ddgs import DDGS
 from datetime import datetime
 
-@function_tool()
+@metered_tool()
 async def search_internet(
     context: RunContext,  # type: ignore
     query: str
@@ -16,8 +18,9 @@ async def search_internet(
     """
     try:
         logging.info(f"Searching internet for: {query}")
-        with DDGS() as ddgs:
+        with start_span("ddgs.text", kind="client", attributes={"search.max_results": 5}) as span, DDGS() as ddgs:
             results = list(ddgs.text(query, max_results=5))
+            span.set_attribute("search.results", len(results))
         if results:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
             formatted_result = f"🔍 Internet Search Results (as of {current_time}):\n\n"
@@ -1,15 +1,13 @@
 import logging
 import subprocess
 import os
-import platform
 import urllib.parse
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
+from .ui_wait import activate_and_wait
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def open_website(
     context: RunContext,  # type: ignore
     website_name: str
@@ -66,7 +64,7 @@ async def open_website(
         logging.error(f"Error opening website: {e}")
         return f"Website खोलने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def search_in_browser(
     context: RunContext,  # type: ignore
     query: str,
@@ -97,9 +95,8 @@ async def search_in_browser(
         
         # AppleScript to open browser and search
         applescript = f'''
+        {activate_and_wait(app_name)}
         tell application "{app_name}"
-            activate
-            delay 1
             open location "{search_url}"
         end tell
         '''
@@ -117,7 +114,7 @@ async def search_in_browser(
         logging.error(f"Error with browser search: {e}")
         return f"Browser search में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def open_web_search(
     context: RunContext,  # type: ignore
     query: str,
@@ -164,7 +161,7 @@ async def open_web_search(
         logging.error(f"Error opening web search: {e}")
         return f"❌ Web search open करने में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def control_browser_music(
     context: RunContext,  # type: ignore
     action: str,
@@ -252,14 +249,9 @@ async def control_browser_music(
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
-
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
+from livekit.agents import RunContext
 
-@function_tool()
+@metered_tool()
 async def get_calendar_events(
     context: RunContext,  # type: ignore
     time_period: str = "today"
@@ -287,11 +279,8 @@ async def get_calendar_events(
             end tell
             '''
         else:
-            applescript = '''
-            tell application "Calendar"
-                activate
-                delay 1
-            end tell
+            applescript = f'''
+            {activate_and_wait("Calendar", window=True)}
             return "Calendar app खोला गया"
             '''
         
@@ -311,7 +300,7 @@ async def get_calendar_events(
         logging.error(f"Error checking calendar: {e}")
         return f"Calendar check में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def create_reminder(
     context: RunContext,  # type: ignore
     task: str,
@@ -364,14 +353,9 @@ async def create_reminder(
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def control_smart_home(
     context: RunContext,  # type: ignore
     device: str,
@@ -398,10 +382,7 @@ async def control_smart_home(
                 run shortcut "{shortcut_name}"
             end tell
         on error
-            tell application "Home"
-                activate
-                delay 1
-            end tell
+            {activate_and_wait("Home", window=True)}
             return "Home app खोला गया - manually control करें"
         end try
         '''
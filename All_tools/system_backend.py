@@ -0,0 +1,412 @@
+"""
+System control (volume, brightness, screenshots, lock, dark mode, Wi-Fi,
+Bluetooth, trash) behind one backend per platform, chosen once on first use.
+agent.py chooses it at startup. The tools ask the backend what it supports
+instead of checking the platform on every call.
+
+MacSystemBackend uses AppleScript and the stock command line tools.
+LinuxSystemBackend uses whatever the machine has:
+
+- volume: wpctl (PipeWire), else pactl (PulseAudio, or PipeWire's pulse server)
+- brightness: /sys/class/backlight, written directly when the user may,
+  otherwise through logind's SetBrightness over D-Bus (busctl), else brightnessctl
+- screenshots: grim (Wayland), gnome-screenshot, spectacle, scrot or ImageMagick's import;
+  wl-copy or xclip for the clipboard
+- lock: loginctl lock-session, else the org.freedesktop.ScreenSaver D-Bus interface
+- dark mode: gsettings org.gnome.desktop.interface color-scheme
+- Wi-Fi: nmcli; Bluetooth: bluetoothctl, else rfkill; trash: gio
+
+Each tool is looked up once. An operation with no tool is unsupported:
+supports() is False, unavailable() says what to install, and calling it
+raises UnsupportedOperation with that message.
+
+set_system_backend() swaps in another backend (tests, benchmarks).
+"""
+
+import glob
+import logging
+import os
+import platform
+import re
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+# Operations a backend may support
+VOLUME = "volume"
+MUTE = "mute"
+BRIGHTNESS = "brightness"
+SCREENSHOT = "screenshots"
+SCREENSHOT_CLIPBOARD = "screenshots to the clipboard"
+LOCK_SCREEN = "screen lock"
+DARK_MODE = "dark mode"
+WIFI = "Wi-Fi"
+BLUETOOTH = "Bluetooth"
+OPEN_PATH = "opening folders"
+OPEN_APP = "opening apps"
+EMPTY_TRASH = "emptying the trash"
+
+# Backend method -> the operation it performs
+OPERATION_METHODS = {
+    "get_volume": VOLUME, "set_volume": VOLUME, "mute": MUTE,
+    "get_brightness": BRIGHTNESS, "set_brightness": BRIGHTNESS,
+    "screenshot": SCREENSHOT, "lock_screen": LOCK_SCREEN, "toggle_dark_mode": DARK_MODE,
+    "toggle_wifi": WIFI, "toggle_bluetooth": BLUETOOTH, "open_path": OPEN_PATH, "open_app": OPEN_APP,
+    "empty_trash": EMPTY_TRASH,
+}
+
+class UnsupportedOperation(RuntimeError):
+    """An operation the current backend cannot do on this machine; the message says what to install"""
+
+    def __init__(self, operation: str, message: str):
+        super().__init__(message)
+        self.operation = operation
+
+def run(args: List[str], timeout: float = 10) -> str:
+    result = subprocess.run(args, capture_output=True, text=True, timeout=timeout, check=True)
+    return result.stdout.strip()
+
+def osascript(script: str) -> str:
+    return run(["osascript", "-e", script])
+
+class SystemBackend:
+    """
+    Supports nothing; subclasses fill in `tools` (operation -> how it is done)
+    and define the methods in OPERATION_METHODS for those operations
+    """
+    name = "this platform"
+
+    def __init__(self, name: Optional[str] = None):
+        if name:
+            self.name = name
+        self.tools: Dict[str, str] = {}
+
+    def supports(self, operation: str) -> bool:
+        return operation in self.tools
+
+    def tool(self, operation: str) -> str:
+        """How operation is done here; raises UnsupportedOperation when it is not"""
+        if operation not in self.tools:
+            raise UnsupportedOperation(operation, self.unavailable(operation))
+        return self.tools[operation]
+
+    def unavailable(self, operation: str) -> str:
+        return f"{operation[0].upper()}{operation[1:]} is not supported on {self.name}."
+
+    def describe(self) -> str:
+        return f"{self.name}: " + (", ".join(f"{op} via {tool}" for op, tool in self.tools.items()) or "no system control")
+
+    def __getattr__(self, attribute: str):
+        """
+        Operation methods this backend does not have raise UnsupportedOperation
+        when called (call supports() first). Only reached when normal lookup
+        fails, so a subclass's own methods always win.
+        """
+        operation = OPERATION_METHODS.get(attribute)
+        if operation is None:
+            raise AttributeError(f"{type(self).__name__} has no attribute {attribute!r}")
+        if operation in self.__dict__.get("tools", {}):
+            # Claims the operation but has no method for it: a bug, not a platform limit
+            raise AttributeError(f"{type(self).__name__} supports {operation} but does not implement {attribute}()")
+
+        def unsupported(*args, **kwargs):
+            missing = operation
+            if attribute == "screenshot" and not (args[0] if args else kwargs.get("path")):
+                missing = SCREENSHOT_CLIPBOARD
+            raise UnsupportedOperation(missing, self.unavailable(missing))
+        return unsupported
+
+class MacSystemBackend(SystemBackend):
+    """Levels are 0-100; toggles return the new state, or None when macOS does not say"""
+    name = "macOS"
+
+    def __init__(self):
+        super().__init__()
+        brightness = "brightness" if shutil.which("brightness") else "System Events"
+        self.tools = {
+            VOLUME: "osascript", MUTE: "osascript", BRIGHTNESS: brightness,
+            SCREENSHOT: "screencapture", SCREENSHOT_CLIPBOARD: "screencapture",
+            LOCK_SCREEN: "System Events", DARK_MODE: "System Events", WIFI: "networksetup",
+            BLUETOOTH: "System Preferences", OPEN_PATH: "open", OPEN_APP: "open", EMPTY_TRASH: "Finder",
+        }
+
+    def get_volume(self) -> int:
+        return int(float(osascript("output volume of (get volume settings)")))
+
+    def set_volume(self, level: int):
+        osascript(f"set volume output volume {level}")
+
+    def mute(self):
+        osascript("set volume with output muted")
+
+    def get_brightness(self) -> int:
+        if shutil.which("brightness"):
+            output = subprocess.run(["brightness", "-l"], capture_output=True, text=True, timeout=10).stdout
+            found = re.search(r"brightness ([0-9.]+)", output)
+            if found:
+                return round(float(found.group(1)) * 100)
+        return round(float(osascript('tell application "System Events" to get brightness of (first display)')) * 100)
+
+    def set_brightness(self, level: int):
+        # The brightness utility (brew install brightness) works on external displays too
+        if shutil.which("brightness"):
+            subprocess.run(["brightness", str(level / 100)], check=True, timeout=10)
+        else:
+            osascript(f'tell application "System Events" to set brightness of (first display) to {level / 100}')
+
+    def screenshot(self, path: Optional[str] = None):
+        """To path, or to the clipboard when path is None"""
+        subprocess.run(["screencapture", path] if path else ["screencapture", "-c"])
+
+    def lock_screen(self):
+        subprocess.run(["osascript", "-e", 'tell application "System Events" to keystroke "q" using {command down, control down}'])
+
+    def toggle_dark_mode(self) -> Optional[bool]:
+        script = '''
+        tell application "System Events"
+            tell appearance preferences
+                set dark mode to not dark mode
+                return dark mode
+            end tell
+        end tell
+        '''
+        return osascript(script) == "true"
+
+    def toggle_wifi(self) -> Optional[bool]:
+        result = subprocess.run(["networksetup", "-getairportpower", "en0"], capture_output=True, text=True)
+        turn_on = "On" not in result.stdout
+        subprocess.run(["networksetup", "-setairportpower", "en0", "On" if turn_on else "Off"], check=True)
+        return turn_on
+
+    def toggle_bluetooth(self) -> Optional[bool]:
+        script = '''
+        tell application "System Preferences"
+            reveal pane "com.apple.preferences.Bluetooth"
+        end tell
+        tell application "System Events"
+            tell process "System Preferences"
+                click button "Turn Bluetooth On" of window 1
+            end tell
+        end tell
+        '''
+        subprocess.run(["osascript", "-e", script], check=True)
+        return None
+
+    def open_path(self, path: str):
+        subprocess.run(["open", os.path.expanduser(path)])
+
+    def open_app(self, app: str):
+        subprocess.run(["open", "-a", app])
+
+    def empty_trash(self):
+        subprocess.run(["osascript", "-e", 'tell application "Finder" to empty trash'])
+
+# Backlight interface types, best first (see the kernel's sysfs-class-backlight ABI)
+BACKLIGHT_TYPES = ("firmware", "platform", "raw")
+
+def find_backlight() -> Optional[str]:
+    """The /sys/class/backlight device to use, or None when there is none"""
+    def preference(device: str) -> int:
+        try:
+            with open(os.path.join(device, "type")) as f:
+                return BACKLIGHT_TYPES.index(f.read().strip())
+        except (OSError, ValueError):
+            return len(BACKLIGHT_TYPES)
+    devices = sorted(glob.glob("/sys/class/backlight/*"), key=lambda device: (preference(device), device))
+    return devices[0] if devices else None
+
+class LinuxSystemBackend(SystemBackend):
+    name = "Linux"
+
+    # Operation -> tools that can do it, best first; the first one installed is used
+    CANDIDATES = {
+        VOLUME: ("wpctl", "pactl"),
+        MUTE: ("wpctl", "pactl"),
+        SCREENSHOT: ("grim", "gnome-screenshot", "spectacle", "scrot", "import"),
+        LOCK_SCREEN: ("loginctl", "dbus-send"),
+        DARK_MODE: ("gsettings",),
+        WIFI: ("nmcli",),
+        BLUETOOTH: ("bluetoothctl", "rfkill"),
+        OPEN_PATH: ("xdg-open",),
+        EMPTY_TRASH: ("gio",),
+    }
+
+    def __init__(self):
+        super().__init__()
+        wayland = bool(os.getenv("WAYLAND_DISPLAY"))
+        for operation, candidates in self.CANDIDATES.items():
+            for tool in candidates:
+                # grim only works on wlroots Wayland compositors
+                if tool == "grim" and not wayland:
+                    continue
+                if shutil.which(tool):
+                    self.tools[operation] = tool
+                    break
+        clipboard = "wl-copy" if wayland else "xclip"
+        if SCREENSHOT in self.tools and shutil.which(clipboard):
+            self.tools[SCREENSHOT_CLIPBOARD] = f"{self.tools[SCREENSHOT]} and {clipboard}"
+        elif self.tools.get(SCREENSHOT) == "gnome-screenshot":
+            self.tools[SCREENSHOT_CLIPBOARD] = "gnome-screenshot"
+        self.backlight = find_backlight()
+        if self.backlight:
+            if os.access(os.path.join(self.backlight, "brightness"), os.W_OK):
+                self.tools[BRIGHTNESS] = "sysfs"
+            elif shutil.which("busctl"):
+                self.tools[BRIGHTNESS] = "logind"
+            elif shutil.which("brightnessctl"):
+                self.tools[BRIGHTNESS] = "brightnessctl"
+
+    def unavailable(self, operation: str) -> str:
+        if operation == BRIGHTNESS and not self.backlight:
+            return "Brightness control needs a backlight in /sys/class/backlight; external monitors are not supported."
+        if operation == SCREENSHOT_CLIPBOARD and SCREENSHOT in self.tools:
+            return "Copying a screenshot to the clipboard needs wl-copy (Wayland) or xclip (X11)."
+        if operation == BRIGHTNESS:
+            candidates = ("busctl", "brightnessctl")
+        else:
+            candidates = self.CANDIDATES.get(operation)
+        if not candidates:
+            return super().unavailable(operation)
+        return f"{operation[0].upper()}{operation[1:]} on Linux: install one of {', '.join(candidates)}."
+
+    def get_volume(self) -> int:
+        if self.tool(VOLUME) == "wpctl":
+            # "Volume: 0.40" or "Volume: 0.40 [MUTED]"; above 1.0 when over-amplified
+            output = run(["wpctl", "get-volume", "@DEFAULT_AUDIO_SINK@"])
+            return round(float(re.search(r"([0-9.]+)", output).group(1)) * 100)
+        output = run(["pactl", "get-sink-volume", "@DEFAULT_SINK@"])
+        return int(re.search(r"(\d+)%", output).group(1))
+
+    def set_volume(self, level: int):
+        if self.tool(VOLUME) == "wpctl":
+            run(["wpctl", "set-mute", "@DEFAULT_AUDIO_SINK@", "0"])
+            run(["wpctl", "set-volume", "@DEFAULT_AUDIO_SINK@", f"{level / 100:.2f}"])
+        else:
+            run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"])
+            run(["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{level}%"])
+
+    def mute(self):
+        if self.tool(MUTE) == "wpctl":
+            run(["wpctl", "set-mute", "@DEFAULT_AUDIO_SINK@", "1"])
+        else:
+            run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1"])
+
+    def backlight_value(self, name: str) -> int:
+        with open(os.path.join(self.backlight, name)) as f:
+            return int(f.read().strip())
+
+    def get_brightness(self) -> int:
+        self.tool(BRIGHTNESS)
+        return round(self.backlight_value("brightness") * 100 / self.backlight_value("max_brightness"))
+
+    def set_brightness(self, level: int):
+        tool = self.tool(BRIGHTNESS)
+        value = round(level * self.backlight_value("max_brightness") / 100)
+        if tool == "sysfs":
+            with open(os.path.join(self.backlight, "brightness"), "w") as f:
+                f.write(str(value))
+        elif tool == "logind":
+            # logind lets the user of the active session set the backlight without root
+            run(["busctl", "call", "org.freedesktop.login1", "/org/freedesktop/login1/session/auto",
+                 "org.freedesktop.login1.Session", "SetBrightness", "ssu",
+                 "backlight", os.path.basename(self.backlight), str(value)])
+        else:
+            run(["brightnessctl", "--device", os.path.basename(self.backlight), "set", str(value)])
+
+    def screenshot(self, path: Optional[str] = None):
+        """To path, or to the clipboard when path is None"""
+        tool = self.tool(SCREENSHOT if path else SCREENSHOT_CLIPBOARD)
+        if path is None and tool == "gnome-screenshot":
+            run(["gnome-screenshot", "-c"], timeout=30)
+            return
+        target = path or os.path.join(tempfile.mkdtemp(prefix="friday-"), "screenshot.png")
+        command = {
+            "grim": ["grim", target],
+            "gnome-screenshot": ["gnome-screenshot", "-f", target],
+            "spectacle": ["spectacle", "-b", "-n", "-o", target],
+            "scrot": ["scrot", "--overwrite", target],
+            "import": ["import", "-window", "root", target],
+        }[self.tools[SCREENSHOT]]
+        run(command, timeout=30)
+        if path is None:
+            try:
+                with open(target, "rb") as image:
+                    if os.getenv("WAYLAND_DISPLAY"):
+                        copy = ["wl-copy", "--type", "image/png"]
+                    else:
+                        copy = ["xclip", "-selection", "clipboard", "-t", "image/png"]
+                    subprocess.run(copy, stdin=image, check=True, timeout=10)
+            finally:
+                shutil.rmtree(os.path.dirname(target), ignore_errors=True)
+
+    def lock_screen(self):
+        self.tool(LOCK_SCREEN)
+        # loginctl needs a logind session; an agent started outside one falls back to the screensaver
+        attempts = []
+        if shutil.which("loginctl"):
+            attempts.append(["loginctl", "lock-session"])
+        if shutil.which("dbus-send"):
+            attempts.append(["dbus-send", "--session", "--type=method_call", "--dest=org.freedesktop.ScreenSaver",
+                             "/org/freedesktop/ScreenSaver", "org.freedesktop.ScreenSaver.Lock"])
+        error = None
+        for args in attempts:
+            try:
+                run(args)
+                return
+            except (OSError, subprocess.SubprocessError) as e:
+                logging.debug(f"{args[0]} could not lock the screen: {e}")
+                error = e
+        raise error
+
+    def toggle_dark_mode(self) -> Optional[bool]:
+        self.tool(DARK_MODE)
+        key = ["org.gnome.desktop.interface", "color-scheme"]
+        dark = "prefer-dark" not in run(["gsettings", "get"] + key)
+        run(["gsettings", "set"] + key + ["prefer-dark" if dark else "default"])
+        return dark
+
+    def toggle_wifi(self) -> Optional[bool]:
+        self.tool(WIFI)
+        turn_on = run(["nmcli", "radio", "wifi"]) != "enabled"
+        run(["nmcli", "radio", "wifi", "on" if turn_on else "off"])
+        return turn_on
+
+    def toggle_bluetooth(self) -> Optional[bool]:
+        if self.tool(BLUETOOTH) == "bluetoothctl":
+            turn_on = not re.search(r"Powered:\s*yes", run(["bluetoothctl", "show"]))
+            run(["bluetoothctl", "power", "on" if turn_on else "off"])
+        else:
+            turn_on = bool(re.search(r"Soft blocked:\s*yes", run(["rfkill", "list", "bluetooth"])))
+            run(["rfkill", "unblock" if turn_on else "block", "bluetooth"])
+        return turn_on
+
+    def open_path(self, path: str):
+        self.tool(OPEN_PATH)
+        subprocess.run(["xdg-open", os.path.expanduser(path)])
+
+    def empty_trash(self):
+        self.tool(EMPTY_TRASH)
+        run(["gio", "trash", "--empty"])
+
+_backend: Optional[SystemBackend] = None
+
+def get_system_backend() -> SystemBackend:
+    global _backend
+    if _backend is None:
+        system = platform.system()
+        if system == "Darwin":
+            _backend = MacSystemBackend()
+        elif system == "Linux":
+            _backend = LinuxSystemBackend()
+        else:
+            _backend = SystemBackend(system)
+    return _backend
+
+def set_system_backend(backend: SystemBackend):
+    global _backend
+    _backend = backend
+
+def is_mac() -> bool:
+    """For the macOS-only tools; decided with the backend, not per call"""
+    return isinstance(get_system_backend(), MacSystemBackend)
@@ -1,14 +1,16 @@
+import asyncio
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from datetime import datetime
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
+from .file_catalog import get_catalog
+from .duplicate_finder import find_duplicates, scan_folders, HASH_NAME
+from .copy_engine import format_bytes
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
+@metered_tool()
 async def get_system_info(
     context: RunContext,  # type: ignore
     info_type: str = "general"
@@ -67,7 +69,7 @@ async def get_system_info(
         logging.error(f"Error getting system info: {e}")
         return f"System info में error: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def check_mac_permissions(
     context: RunContext,  # type: ignore
 ) -> str:
@@ -110,129 +112,151 @@ async def check_mac_permissions(
     
     return status_report + setup_instructions
 
-@function_tool()
+# Display settings for each catalog category: (label, emoji, names shown)
+DOWNLOADS_SECTIONS = [
+    ("folders", "Folders", "📁", 10),
+    ("images", "Images", "🖼️", 5),
+    ("documents", "Documents", "📄", 5),
+    ("videos", "Videos", "🎥", 3),
+    ("music", "Music", "🎵", 3),
+    ("apps", "Apps/Archives", "📦", 5),
+    ("other", "Other Files", "📋", 5),
+]
+
+@metered_tool()
 async def get_downloads_info(
     context: RunContext,  # type: ignore
+    query: str = "overview",
+    days: int = 90,
+    limit: int = 10,
+    folder: str = "~/Downloads"
 ) -> str:
     """
-    Get detailed information about Downloads folder contents
+    Get detailed information about Downloads folder contents from a cached catalog
+    Args:
+        query: What to report (overview, sizes, largest, duplicates, stale)
+        days: For "stale", files not modified in this many days
+        limit: How many files to list for largest/stale
+        folder: Watched folder to analyse (default ~/Downloads)
     """
     try:
-        downloads_path = os.path.expanduser("~/Downloads")
-        logging.info(f"Getting Downloads folder info: {downloads_path}")
+        downloads_path = os.path.expanduser(folder)
+        logging.info(f"Getting Downloads folder info: {downloads_path} ({query})")
         
         if not os.path.exists(downloads_path):
             return f"❌ Downloads folder नहीं मिला: {downloads_path}"
         
-        # Get all items
-        items = os.listdir(downloads_path)
-        
-        if not items:
-            return f"�� Downloads folder खाली है"
-        
-        # Categorize items
-        folders = []
-        images = []
-        documents = []
-        videos = []
-        music = []
-        apps = []
-        other_files = []
-        
-        # File extension mapping
-        image_exts = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic'}
-        doc_exts = {'.pdf', '.doc', '.docx', '.txt', '.rtf', '.pages', '.xlsx', '.xls', '.ppt', '.pptx'}
-        video_exts = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v', '.flv'}
-        music_exts = {'.mp3', '.m4a', '.wav', '.flac', '.aac', '.ogg'}
-        app_exts = {'.dmg', '.pkg', '.app', '.zip', '.rar', '.7z'}
-        
-        for item in items:
-            item_path = os.path.join(downloads_path, item)
-            
-            if os.path.isdir(item_path):
-                folders.append(item)
-            else:
-                _, ext = os.path.splitext(item.lower())
-                
-                if ext in image_exts:
-                    images.append(item)
-                elif ext in doc_exts:
-                    documents.append(item)
-                elif ext in video_exts:
-                    videos.append(item)
-                elif ext in music_exts:
-                    music.append(item)
-                elif ext in app_exts:
-                    apps.append(item)
-                else:
-                    other_files.append(item)
+        catalog = get_catalog()
+        await asyncio.to_thread(catalog.refresh, downloads_path)
+        totals = catalog.category_totals(downloads_path)
+        total_items = sum(count for _, count, _ in totals)
+        total_bytes = sum(size for _, _, size in totals)
+        
+        if not total_items:
+            return f"📂 Downloads folder खाली है"
+        
+        query = query.lower()
+        
+        if query == "sizes":
+            result = f"📊 Downloads by category ({format_bytes(total_bytes)} total):\n"
+            for category, count, size in totals:
+                result += f"  • {category}: {count} items, {format_bytes(size)}\n"
+            return result
+        
+        if query == "largest":
+            result = f"📦 Largest files in Downloads:\n"
+            for name, size in catalog.largest(downloads_path, limit):
+                result += f"  • {name} — {format_bytes(size)}\n"
+            return result
+        
+        if query == "stale":
+            items, count, size = catalog.stale(downloads_path, days, limit)
+            if not count:
+                return f"✅ No files older than {days} days in Downloads"
+            result = f"🕸️ {count} items ({format_bytes(size)}) not modified in {days}+ days:\n"
+            for name, item_size, mtime in items:
+                modified = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
+                result += f"  • {name} — {format_bytes(item_size)}, last modified {modified}\n"
+            return result
+        
+        if query == "duplicates":
+            groups = await asyncio.to_thread(catalog.duplicates, downloads_path)
+            if not groups:
+                return "✅ Downloads में कोई duplicate files नहीं मिलीं"
+            reclaimable = sum(size * (len(names) - 1) for _, size, names in groups)
+            result = f"👯 {len(groups)} duplicate groups, {format_bytes(reclaimable)} reclaimable:\n"
+            for _, size, names in groups[:limit]:
+                result += f"  • {format_bytes(size)} × {len(names)}: {', '.join(names)}\n"
+            return result
         
         # Build result
         result = f"📁 Downloads Folder Analysis:\n"
         result += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
         
         # Summary
-        total_items = len(items)
-        result += f"📊 कुल Items: {total_items}\n\n"
+        result += f"📊 कुल Items: {total_items} ({format_bytes(total_bytes)})\n\n"
         
         # Categories
-        if folders:
-            result += f"�� Folders ({len(folders)}):\n"
-            for folder in sorted(folders)[:10]:  # Show max 10
-                result += f"  📁 {folder}\n"
-            if len(folders) > 10:
-                result += f"  ... और {len(folders) - 10} folders\n"
+        counts = {category: (count, size) for category, count, size in totals}
+        for category, label, emoji, shown in DOWNLOADS_SECTIONS:
+            if category not in counts:
+                continue
+            count, size = counts[category]
+            size_text = f", {format_bytes(size)}" if category != "folders" else ""
+            result += f"{emoji} {label} ({count}{size_text}):\n"
+            for name in catalog.names_in_category(downloads_path, category, shown):
+                result += f"  {emoji} {name}\n"
+            if count > shown:
+                result += f"  ... और {count - shown} {label.lower()}\n"
             result += "\n"
         
-        if images:
-            result += f"🖼️ Images ({len(images)}):\n"
-            for img in sorted(images)[:5]:
-                result += f"  🖼️ {img}\n"
-            if len(images) > 5:
-                result += f"  ... और {len(images) - 5} images\n"
-            result += "\n"
-        
-        if documents:
-            result += f"📄 Documents ({len(documents)}):\n"
-            for doc in sorted(documents)[:5]:
-                result += f"  📄 {doc}\n"
-            if len(documents) > 5:
-                result += f"  ... और {len(documents) - 5} documents\n"
-            result += "\n"
+        return result.rstrip() + "\n"
         
-        if videos:
-            result += f"🎥 Videos ({len(videos)}):\n"
-            for vid in sorted(videos)[:3]:
-                result += f"  🎥 {vid}\n"
-            if len(videos) > 3:
-                result += f"  ... और {len(videos) - 3} videos\n"
-            result += "\n"
+    except Exception as e:
+        logging.error(f"Error getting downloads info: {e}")
+        return f"❌ Downloads info लेने में error: {str(e)}"
+
+@metered_tool()
+async def find_duplicate_files(
+    context: RunContext,  # type: ignore
+    folders: str = "~/Downloads",
+    recursive: bool = True,
+    min_size_kb: int = 1,
+    limit: int = 10
+) -> str:
+    """
+    Find files with identical content and report how much space deleting the copies would free
+    Args:
+        folders: Comma-separated folders to check (default ~/Downloads)
+        recursive: Whether to look inside subfolders
+        min_size_kb: Ignore files smaller than this
+        limit: How many duplicate groups to list
+    """
+    try:
+        folder_list = [os.path.expanduser(folder.strip()) for folder in folders.split(",") if folder.strip()]
+        logging.info(f"Finding duplicate files in: {folder_list}")
         
-        if music:
-            result += f"🎵 Music ({len(music)}):\n"
-            for mus in sorted(music)[:3]:
-                result += f"  🎵 {mus}\n"
-            if len(music) > 3:
-                result += f"  ... और {len(music) - 3} music files\n"
-            result += "\n"
+        missing = [folder for folder in folder_list if not os.path.isdir(folder)]
+        if missing:
+            return f"❌ Folder नहीं मिला: {', '.join(missing)}"
         
-        if apps:
-            result += f"📦 Apps/Archives ({len(apps)}):\n"
-            for app in sorted(apps)[:5]:
-                result += f"  📦 {app}\n"
-            if len(apps) > 5:
-                result += f"  ... और {len(apps) - 5} apps/archives\n"
-            result += "\n"
+        paths = await asyncio.to_thread(scan_folders, folder_list, recursive, max(1, min_size_kb * 1024))
+        groups = await asyncio.to_thread(find_duplicates, paths)
         
-        if other_files:
-            result += f"📋 Other Files ({len(other_files)}):\n"
-            for other in sorted(other_files)[:5]:
-                result += f"  📋 {other}\n"
-            if len(other_files) > 5:
-                result += f"  ... और {len(other_files) - 5} other files\n"
+        if not groups:
+            return f"✅ {len(paths)} files checked, कोई duplicate नहीं मिला"
         
+        reclaimable = sum(group.reclaimable for group in groups)
+        result = f"👯 {len(groups)} duplicate groups in {len(paths)} files ({HASH_NAME})\n"
+        result += f"💾 Reclaimable: {format_bytes(reclaimable)} ({reclaimable} bytes)\n\n"
+        for group in groups[:limit]:
+            result += f"📦 {format_bytes(group.size)} × {len(group.paths)} (keep one, free {format_bytes(group.reclaimable)}):\n"
+            for path in group.paths:
+                result += f"  • {path}\n"
+        if len(groups) > limit:
+            result += f"... और {len(groups) - limit} groups\n"
         return result
         
     except Exception as e:
-        logging.error(f"Error getting downloads info: {e}")
-        return f"❌ Downloads info लेने में error: {str(e)}" 
\ No newline at end of file
+        logging.error(f"Error finding duplicate files: {e}")
+        return f"❌ Duplicate files ढूंढने में error: {str(e)}"
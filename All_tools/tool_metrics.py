@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+
+from livekit.agents import function_tool
+
+from tool_stats import ToolStatsRegistry
+from .agent_events import emit_event
+from .tracing import start_span
+
+# Stats for tool calls made in this (agent) process
+registry = ToolStatsRegistry()
+
+# Tools report most failures as a message instead of raising
+ERROR_PREFIXES = ("❌", "Error", "Failed", "An error", "Could not")
+
+SLOW_CALL_SECONDS = 2.0
+
+# Called as guard(tool, arguments) before every tool call; a guard that returns
+# a result answers the call instead of the tool (see intent_router)
+call_guards = []
+
+def add_call_guard(guard):
+    call_guards.append(guard)
+
+def remove_call_guard(guard):
+    if guard in call_guards:
+        call_guards.remove(guard)
+
+def guarded_result(tool: str, signature, args, kwargs):
+    if not call_guards:
+        return None
+    try:
+        arguments = dict(signature.bind_partial(*args, **kwargs).arguments)
+    except TypeError:
+        arguments = dict(kwargs)
+    arguments.pop("context", None)
+    for guard in call_guards:
+        result = guard(tool, arguments)
+        if result is not None:
+            return result
+    return None
+
+def payload_size(values) -> int:
+    """Bytes of the plain (str/number/bool) values; the RunContext is not payload"""
+    size = 0
+    for value in values:
+        if isinstance(value, (str, int, float, bool)):
+            size += len(str(value).encode("utf-8"))
+        elif isinstance(value, (list, tuple, dict)):
+            size += len(repr(value).encode("utf-8"))
+    return size
+
+def error_kind(result, exception) -> str:
+    if isinstance(exception, asyncio.CancelledError):
+        return "cancelled"
+    if exception is not None:
+        return "exception"
+    if isinstance(result, str) and result.lstrip().startswith(ERROR_PREFIXES):
+        return "reported"
+    return None
+
+def record_call(tool: str, started: float, args_bytes: int, span, result=None, exception=None):
+    latency = time.perf_counter() - started
+    kind = error_kind(result, exception)
+    result_bytes = len(str(result).encode("utf-8")) if result is not None else 0
+    span.set_attribute("tool.result_bytes", result_bytes)
+    if kind:
+        span.set_attribute("tool.error_kind", kind)
+        span.record_error(exception if exception is not None else str(result)[:200])
+    registry.record(tool, latency, kind, args_bytes, result_bytes)
+    emit_event(
+        "tool_result", name=tool, latency_ms=round(latency * 1000, 2), error=kind,
+        args_bytes=args_bytes, result_bytes=result_bytes
+    )
+    if latency > SLOW_CALL_SECONDS:
+        logging.warning(f"Slow tool call: {tool} took {latency:.2f}s")
+
+def metered(fn, name: str = None):
+    """Wrap a tool function so every call is timed, sized and traced; the signature is preserved"""
+    tool = name or fn.__name__
+    signature = inspect.signature(fn)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            guarded = guarded_result(tool, signature, args, kwargs)
+            if guarded is not None:
+                return guarded
+            started = time.perf_counter()
+            args_bytes = payload_size(list(args) + list(kwargs.values()))
+            with start_span(f"tool {tool}", attributes={"tool.name": tool, "tool.args_bytes": args_bytes}) as span:
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    record_call(tool, started, args_bytes, span, exception=e)
+                    raise
+                record_call(tool, started, args_bytes, span, result=result)
+                return result
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            guarded = guarded_result(tool, signature, args, kwargs)
+            if guarded is not None:
+                return guarded
+            started = time.perf_counter()
+            args_bytes = payload_size(list(args) + list(kwargs.values()))
+            with start_span(f"tool {tool}", attributes={"tool.name": tool, "tool.args_bytes": args_bytes}) as span:
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    record_call(tool, started, args_bytes, span, exception=e)
+                    raise
+                record_call(tool, started, args_bytes, span, result=result)
+                return result
+
+    return wrapper
+
+def metered_tool(*args, **kwargs):
+    """Drop-in replacement for @function_tool() that also records call metrics"""
+    def decorator(fn):
+        return function_tool(*args, **kwargs)(metered(fn, kwargs.get("name")))
+    return decorator
+
+def log_summary(limit: int = 10):
+    """Log the tools that took the most total time in this process"""
+    rows = registry.summary()[:limit]
+    if not rows:
+        return
+    logging.info("Tool metrics (slowest total time first):")
+    for row in rows:
+        p95 = f"{row['p95_seconds'] * 1000:.0f}ms" if row["p95_seconds"] is not None else ">60s"
+        logging.info(
+            f"  {row['tool']}: {row['calls']} calls, {row['errors']} errors, "
+            f"mean {row['mean_seconds'] * 1000:.0f}ms, p95 {p95}, max {row['max_seconds'] * 1000:.0f}ms"
+        )
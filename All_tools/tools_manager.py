@@ -1,8 +1,9 @@
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
 from typing import List
 
 # Import all tools from individual files
@@ -19,8 +20,10 @@ from .file_management import (
     create_file, delete_file, read_file_content, write_file_content,
     create_folder, list_folder_contents, copy_file_or_folder, move_file_or_folder
 )
-from .communication_tools import send_email, send_whatsapp_message, make_phone_call
-from .system_info_tools import get_system_info, check_mac_permissions, get_downloads_info
+from .communication_tools import send_email, send_bulk_email, send_whatsapp_message, make_phone_call
+from .system_info_tools import (
+    get_system_info, check_mac_permissions, get_downloads_info, find_duplicate_files
+)
 from .screen_monitoring import (
     get_screen_info, get_open_windows_info, get_browser_tabs_detailed
 )
@@ -52,127 +55,7 @@ from .screen_monitoring_advanced import (
     monitor_active_application, find_text_on_screen
 )
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
-
-@function_tool()
-async def send_whatsapp_desktop_message(
-    context: RunContext,  # type: ignore
-    contact_name: str,
-    message: str
-) -> str:
-    """
-    Send WhatsApp message using WhatsApp Desktop app (not web).
-    Args:
-        contact_name: Name of the contact to send message to
-        message: Message content to send
-    """
-    try:
-        logging.info(f"Sending WhatsApp Desktop message to {contact_name}: {message}")
-        
-        if not is_mac():
-            return "This feature is only available on macOS."
-        
-        # AppleScript for WhatsApp Desktop app
-        applescript = f'''
-        try
-            tell application "WhatsApp"
-                activate
-                delay 2
-            end tell
-            
-            tell application "System Events"
-                tell process "WhatsApp"
-                    -- Search for contact
-                    keystroke "f" using {{command down}}
-                    delay 1
-                    keystroke "{contact_name}"
-                    delay 2
-                    key code 36  -- Enter key
-                    delay 1
-                    
-                    -- Type and send message
-                    keystroke "{message}"
-                    delay 0.5
-                    key code 36  -- Enter key to send
-                    delay 0.5
-                end tell
-            end tell
-            
-            return "Message sent successfully"
-            
-        on error errorMessage
-            return "Error: " & errorMessage
-        end try
-        '''
-        
-        result = subprocess.run(['osascript', '-e', applescript], 
-                              capture_output=True, text=True, timeout=60)
-        
-        if result.returncode == 0 and "successfully" in result.stdout:
-            logging.info(f"WhatsApp Desktop message sent successfully to {contact_name}")
-            return f"WhatsApp Desktop message sent to {contact_name}: '{message}'"
-        else:
-            # Fallback - open WhatsApp Desktop
-            subprocess.run(['open', '-a', 'WhatsApp'], timeout=10)
-            return f"WhatsApp Desktop opened. Please manually send message to {contact_name}: '{message}'"
-            
-    except Exception as e:
-        logging.error(f"Error sending WhatsApp Desktop message: {e}")
-        return f"Error sending WhatsApp Desktop message: {str(e)}"
-
-@function_tool()
-async def get_whatsapp_contacts(
-    context: RunContext,  # type: ignore
-) -> str:
-    """
-    Get list of recent WhatsApp contacts.
-    """
-    try:
-        logging.info("Getting WhatsApp contacts")
-        
-        if not is_mac():
-            return "This feature is only available on macOS."
-        
-        # AppleScript to get recent contacts
-        applescript = '''
-        try
-            tell application "WhatsApp"
-                activate
-                delay 2
-            end tell
-            
-            tell application "System Events"
-                tell process "WhatsApp"
-                    -- Get recent chats
-                    keystroke "1" using {command down}
-                    delay 1
-                    
-                    -- This would need more complex implementation
-                    -- For now, just return that WhatsApp is open
-                    return "WhatsApp opened - recent contacts visible"
-                end tell
-            end tell
-            
-        on error errorMessage
-            return "Error: " & errorMessage
-        end try
-        '''
-        
-        result = subprocess.run(['osascript', '-e', applescript], 
-                              capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0:
-            return "WhatsApp Desktop opened. Recent contacts are visible in the sidebar."
-        else:
-            return "Could not access WhatsApp contacts. Please open WhatsApp manually."
-            
-    except Exception as e:
-        logging.error(f"Error getting WhatsApp contacts: {e}")
-        return f"Error getting WhatsApp contacts: {str(e)}"
-
-@function_tool()
+@metered_tool()
 async def read_screen_text(
     context: RunContext,  # type: ignore,
     region: str = "full"
@@ -230,7 +113,7 @@ async def read_screen_text(
     except Exception as e:
         return f"Error reading screen text: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def analyze_screen_content(
     context: RunContext,  # type: ignore,
     analysis_type: str = "general"
@@ -363,7 +246,7 @@ SCREEN ANALYSIS:
     except Exception as e:
         return f"Error analyzing screen content: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def fill_input_field(
     context: RunContext,  # type: ignore,
     text_to_fill: str,
@@ -450,7 +333,7 @@ async def fill_input_field(
     except Exception as e:
         return f"Error filling input field: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def get_active_application_info(
     context: RunContext,  # type: ignore,
 ) -> str:
@@ -570,6 +453,7 @@ def get_all_tools() -> List:
         
         # Communication Tools
         send_email,
+        send_bulk_email,
         send_whatsapp_message,
         make_phone_call,
         
@@ -577,6 +461,7 @@ def get_all_tools() -> List:
         get_system_info,
         check_mac_permissions,
         get_downloads_info,
+        find_duplicate_files,
         
         # Screen Monitoring
         get_screen_info,
@@ -670,7 +555,7 @@ def get_tools_description() -> str:
     📁 File Management:
     - create_file: Create new files
     - delete_file: Delete files (move to trash)
-    - read_file_content: Read file content
+    - read_file_content: Read file content (line ranges, paging with page_token, tail_lines)
     - write_file_content: Write content to files
     - create_folder: Create new folders
     - list_folder_contents: List folder contents
@@ -679,13 +564,15 @@ def get_tools_description() -> str:
     
     📧 Communication Tools:
     - send_email: Send emails via Gmail
+    - send_bulk_email: Send one templated email to many recipients ($name fields), with per-recipient results
     - send_whatsapp_message: Send WhatsApp messages
     - make_phone_call: Make phone calls
     
      System Information:
     - get_system_info: Get system information (battery, storage, etc.)
     - check_mac_permissions: Check Mac permissions
-    - get_downloads_info: Get Downloads folder analysis
+    - get_downloads_info: Get Downloads folder analysis (overview, sizes, largest, duplicates, stale)
+    - find_duplicate_files: Find duplicate files and reclaimable space
     
     ️ Screen Monitoring:
     - get_screen_info: Get information about what's on screen
@@ -728,7 +615,7 @@ def get_tools_description() -> str:
     
     📱 WhatsApp Desktop Tools:
     - send_whatsapp_desktop_message: Send messages using WhatsApp Desktop app
-    - get_whatsapp_contacts: Get list of recent WhatsApp contacts
+    - get_whatsapp_contacts: Look up contacts and their numbers (optionally by name)
     
     📖 Screen Reading Tools:
     - read_screen_text: Read text from screen using OCR
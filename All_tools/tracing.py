@@ -0,0 +1,263 @@
+"""
+Turn-level tracing for the agent: spans around each voice turn, every tool
+call and outbound HTTP request, with W3C traceparent propagation.
+
+Enable with FRIDAY_TRACING:
+  file  - append OpenTelemetry-shaped spans as JSON lines to FRIDAY_TRACE_FILE
+          (default ~/.friday/traces/agent-<pid>.jsonl); read them with
+          scripts/trace_report.py
+  otlp  - hand spans to the OpenTelemetry SDK (OTEL_EXPORTER_OTLP_* settings)
+          when opentelemetry-sdk and the OTLP exporter are installed
+Unset, spans are no-ops.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
+TRACING_MODE = os.getenv("FRIDAY_TRACING", "").lower()
+if TRACING_MODE == "1":
+    TRACING_MODE = "file"
+TRACE_FILE = os.getenv("FRIDAY_TRACE_FILE") or os.path.expanduser(
+    f"~/.friday/traces/agent-{os.getpid()}.jsonl"
+)
+SERVICE_NAME = "friday-agent"
+
+current_span = contextvars.ContextVar("friday_current_span", default=None)
+
+otel_tracer = None
+if TRACING_MODE == "otlp":
+    try:
+        from opentelemetry import trace as otel_trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        otel_trace.set_tracer_provider(provider)
+        otel_tracer = otel_trace.get_tracer("friday")
+    except ImportError as e:
+        logging.warning(f"FRIDAY_TRACING=otlp needs opentelemetry-sdk and the OTLP exporter ({e}); writing spans to {TRACE_FILE}")
+        TRACING_MODE = "file"
+
+class FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def export(self, record: dict):
+        line = json.dumps(record, default=str, ensure_ascii=False) + "\n"
+        with self.lock:
+            try:
+                if self.file is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    self.file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self.file.write(line)
+            except OSError as e:
+                logging.warning(f"Could not write trace span: {e}")
+
+exporter = FileExporter(TRACE_FILE) if TRACING_MODE == "file" else None
+
+class Span:
+    """One timed operation; use as a context manager to make it the current span"""
+
+    def __init__(self, name: str, parent: "Span" = None, kind: str = "internal", attributes: dict = None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = "OK"
+        self.status_message = None
+        self.token = None
+        self.otel = None
+        if otel_tracer is not None:
+            parent_context = otel_trace.set_span_in_context(parent.otel) if parent and parent.otel else None
+            self.otel = otel_tracer.start_span(name, context=parent_context, attributes=self.attributes)
+            context = self.otel.get_span_context()
+            self.trace_id = format(context.trace_id, "032x")
+            self.span_id = format(context.span_id, "016x")
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+        if self.otel is not None:
+            self.otel.set_attribute(key, value)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes})
+        if self.otel is not None:
+            self.otel.add_event(name, attributes)
+
+    def record_error(self, error):
+        self.status = "ERROR"
+        self.status_message = str(error)[:500]
+        if self.otel is not None:
+            self.otel.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, self.status_message))
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.otel is not None:
+            self.otel.end()
+        elif exporter is not None:
+            exporter.export({
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_span_id": self.parent.span_id if self.parent else None,
+                "name": self.name,
+                "kind": self.kind,
+                "start_time_unix_nano": self.start_ns,
+                "end_time_unix_nano": self.end_ns,
+                "attributes": self.attributes,
+                "events": self.events,
+                "status": {"code": self.status, "message": self.status_message},
+                "resource": {"service.name": SERVICE_NAME, "process.pid": os.getpid(),
+                             "friday.worker_id": os.getenv("FRIDAY_WORKER_ID")},
+            })
+
+    def __enter__(self):
+        self.token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_error(exc)
+        current_span.reset(self.token)
+        self.end()
+        return False
+
+class NoopSpan:
+    """Returned when tracing is off; every operation does nothing"""
+    trace_id = span_id = traceparent = None
+    duration_ms = 0.0
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = NoopSpan()
+
+# Span that tool calls attach to when their task did not inherit a span
+# context: the model's thinking phase if one is open, else the turn
+active_parent = None
+
+def tracing_enabled() -> bool:
+    return TRACING_MODE in ("file", "otlp")
+
+def start_span(name: str, kind: str = "internal", attributes: dict = None, parent: Span = None, root: bool = False):
+    """New span under parent, else the current span, else the turn in progress"""
+    if not tracing_enabled():
+        return NOOP_SPAN
+    if not root:
+        parent = parent or current_span.get() or active_parent
+    return Span(name, parent, kind, attributes)
+
+def http_span(method: str, url: str, headers: dict = None):
+    """Client span for an outbound request; adds a traceparent header to headers"""
+    span = start_span(f"HTTP {method}", kind="client", attributes={"http.method": method, "http.url": url.split("?")[0]})
+    if headers is not None and span.traceparent:
+        headers["traceparent"] = span.traceparent
+    return span
+
+class TurnTracer:
+    """
+    One trace per voice turn, built from AgentSession events: the turn starts
+    when the user stops speaking and ends when the agent is listening again.
+    turn.response_latency_ms is the time until the agent started speaking.
+    """
+
+    def __init__(self):
+        self.turn = None
+        self.thinking = None
+        self.turn_count = 0
+
+    def set_active_parent(self):
+        global active_parent
+        candidate = self.thinking or self.turn
+        active_parent = candidate if isinstance(candidate, Span) else None
+
+    def begin_turn(self, trigger: str):
+        self.end_turn("superseded")
+        self.turn_count += 1
+        self.turn = start_span("turn", attributes={"turn.number": self.turn_count, "turn.trigger": trigger}, root=True)
+        self.set_active_parent()
+
+    def end_turn(self, reason: str):
+        if self.thinking is not None:
+            self.thinking.end()
+            self.thinking = None
+        if self.turn is not None:
+            self.turn.set_attribute("turn.end_reason", reason)
+            self.turn.end()
+            self.turn = None
+        self.set_active_parent()
+
+    def on_user_state(self, old_state: str, new_state: str):
+        if new_state == "speaking" and self.turn is not None:
+            self.end_turn("user_interrupted")
+        elif old_state == "speaking" and new_state != "speaking":
+            self.begin_turn("user_speech_end")
+
+    def on_transcript(self, transcript: str, is_final: bool):
+        if is_final and self.turn is not None:
+            self.turn.add_event("transcript", chars=len(transcript))
+
+    def on_agent_state(self, old_state: str, new_state: str):
+        if new_state == "thinking":
+            if self.turn is None:
+                self.begin_turn("agent_thinking")
+            if self.thinking is None:
+                self.thinking = start_span("model.thinking", parent=self.turn)
+        elif new_state == "speaking" and self.turn is not None:
+            if self.thinking is not None:
+                self.thinking.end()
+                self.thinking = None
+            if "turn.response_latency_ms" not in self.turn.attributes:
+                self.turn.set_attribute("turn.response_latency_ms", round(self.turn.duration_ms, 1))
+                self.turn.add_event("agent.speech_start")
+        elif new_state in ("listening", "idle") and self.turn is not None:
+            self.end_turn("completed")
+        self.set_active_parent()
+
+    def on_metrics(self, kind: str, ttft=None, duration=None):
+        if self.turn is not None:
+            self.turn.add_event("model.metrics", kind=kind, ttft=ttft, duration=duration)
+
+    def on_tools_executed(self, names):
+        if self.turn is not None:
+            self.turn.add_event("tools.executed", names=list(names))
@@ -0,0 +1,85 @@
+"""
+AppleScript building blocks that wait for a UI condition instead of a fixed `delay`.
+
+Each wait polls its condition every POLL_SECONDS (default 50 ms) and raises
+after its timeout, so an app that is already open costs one poll rather than
+the worst-case delay. Every wait also has a fallback: if the condition cannot
+be evaluated (for example Accessibility or Automation access was not granted),
+it counts as met after that many seconds.
+
+FRIDAY_UI_WAIT=fixed turns every wait into a plain `delay` of its fallback.
+benchmarks/ui_wait_bench.py compares against the original scripts instead.
+"""
+
+import os
+import re
+
+POLL_SECONDS = float(os.getenv("FRIDAY_UI_POLL_MS", "50")) / 1000
+FIXED_DELAYS = os.getenv("FRIDAY_UI_WAIT", "poll").lower() == "fixed"
+
+SYSTEM_EVENTS = 'application "System Events"'
+
+def applescript_string(text: str) -> str:
+    """text as an AppleScript string literal"""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def wait_until(target: str, condition: str, timeout: float, reason: str,
+               fallback: float = None, kind: str = "condition") -> str:
+    """
+    AppleScript that polls condition (evaluated inside `tell target`) and raises
+    reason after timeout. If the condition errors, it counts as met once
+    `fallback` seconds have passed; without a fallback it never does.
+    reason only appears as an escaped one-line string literal: it can carry a
+    contact name, and text in a comment would end at a newline and run as script.
+    """
+    if FIXED_DELAYS:
+        return f'''
+    -- ui_wait fixed {kind}:
+    delay {fallback or 0}
+    '''
+    unreadable = f"(waited >= {fallback})" if fallback is not None else "false"
+    one_line = re.sub(r"[\r\n]+", " ", reason)
+    return f'''
+    -- ui_wait {kind}:
+    set waited to 0
+    repeat
+        try
+            tell {target} to set ready to ({condition})
+        on error
+            set ready to {unreadable}
+        end try
+        if ready then exit repeat
+        if waited >= {timeout} then error {applescript_string(one_line)}
+        delay {POLL_SECONDS}
+        set waited to waited + {POLL_SECONDS}
+    end repeat
+    '''
+
+def wait_for_frontmost(process: str, timeout: float = 10, fallback: float = 1) -> str:
+    """Until process is running and frontmost"""
+    name = applescript_string(process)
+    return wait_until(SYSTEM_EVENTS, f"exists process {name} and frontmost of process {name}",
+                      timeout, f"{process} did not come to the front", fallback, kind="frontmost")
+
+def wait_for_window(process: str, timeout: float = 10, fallback: float = 1) -> str:
+    """Until process has a window (for apps whose first window appears after launch)"""
+    name = applescript_string(process)
+    return wait_until(SYSTEM_EVENTS, f"exists process {name} and (exists window 1 of process {name})",
+                      timeout, f"{process} did not open a window", fallback, kind="window")
+
+def wait_for_element(process: str, element: str, timeout: float = 5, fallback: float = 1, reason: str = None) -> str:
+    """Until an accessibility element exists, e.g. element='text field 1 of window 1'"""
+    return wait_until(SYSTEM_EVENTS, f"exists {element} of process {applescript_string(process)}",
+                      timeout, reason or f"{element} did not appear in {process}", fallback, kind="element")
+
+def activate_and_wait(app: str, process: str = None, window: bool = False,
+                      timeout: float = 10, fallback: float = 1) -> str:
+    """Bring app to the front and wait until it is there (and has a window, if asked)"""
+    process = process or app
+    script = f'''
+    tell application {applescript_string(app)} to activate
+    {wait_for_frontmost(process, timeout, fallback)}
+    '''
+    if window:
+        script += wait_for_window(process, timeout, fallback=0)
+    return script
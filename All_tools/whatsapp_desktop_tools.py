@@ -1,14 +1,17 @@
+import asyncio
 import logging
 import subprocess
 import os
-import platform
-from livekit.agents import function_tool, RunContext
+from livekit.agents import RunContext
+from .tool_metrics import metered_tool
+from .system_backend import is_mac
+from .messaging_dispatcher import send_whatsapp
+from .contact_directory import CONTACTS_DIR, get_directory
+from .ui_wait import activate_and_wait, wait_for_window
 
-def is_mac():
-    """Check if running on Mac"""
-    return platform.system() == "Darwin"
+CONTACT_LIST_LIMIT = 25
 
-@function_tool()
+@metered_tool()
 async def send_whatsapp_desktop_message(
     context: RunContext,  # type: ignore
     contact_name: str,
@@ -21,86 +24,59 @@ async def send_whatsapp_desktop_message(
         message: Message content to send
     """
     try:
-        logging.info(f"Sending WhatsApp Desktop message to {contact_name}: {message}")
-        
         if not is_mac():
             return "This feature is only available on macOS."
         
-        # AppleScript for WhatsApp Desktop app
-        applescript = f'''
-        try
-            tell application "WhatsApp"
-                activate
-                delay 2
-            end tell
-            
-            tell application "System Events"
-                tell process "WhatsApp"
-                    -- Search for contact
-                    keystroke "f" using {{command down}}
-                    delay 1
-                    keystroke "{contact_name}"
-                    delay 2
-                    key code 36  -- Enter key
-                    delay 1
-                    
-                    -- Type and send message
-                    keystroke "{message}"
-                    delay 0.5
-                    key code 36  -- Enter key to send
-                    delay 0.5
-                end tell
-            end tell
-            
-            return "Message sent successfully"
-            
-        on error errorMessage
-            return "Error: " & errorMessage
-        end try
-        '''
-        
-        result = subprocess.run(['osascript', '-e', applescript], 
-                              capture_output=True, text=True, timeout=60)
-        
-        if result.returncode == 0 and "successfully" in result.stdout:
-            logging.info(f"WhatsApp Desktop message sent successfully to {contact_name}")
-            return f"WhatsApp Desktop message sent to {contact_name}: '{message}'"
-        else:
-            # Fallback - open WhatsApp Desktop
-            subprocess.run(['open', '-a', 'WhatsApp'], timeout=10)
-            return f"WhatsApp Desktop opened. Please manually send message to {contact_name}: '{message}'"
+        return await send_whatsapp(contact_name, message, backend="desktop")
             
     except Exception as e:
         logging.error(f"Error sending WhatsApp Desktop message: {e}")
         return f"Error sending WhatsApp Desktop message: {str(e)}"
 
-@function_tool()
+@metered_tool()
 async def get_whatsapp_contacts(
     context: RunContext,  # type: ignore
+    query: str = ""
 ) -> str:
     """
-    Get list of recent WhatsApp contacts.
+    Get WhatsApp contacts with their numbers from the local contact directory.
+    Args:
+        query: Optional name (or part of one) to look up; empty lists everyone
     """
     try:
-        logging.info("Getting WhatsApp contacts")
-        
+        logging.info(f"Getting WhatsApp contacts {query}".strip())
+
+        directory = await asyncio.to_thread(get_directory)
+        if len(directory):
+            if query:
+                found = [contact for contact, _ in directory.search(query, limit=10) if contact.phones]
+            else:
+                found = sorted((c for c in directory.contacts if c.phones), key=lambda c: c.name.lower())
+            if not found:
+                return f"📇 No contact with a phone number matches '{query}'."
+            lines = [f"{contact.name} — {', '.join(contact.phones)}" for contact in found[:CONTACT_LIST_LIMIT]]
+            more = f"\n...and {len(found) - CONTACT_LIST_LIMIT} more" if len(found) > CONTACT_LIST_LIMIT else ""
+            return f"📇 {len(found)} contacts:\n" + "\n".join(lines) + more
+
+        hint = f"Add a vCard or CSV export of your contacts to {CONTACTS_DIR} to look them up by name."
         if not is_mac():
-            return "This feature is only available on macOS."
+            return f"No contacts imported yet. {hint}"
         
         # AppleScript to get recent contacts
-        applescript = '''
+        applescript = f'''
         try
-            tell application "WhatsApp"
-                activate
-                delay 2
-            end tell
+            {activate_and_wait("WhatsApp", window=True, fallback=2)}
             
             tell application "System Events"
                 tell process "WhatsApp"
                     -- Get recent chats
-                    keystroke "1" using {command down}
-                    delay 1
-                    
+                    keystroke "1" using {{command down}}
+                end tell
+            end tell
+            {wait_for_window("WhatsApp", fallback=1)}
+            
+            tell application "System Events"
+                tell process "WhatsApp"
                     -- This would need more complex implementation
                     -- For now, just return that WhatsApp is open
                     return "WhatsApp opened - recent contacts visible"
@@ -116,7 +92,7 @@ async def get_whatsapp_contacts(
                               capture_output=True, text=True, timeout=30)
         
         if result.returncode == 0:
-            return "WhatsApp Desktop opened. Recent contacts are visible in the sidebar."
+            return f"WhatsApp Desktop opened. Recent contacts are visible in the sidebar. {hint}"
         else:
             return "Could not access WhatsApp contacts. Please open WhatsApp manually."
             
@@ -1,3 +1,9 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+
 from dotenv import load_dotenv
 
 from livekit import agents
@@ -9,11 +15,22 @@ from livekit.plugins import google
 from prompts import AGENT_INSTRUCTION, SESSION_INSTRUCTION
 from tools import get_weather, search_web, send_email
 from All_tools.tools_manager import get_all_tools, get_tools_description
+from All_tools.agent_events import emit_event
+from All_tools.tool_metrics import log_summary
+from All_tools.tracing import TurnTracer, tracing_enabled
+from All_tools.loop_watchdog import start_watchdog
+from All_tools.mail_queue import resume_outbox
+from All_tools.contact_directory import refresh_contacts
+from All_tools.intent_router import start_fast_path
+from All_tools.device_control import get_device_control
+from All_tools.system_backend import get_system_backend
 from All_tools.screen_monitoring_advanced import (
     read_screen_content, read_browser_tab_content,
     monitor_active_application, find_text_on_screen
 )
 load_dotenv()
+# Pick the platform's system control backend once, before any session (and before a standby handoff)
+get_system_backend()
 
 
 class Assistant(Agent):
@@ -47,10 +64,81 @@ Use appropriate tools based on user requests.
         self.config.instructions += f"\n\nAvailable Tools:\n{tools_desc}"
 
 
+def attach_session_events(session: AgentSession, fast_path=None):
+    """Forward session lifecycle, tool calls and latency metrics to the control plane,
+    trace each voice turn when FRIDAY_TRACING is set, and hand final transcripts
+    to the intent fast path when it is enabled"""
+    tracer = TurnTracer() if tracing_enabled() else None
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(event):
+        emit_event("agent_state", old=event.old_state, new=event.new_state)
+        if tracer:
+            tracer.on_agent_state(event.old_state, event.new_state)
+
+    @session.on("user_state_changed")
+    def on_user_state_changed(event):
+        if tracer:
+            tracer.on_user_state(event.old_state, event.new_state)
+
+    @session.on("user_input_transcribed")
+    def on_user_input_transcribed(event):
+        if tracer:
+            tracer.on_transcript(event.transcript, event.is_final)
+        if fast_path:
+            fast_path.on_transcript(session, event.transcript, event.is_final)
+
+    @session.on("function_tools_executed")
+    def on_function_tools_executed(event):
+        for call in event.function_calls:
+            emit_event("tool_call", name=call.name)
+        if tracer:
+            tracer.on_tools_executed(call.name for call in event.function_calls)
+
+    @session.on("metrics_collected")
+    def on_metrics_collected(event):
+        metrics = event.metrics
+        kind = type(metrics).__name__
+        ttft = getattr(metrics, "ttft", None)
+        duration = getattr(metrics, "duration", None)
+        emit_event("latency", kind=kind, ttft=ttft, duration=duration)
+        if tracer:
+            tracer.on_metrics(kind, ttft, duration)
+
+    return tracer
+
+
 async def entrypoint(ctx: agents.JobContext):
     session = AgentSession(
         
     )
+    # Opt-in (FRIDAY_INTENT_FASTPATH=1): run simple system commands without a model round trip
+    fast_path = start_fast_path(get_all_tools())
+    tracer = attach_session_events(session, fast_path)
+    # Opt-in (FRIDAY_LOOP_WATCHDOG=1): report tools that block the event loop
+    watchdog = start_watchdog()
+    # Deliver mail a previous run queued but did not get to send
+    await asyncio.to_thread(resume_outbox)
+    # Re-import changed contact files (and the Contacts app when due) without holding up the session
+    asyncio.get_running_loop().run_in_executor(None, refresh_contacts)
+    logging.info(f"System control: {get_system_backend().describe()}")
+
+    # Lets the control plane count sessions per worker for least-loaded assignment
+    emit_event("session", status="started", room=ctx.room.name)
+
+    async def report_session_end():
+        emit_event("session", status="ended", room=ctx.room.name)
+        if tracer:
+            tracer.end_turn("session_ended")
+        log_summary()
+        if watchdog:
+            watchdog.log_summary()
+        if fast_path:
+            fast_path.close()
+            fast_path.stats.log_summary()
+        get_device_control().log_summary()
+
+    ctx.add_shutdown_callback(report_session_end)
 
     await session.start(
         room=ctx.room,
@@ -71,5 +159,26 @@ async def entrypoint(ctx: agents.JobContext):
     )
 
 
+def wait_for_handoff():
+    """
+    Warm standby mode (used by agent_supervisor): every import above is already
+    done, so announce readiness and block until the control plane hands off.
+    """
+    print("FRIDAY_READY", flush=True)
+    line = sys.stdin.readline()
+    if not line:
+        sys.exit(0)  # control plane went away before handing off
+    handoff = json.loads(line)
+    sys.argv = [sys.argv[0]] + handoff.get("argv", [])
+
+
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    if os.getenv("FRIDAY_STANDBY") == "1":
+        wait_for_handoff()
+    agents.cli.run_app(agents.WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        # Set per worker by the control plane's worker pool; an agent name
+        # switches LiveKit to explicit dispatch to this worker
+        agent_name=os.getenv("FRIDAY_AGENT_NAME", ""),
+        port=int(os.getenv("FRIDAY_WORKER_PORT", "8081")),
+    ))
\ No newline at end of file
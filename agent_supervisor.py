@@ -0,0 +1,344 @@
+"""
+Agent process supervisor for the web control plane.
+
+Keeps a pre-warmed `agent.py` process (imports and plugins already loaded)
+waiting on stdin, so starting the assistant is a handoff instead of a cold
+interpreter start. Crashed agents are restarted with exponential backoff.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from log_pump import LogBuffer, start_pump
+
+# Lifecycle states
+STOPPED = "stopped"
+STARTING = "starting"
+READY = "ready"
+RUNNING = "running"
+STOPPING = "stopping"
+CRASHED = "crashed"
+
+READY_MARKER = "FRIDAY_READY"
+EVENT_PREFIX = "FRIDAY_EVENT "
+
+# Restart backoff: 1s, 2s, 4s ... capped, reset after a stable run
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+STABLE_RUN_SECONDS = 60.0
+
+class AgentProcess:
+    """One agent.py child process, either in standby or serving"""
+
+    def __init__(self, command, extra_env=None):
+        env = dict(os.environ, FRIDAY_STANDBY="1", FRIDAY_EVENTS="1", PYTHONUNBUFFERED="1", **(extra_env or {}))
+        self.popen = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            env=env
+        )
+        self.pid = self.popen.pid
+        self.ready = threading.Event()
+        self.started_at = time.time()
+        self.handed_off_at = None
+
+    def handoff(self, argv):
+        """Release the standby process into agents.cli.run_app(argv)"""
+        self.popen.stdin.write(json.dumps({"argv": argv}) + "\n")
+        self.popen.stdin.flush()
+        self.handed_off_at = time.time()
+
+    def terminate(self, timeout: float = 5.0):
+        if self.popen.poll() is not None:
+            return
+        self.popen.terminate()
+        try:
+            self.popen.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # Force kill if it doesn't terminate gracefully
+            self.popen.kill()
+            self.popen.wait()
+
+class AgentSupervisor:
+    """
+    Lock-protected state machine around the agent process:
+    stopped -> starting -> ready -> running -> stopping -> stopped,
+    with running -> crashed -> (backoff) -> running on unexpected exits.
+    """
+
+    def __init__(self, command=None, agent_args=None, warm_standby: bool = True, listener=None, logs=None,
+                 env=None, name: str = "Agent"):
+        self.command = command or [sys.executable, "agent.py"]
+        self.agent_args = agent_args or os.environ.get("FRIDAY_AGENT_ARGS", "start").split()
+        self.warm_standby = warm_standby
+        self.condition = threading.Condition()
+        self.state = STOPPED
+        self.active = None
+        self.standby = None
+        self.desired_running = False
+        self.backoff = BACKOFF_INITIAL
+        self.last_error = None
+        self.restarts = 0
+        self.closed = False
+        # listener(event_type, data) receives state changes and agent events
+        self.listener = listener
+        # Output of every child process, drained continuously so it can never block on a full pipe
+        self.logs = logs or LogBuffer()
+        # Extra environment for every child (worker id, ports) and a name for messages
+        self.env = env or {}
+        self.name = name
+
+    # --- state helpers (call with self.condition held) ---
+
+    def transition(self, new_state: str):
+        if new_state != self.state:
+            print(f"{self.name} state: {self.state} -> {new_state}")
+            previous, self.state = self.state, new_state
+            self.condition.notify_all()
+            self.notify("state", dict(self.status(), previous=previous))
+
+    def notify(self, event_type: str, data: dict):
+        if self.listener is None:
+            return
+        try:
+            self.listener(event_type, data)
+        except Exception as e:
+            print(f"Error publishing {event_type} event: {e}")
+
+    def spawn_standby(self):
+        if self.standby is not None:
+            return
+        try:
+            process = AgentProcess(self.command, self.env)
+        except OSError as e:
+            self.last_error = f"Could not spawn agent: {e}"
+            print(self.last_error)
+            return
+        self.standby = process
+        if self.state in (STOPPED, CRASHED) and not self.desired_running:
+            self.transition(STARTING)
+        threading.Thread(target=self.watch, args=(process,), daemon=True).start()
+        print(f"{self.name} standby spawned with PID: {process.pid}")
+
+    def activate_standby(self):
+        """Hand the ready standby off as the serving agent"""
+        process = self.standby
+        self.standby = None
+        process.handoff(self.agent_args)
+        self.active = process
+        self.transition(RUNNING)
+        print(f"{self.name} started with PID: {process.pid}")
+        if self.warm_standby:
+            self.spawn_standby()
+
+    # --- child process monitoring ---
+
+    def watch(self, process: AgentProcess):
+        """Drain the child's output until it exits, then update the state machine"""
+        stderr_pump = start_pump(process.popen.stderr, self.logs, "stderr", process.pid)
+        start_pump(
+            process.popen.stdout, self.logs, "stdout", process.pid,
+            on_line=lambda line: self.handle_control_line(process, line)
+        ).join()
+        stderr_pump.join()
+
+        returncode = process.popen.wait()
+        with self.condition:
+            if self.closed:
+                return
+            if process is self.standby:
+                self.standby = None
+                self.last_error = f"Standby agent exited with code {returncode}"
+                print(self.last_error)
+                if self.state in (STARTING, READY) and not self.desired_running:
+                    self.transition(CRASHED)
+                self.schedule_restart(standby_only=True)
+            elif process is self.active:
+                self.active = None
+                if self.state == STOPPING or not self.desired_running:
+                    self.transition(STOPPED)
+                else:
+                    self.last_error = f"Agent exited unexpectedly with code {returncode}"
+                    print(self.last_error)
+                    ran_for = time.time() - (process.handed_off_at or process.started_at)
+                    if ran_for > STABLE_RUN_SECONDS:
+                        self.backoff = BACKOFF_INITIAL
+                    self.transition(CRASHED)
+                    self.schedule_restart()
+            self.condition.notify_all()
+
+    def handle_control_line(self, process: AgentProcess, line: str) -> bool:
+        """Readiness markers and events on stdout; returns False for ordinary log lines"""
+        if line == READY_MARKER:
+            with self.condition:
+                process.ready.set()
+                if process is self.standby and self.state in (STARTING, STOPPED, CRASHED) \
+                        and not self.desired_running:
+                    self.transition(READY)
+                self.condition.notify_all()
+            return True
+        if line.startswith(EVENT_PREFIX):
+            self.forward_event(process, line[len(EVENT_PREFIX):])
+            return True
+        return False
+
+    def forward_event(self, process: AgentProcess, payload: str):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            self.logs.append("stdout", process.pid, f"Malformed event: {payload}")
+            return
+        event_type = data.pop("event", "agent")
+        data["pid"] = process.pid
+        self.notify(event_type, data)
+
+    def schedule_restart(self, standby_only: bool = False):
+        delay = self.backoff
+        self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+        print(f"Restarting {self.name.lower()} in {delay:.1f}s")
+        timer = threading.Timer(delay, self.restart, kwargs={"standby_only": standby_only})
+        timer.daemon = True
+        timer.start()
+
+    def restart(self, standby_only: bool = False):
+        with self.condition:
+            if standby_only:
+                if self.warm_standby or self.desired_running:
+                    self.spawn_standby()
+                return
+            if not self.desired_running or self.active is not None:
+                return
+            self.restarts += 1
+            self.spawn_standby()
+            self.transition(STARTING)
+            threading.Thread(target=self.wait_and_activate, daemon=True).start()
+
+    def wait_and_activate(self, timeout: float = 60.0):
+        with self.condition:
+            ok = self.condition.wait_for(
+                lambda: not self.desired_running or (self.standby is not None and self.standby.ready.is_set()),
+                timeout=timeout
+            )
+            if not self.desired_running or self.active is not None:
+                return
+            if ok and self.standby is not None:
+                self.activate_standby()
+            else:
+                self.last_error = "Agent did not become ready in time"
+                self.transition(CRASHED)
+                self.schedule_restart()
+
+    # --- public API used by app.py ---
+
+    def warm_up(self):
+        """Spawn the standby process ahead of the first start request"""
+        with self.condition:
+            if self.warm_standby:
+                self.spawn_standby()
+
+    def start(self, timeout: float = 60.0, wait: bool = True):
+        """
+        Start serving; returns (ok, message). With wait=False it returns at once
+        and a cold start finishes in the background (watch the state events).
+        """
+        with self.condition:
+            if self.state == RUNNING or self.active is not None:
+                return False, "Agent is already running"
+            if self.state == STOPPING:
+                return False, "Agent is stopping, try again in a moment"
+            if self.desired_running and self.state == STARTING and not wait:
+                return True, "Agent is starting"
+
+            self.desired_running = True
+            self.backoff = BACKOFF_INITIAL
+            if self.standby is None:
+                self.spawn_standby()
+            if self.standby is None:
+                self.desired_running = False
+                return False, self.last_error or "Failed to start agent"
+            if not self.standby.ready.is_set():
+                self.transition(STARTING)
+                if not wait:
+                    threading.Thread(target=self.wait_and_activate, args=(timeout,), daemon=True).start()
+                    return True, "Agent is starting"
+
+            ready = self.condition.wait_for(
+                lambda: self.standby is None or self.standby.ready.is_set() or self.active is not None,
+                timeout=timeout
+            )
+            if self.active is not None:
+                return True, "Agent started successfully"
+            if not ready or self.standby is None:
+                self.desired_running = False
+                self.transition(CRASHED)
+                return False, self.last_error or "Agent did not become ready in time"
+
+            self.activate_standby()
+            return True, "Agent started successfully"
+
+    def stop(self, timeout: float = 5.0, wait: bool = True):
+        """
+        Stop serving (the warm standby stays up); returns (ok, message).
+        With wait=False the process is terminated in the background.
+        """
+        with self.condition:
+            was_starting = self.desired_running and self.state == STARTING
+            self.desired_running = False
+            process = self.active
+            if process is None:
+                if self.state == CRASHED:
+                    self.transition(READY if self.standby and self.standby.ready.is_set() else STOPPED)
+                if was_starting:
+                    # The pending start sees desired_running is False and gives up
+                    self.condition.notify_all()
+                    return True, "Agent start cancelled"
+                return False, "Agent is not running"
+            self.transition(STOPPING)
+
+        if not wait:
+            threading.Thread(target=self.finish_stop, args=(process, timeout), daemon=True).start()
+            return True, "Agent is stopping"
+        self.finish_stop(process, timeout)
+        return True, "Agent stopped successfully"
+
+    def finish_stop(self, process: AgentProcess, timeout: float):
+        process.terminate(timeout)
+
+        with self.condition:
+            self.condition.wait_for(lambda: self.active is not process, timeout=timeout)
+            if self.active is process:
+                self.active = None
+                self.transition(STOPPED)
+            if self.standby is not None and self.standby.ready.is_set() and not self.desired_running:
+                self.transition(READY)
+
+    def shutdown(self):
+        """Terminate every child process (used on control plane exit)"""
+        with self.condition:
+            self.closed = True
+            self.desired_running = False
+            self.warm_standby = False
+            processes = [p for p in (self.active, self.standby) if p is not None]
+        for process in processes:
+            process.terminate()
+
+    def status(self) -> dict:
+        with self.condition:
+            return {
+                "state": self.state,
+                "running": self.state == RUNNING,
+                "pid": self.active.pid if self.active else None,
+                "standby_pid": self.standby.pid if self.standby else None,
+                "standby_ready": bool(self.standby and self.standby.ready.is_set()),
+                "restarts": self.restarts,
+                "last_error": self.last_error,
+            }
@@ -1,15 +1,70 @@
-from flask import Flask, render_template, jsonify, request
-import subprocess
-import threading
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
+import atexit
+import json
 import os
-import signal
-import time
+
+from worker_pool import WorkerPool
+from event_bus import EventBus
+from log_pump import LogBuffer, DEFAULT_BUFFER_LINES
+from tool_stats import LoopStatsRegistry, ToolStatsRegistry
 
 app = Flask(__name__)
 
-# Global variable to store the agent process
-agent_process = None
-is_running = False
+# Dashboards subscribe to this bus instead of polling
+events = EventBus()
+SSE_KEEPALIVE_SECONDS = 15
+LONG_POLL_MAX_SECONDS = 30
+
+# Recent agent output, optionally mirrored to a rotating file
+agent_logs = LogBuffer(
+    capacity=int(os.environ.get('FRIDAY_AGENT_LOG_LINES', DEFAULT_BUFFER_LINES)),
+    log_file=os.environ.get('FRIDAY_AGENT_LOG_FILE')
+)
+LOG_TAIL_DEFAULT = 200
+LOG_FOLLOW_POLL_SECONDS = 15
+
+# Tool call metrics reported by every worker, served at /metrics
+tool_stats = ToolStatsRegistry()
+loop_stats = LoopStatsRegistry()
+
+def on_agent_event(event_type, data):
+    worker = str(data.get('worker_id', ''))
+    if event_type == 'tool_result':
+        tool_stats.record(
+            data.get('name', 'unknown'),
+            (data.get('latency_ms') or 0) / 1000,
+            data.get('error'),
+            data.get('args_bytes') or 0,
+            data.get('result_bytes') or 0,
+            worker=worker
+        )
+    elif event_type == 'loop_block':
+        loop_stats.record_block((data.get('duration_ms') or 0) / 1000, data.get('tool') or '',
+                                data.get('site') or '', worker=worker)
+    elif event_type == 'loop_lag':
+        loop_stats.record_lag((data.get('max_ms') or 0) / 1000, (data.get('p99_ms') or 0) / 1000, worker=worker)
+    events.publish(event_type, data)
+
+# Supervised agent workers (one by default), each with its own warm standby
+pool = WorkerPool(
+    size=int(os.environ.get('FRIDAY_WORKERS', 1)),
+    warm_standby=os.environ.get('FRIDAY_WARM_STANDBY', '1') == '1',
+    listener=on_agent_event,
+    logs=agent_logs,
+    base_port=int(os.environ.get('FRIDAY_WORKER_BASE_PORT', 8081)),
+    explicit_dispatch=os.environ.get('FRIDAY_EXPLICIT_DISPATCH') == '1'
+)
+atexit.register(pool.shutdown)
+warmed_up = False
+
+@app.before_request
+def warm_up_agent():
+    # Warm the standby on the first request (not at import, so the
+    # debug reloader's parent process does not spawn one too)
+    global warmed_up
+    if not warmed_up:
+        warmed_up = True
+        pool.warm_up()
 
 @app.route('/')
 def index():
@@ -17,87 +72,195 @@ def index():
 
 @app.route('/start_agent', methods=['POST'])
 def start_agent():
-    global agent_process, is_running
-    
-    if is_running:
-        return jsonify({'status': 'error', 'message': 'Agent is already running'})
-    
     try:
-        # Start the agent in a separate thread
-        def run_agent():
-            global agent_process, is_running
-            try:
-                # Run agent.py
-                agent_process = subprocess.Popen(
-                    ['python', 'agent.py'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                is_running = True
-                print(f"Agent started with PID: {agent_process.pid}")
-                
-                # Wait for the process to complete
-                agent_process.wait()
-            except Exception as e:
-                print(f"Error running agent: {e}")
-            finally:
-                is_running = False
-                agent_process = None
-        
-        # Start the agent in a background thread
-        thread = threading.Thread(target=run_agent, daemon=True)
-        thread.start()
-        
-        # Wait a moment to ensure the process starts
-        time.sleep(1)
-        
-        if is_running:
-            return jsonify({'status': 'success', 'message': 'Agent started successfully'})
+        # Hands off to the pre-warmed standbys; a cold start finishes in the
+        # background and is reported on /events (?wait=1 blocks until running)
+        ok, message = pool.start(wait=request.args.get('wait') == '1')
+        if ok:
+            return jsonify({'status': 'success', 'message': message, 'state': pool.status()['state']})
         else:
-            return jsonify({'status': 'error', 'message': 'Failed to start agent'})
+            return jsonify({'status': 'error', 'message': message, 'state': pool.status()['state']})
             
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Error: {str(e)}'})
 
 @app.route('/stop_agent', methods=['POST'])
 def stop_agent():
-    global agent_process, is_running
-    
-    if not is_running or agent_process is None:
-        return jsonify({'status': 'error', 'message': 'Agent is not running'})
-    
     try:
-        # Terminate the agent process
-        agent_process.terminate()
-        
-        # Wait for a moment for graceful shutdown
-        try:
-            agent_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            # Force kill if it doesn't terminate gracefully
-            agent_process.kill()
-        
-        is_running = False
-        agent_process = None
-        
-        return jsonify({'status': 'success', 'message': 'Agent stopped successfully'})
+        # Terminates in the background unless ?wait=1
+        ok, message = pool.stop(wait=request.args.get('wait') == '1')
+        status = 'success' if ok else 'error'
+        return jsonify({'status': status, 'message': message, 'state': pool.status()['state']})
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Error stopping agent: {str(e)}'})
 
+def long_poll_wait(args) -> float:
+    return max(0.0, min(args.get('wait', default=LONG_POLL_MAX_SECONDS, type=float), LONG_POLL_MAX_SECONDS))
+
 @app.route('/status')
 def get_status():
-    global is_running
-    return jsonify({'running': is_running})
+    # Long-polling fallback: /status?since=<event id>&wait=<seconds>
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify(dict(pool.status(), last_event_id=events.last_id))
+    
+    wait = long_poll_wait(request.args)
+    new_events = events.events_since(since, timeout=wait)
+    return jsonify(dict(
+        pool.status(),
+        last_event_id=new_events[-1].id if new_events else since,
+        events=[event.to_dict() for event in new_events]
+    ))
+
+@app.route('/events')
+def event_stream():
+    # Server-sent events: state transitions, tool calls and latency metrics as they happen
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = events.subscribe(last_event_id)
+    
+    def generate():
+        try:
+            yield "retry: 3000\n"
+            yield f"event: status\ndata: {json.dumps(pool.status())}\n\n"
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield event.to_sse()
+        finally:
+            subscription.close()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/workers')
+def list_workers():
+    # Per-worker state, sessions and CPU/memory, plus per-session capacity figures
+    return jsonify(pool.workers_status())
+
+@app.route('/workers/scale', methods=['POST'])
+def scale_workers():
+    payload = request.get_json(silent=True) or {}
+    count = payload.get('count', request.args.get('count', type=int))
+    if not isinstance(count, int) or count < 1:
+        return jsonify({'status': 'error', 'message': 'count must be a positive integer'}), 400
+    try:
+        ok, message = pool.scale(count)
+        return jsonify({'status': 'success' if ok else 'error', 'message': message, **pool.workers_status()})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Error scaling workers: {str(e)}'})
+
+@app.route('/workers/<int:worker_id>/start', methods=['POST'])
+def start_worker(worker_id):
+    try:
+        ok, message = pool.start(worker_id)
+        return jsonify({'status': 'success' if ok else 'error', 'message': message, 'worker_id': worker_id})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Error: {str(e)}'})
+
+@app.route('/workers/<int:worker_id>/stop', methods=['POST'])
+def stop_worker(worker_id):
+    try:
+        ok, message = pool.stop(worker_id)
+        return jsonify({'status': 'success' if ok else 'error', 'message': message, 'worker_id': worker_id})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Error stopping worker: {str(e)}'})
+
+@app.route('/workers/assign', methods=['POST'])
+def assign_worker():
+    # Least-loaded running worker for a new room; with FRIDAY_EXPLICIT_DISPATCH=1
+    # dispatch the room to the returned agent_name
+    payload = request.get_json(silent=True) or {}
+    worker = pool.assign(payload.get('room') or request.args.get('room'))
+    if worker is None:
+        return jsonify({'status': 'error', 'message': 'No running workers'}), 503
+    return jsonify({'status': 'success', 'worker': worker})
+
+@app.route('/metrics')
+def metrics():
+    # Prometheus text format: per-tool calls, errors, latency and payload histograms,
+    # agent event-loop lag and blocking, plus pool gauges
+    status = pool.status()
+    lines = [
+        "# HELP friday_workers Agent workers in the pool.",
+        "# TYPE friday_workers gauge",
+        f"friday_workers {status['workers']}",
+        "# HELP friday_workers_running Agent workers currently serving.",
+        "# TYPE friday_workers_running gauge",
+        f"friday_workers_running {status['running_workers']}",
+        "# HELP friday_sessions Active voice sessions across workers.",
+        "# TYPE friday_sessions gauge",
+        f"friday_sessions {status['sessions']}",
+        "# HELP friday_agent_restarts_total Automatic restarts after agent crashes.",
+        "# TYPE friday_agent_restarts_total counter",
+        f"friday_agent_restarts_total {status['restarts']}",
+        "# HELP friday_event_subscribers Open dashboard event streams.",
+        "# TYPE friday_event_subscribers gauge",
+        f"friday_event_subscribers {events.subscriber_count}",
+    ]
+    body = "\n".join(lines) + "\n" + tool_stats.render_prometheus() + loop_stats.render_prometheus()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/tools')
+def tool_metrics_summary():
+    # Slowest tools first, for quick inspection without a Prometheus server
+    return jsonify({'tools': tool_stats.summary()})
+
+def parse_log_query(args):
+    """(tail, stream, pid) from /logs query args; LookupError for a worker that is not running"""
+    tail = max(0, args.get('tail', default=LOG_TAIL_DEFAULT, type=int))
+    stream = args.get('stream') or None
+    pid = args.get('pid', type=int)
+    worker_id = args.get('worker', type=int)
+    if worker_id is not None:
+        pid = pool.pid_of(worker_id)
+        if pid is None:
+            raise LookupError(f'Worker {worker_id} is not running')
+    return tail, stream, pid
+
+@app.route('/logs')
+def get_logs():
+    # /logs?tail=N[&stream=stdout|stderr][&pid=N|&worker=N][&follow=1]
+    try:
+        tail, stream, pid = parse_log_query(request.args)
+    except LookupError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 404
+    recent, cursor = agent_logs.tail(tail, stream=stream, pid=pid)
+    
+    if request.args.get('follow') != '1':
+        return jsonify({'lines': [line.to_dict() for line in recent], 'last_seq': cursor})
+    
+    def generate():
+        # Plain text, one line per log line, so `curl -N /logs?follow=1` works like tail -f
+        seq = cursor
+        for line in recent:
+            yield line.format() + "\n"
+        while True:
+            new_lines, seq = agent_logs.since(seq, timeout=LOG_FOLLOW_POLL_SECONDS, stream=stream, pid=pid)
+            if not new_lines:
+                # Keeps proxies from closing an idle stream
+                yield "\n"
+            for line in new_lines:
+                yield line.format() + "\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/plain',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 if __name__ == '__main__':
     # Create static folder if it doesn't exist
     if not os.path.exists('static'):
         os.makedirs('static')
     
-    # Move index.html to static folder if it exists in root
-    if os.path.exists('index.html'):
+    # Move index.html to static folder if it exists in root (never over the live page)
+    if os.path.exists('index.html') and not os.path.exists('static/index.html'):
         import shutil
         shutil.move('index.html', 'static/index.html')
     
@@ -106,4 +269,4 @@ if __name__ == '__main__':
     
     print("Starting Flask server...")
     print(f"Open http://localhost:{port} in your browser")
-    app.run(debug=False, host='0.0.0.0', port=port) 
\ No newline at end of file
+    app.run(debug=False, host='0.0.0.0', port=port)
@@ -0,0 +1,174 @@
+"""
+ASGI entry point for the control plane: uvicorn asgi:application
+
+Endpoints that hold a connection open (/events, /status?since=...,
+/logs?follow=1) and the plain /status poll are served directly on the
+event loop, so every open dashboard costs a coroutine instead of a
+server thread. All other routes
+are the Flask app from app.py, run on a small thread pool; none of its
+views block, because agent start/stop finish in the background.
+"""
+
+import asyncio
+import json
+import os
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.datastructures import MultiDict
+
+from app import (
+    app, events, agent_logs, pool, parse_log_query, long_poll_wait,
+    SSE_KEEPALIVE_SECONDS, LOG_FOLLOW_POLL_SECONDS
+)
+
+# Threads for the (short) Flask views
+HTTP_THREADS = int(os.environ.get('FRIDAY_HTTP_THREADS', 16))
+
+flask_app = WSGIMiddleware(app, workers=HTTP_THREADS)
+
+STREAM_HEADERS = [(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]
+
+async def send_json(send, payload: dict, status: int = 200):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def start_stream(send, content_type: bytes):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', content_type)] + STREAM_HEADERS,
+    })
+
+async def send_chunk(send, text: str):
+    await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+async def until_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+async def stream_until_disconnect(receive, producer):
+    """Run a streaming producer until it ends or the client goes away"""
+    producer_task = asyncio.ensure_future(producer)
+    disconnect_task = asyncio.ensure_future(until_disconnect(receive))
+    done, pending = await asyncio.wait({producer_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    if producer_task in done:
+        producer_task.result()
+
+async def event_stream(scope, receive, send):
+    # Same stream as app.event_stream, without pinning a thread per client
+    last_event_id = MultiDict(
+        (key.decode('latin-1').lower(), value.decode('latin-1')) for key, value in scope['headers']
+    ).get('last-event-id', type=int)
+    subscription = events.subscribe_async(last_event_id)
+
+    async def produce():
+        await start_stream(send, b'text/event-stream')
+        await send_chunk(send, "retry: 3000\n")
+        await send_chunk(send, f"event: status\ndata: {json.dumps(pool.status())}\n\n")
+        while True:
+            event = await subscription.get(SSE_KEEPALIVE_SECONDS)
+            await send_chunk(send, event.to_sse() if event else ": keepalive\n\n")
+
+    try:
+        await stream_until_disconnect(receive, produce())
+    finally:
+        subscription.close()
+
+async def long_poll_status(args, send):
+    since = args.get('since', type=int)
+    subscription = events.subscribe_async(since)
+    try:
+        await subscription.get(long_poll_wait(args))
+    finally:
+        subscription.close()
+    new_events = events.events_since(since)
+    await send_json(send, dict(
+        pool.status(),
+        last_event_id=new_events[-1].id if new_events else since,
+        events=[event.to_dict() for event in new_events]
+    ))
+
+async def follow_logs(args, receive, send):
+    try:
+        tail, stream, pid = parse_log_query(args)
+    except LookupError as e:
+        await send_json(send, {'status': 'error', 'message': str(e)}, status=404)
+        return
+
+    loop = asyncio.get_running_loop()
+    new_output = asyncio.Event()
+
+    def wake():
+        try:
+            loop.call_soon_threadsafe(new_output.set)
+        except RuntimeError:
+            pass
+
+    recent, seq = agent_logs.tail(tail, stream=stream, pid=pid)
+    agent_logs.add_listener(wake)
+
+    async def produce():
+        nonlocal seq
+        await start_stream(send, b'text/plain; charset=utf-8')
+        for line in recent:
+            await send_chunk(send, line.format() + "\n")
+        while True:
+            try:
+                await asyncio.wait_for(new_output.wait(), LOG_FOLLOW_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                await send_chunk(send, "\n")
+                continue
+            new_output.clear()
+            new_lines, seq = agent_logs.since(seq, stream=stream, pid=pid)
+            if new_lines:
+                await send_chunk(send, "".join(line.format() + "\n" for line in new_lines))
+
+    try:
+        await stream_until_disconnect(receive, produce())
+    finally:
+        agent_logs.remove_listener(wake)
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Nothing serves requests before startup completes, so warm the standbys here
+            await asyncio.to_thread(pool.warm_up)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await asyncio.to_thread(pool.shutdown)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        path = scope['path']
+        args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+        if path == '/events':
+            await event_stream(scope, receive, send)
+            return
+        if path == '/status':
+            if args.get('since', type=int) is None:
+                await send_json(send, dict(pool.status(), last_event_id=events.last_id))
+            else:
+                await long_poll_status(args, send)
+            return
+        if path == '/logs' and args.get('follow') == '1':
+            await follow_logs(args, receive, send)
+            return
+
+    await flask_app(scope, receive, send)
@@ -0,0 +1,183 @@
+"""
+Load test for the web control plane.
+
+Hammers the status endpoints with N concurrent keep-alive clients while
+holding M dashboard event streams open, then prints requests per second
+and latency percentiles. Run it against each server setup to compare, e.g.:
+
+    python benchmarks/control_plane_load.py --launch "python app.py" --port 5000 --save before.json
+    python benchmarks/control_plane_load.py --launch "uvicorn asgi:application --port 8000" \\
+        --port 8000 --compare before.json
+
+The launched server gets FRIDAY_WARM_STANDBY=0 so no agent process is spawned.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def wait_for_server(host, port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=2)
+            connection.request("GET", "/status")
+            connection.getresponse().read()
+            connection.close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+def hold_stream(host, port, stop, opened, failures):
+    """One dashboard: an open /events stream, read until the test ends"""
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        connection.request("GET", "/events")
+        response = connection.getresponse()
+        if response.status != 200:
+            failures.append(response.status)
+            return
+        response.fp.readline()
+        opened.append(1)
+        while not stop.is_set():
+            if not response.fp.readline():
+                break
+    except OSError as e:
+        failures.append(str(e))
+
+def run_client(host, port, paths, stop, latencies, errors):
+    connection = None
+    index = 0
+    while not stop.is_set():
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+                continue
+            latencies.append(time.perf_counter() - started)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            if connection is not None:
+                connection.close()
+            connection = None
+
+def run(args):
+    host, port = args.host, args.port
+    stop = threading.Event()
+
+    opened, stream_failures = [], []
+    streams = [
+        threading.Thread(target=hold_stream, args=(host, port, stop, opened, stream_failures), daemon=True)
+        for _ in range(args.streams)
+    ]
+    for thread in streams:
+        thread.start()
+    deadline = time.time() + 10
+    while len(opened) + len(stream_failures) < args.streams and time.time() < deadline:
+        time.sleep(0.05)
+
+    paths = [path.strip() for path in args.paths.split(",") if path.strip()]
+    per_client = [([], []) for _ in range(args.concurrency)]
+    clients = [
+        threading.Thread(target=run_client, args=(host, port, paths, stop, latencies, errors), daemon=True)
+        for latencies, errors in per_client
+    ]
+    started = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in clients:
+        thread.join(timeout=30)
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(value for values, _ in per_client for value in values)
+    errors = [error for _, values in per_client for error in values]
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round((latencies[-1] if latencies else 0) * 1000, 2),
+        "concurrency": args.concurrency,
+        "streams_open": len(opened),
+        "streams_failed": len(stream_failures),
+        "paths": paths,
+    }
+
+def print_report(result, baseline=None):
+    print(f"Requests:  {result['requests']} ({result['errors']} errors)")
+    print(f"Streams:   {result['streams_open']} open, {result['streams_failed']} failed")
+    for key, label in (("rps", "RPS"), ("p50_ms", "p50 ms"), ("p95_ms", "p95 ms"), ("p99_ms", "p99 ms"), ("max_ms", "max ms")):
+        line = f"{label + ':':<10} {result[key]}"
+        if baseline and baseline.get(key):
+            change = (result[key] - baseline[key]) / baseline[key] * 100
+            line += f"  (baseline {baseline[key]}, {change:+.1f}%)"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent request loops")
+    parser.add_argument("--streams", type=int, default=100, help="/events connections held open")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--paths", default="/status,/status?since=0&wait=0,/workers")
+    parser.add_argument("--launch", help="server command to start (from the repo root) before the test")
+    parser.add_argument("--save", help="write the result as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --save")
+    args = parser.parse_args()
+
+    server = None
+    if args.launch:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, FRIDAY_WARM_STANDBY="0", PORT=str(args.port))
+        server = subprocess.Popen(shlex.split(args.launch), cwd=root, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_server(args.host, args.port, timeout=30):
+            print(f"Server at {args.host}:{args.port} did not respond", file=sys.stderr)
+            return 1
+        result = run(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
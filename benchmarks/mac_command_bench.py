@@ -0,0 +1,191 @@
+"""
+Microbenchmark for execute_mac_command's command matching: the compiled
+phrase table (All_tools/mac_system_control.py) against the substring if/elif
+chain it replaced, over a corpus of utterances as people actually say them
+(English, Hindi, Hinglish, typos, and requests that are not commands).
+
+Only matching is timed; handlers are not run. For the whole tool, including
+the handler's subprocess, use `python benchmarks/tool_bench.py --tools execute_mac_command`.
+
+    python benchmarks/mac_command_bench.py
+    python benchmarks/mac_command_bench.py --iterations 2000 --save mac_commands.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (utterance, command it should run or None)
+CORPUS = [
+    ("increase brightness", "brightness up"),
+    ("brightness up please", "brightness up"),
+    ("can you make the screen brighter", "brightness up"),
+    ("brightness badhao", "brightness up"),
+    ("ब्राइटनेस बढ़ाओ", "brightness up"),
+    ("decrease brightness", "brightness down"),
+    ("dim the screen a bit", "brightness down"),
+    ("brightness thoda kam karo", "brightness down"),
+    ("रोशनी कम करो", "brightness down"),
+    ("volume up", "volume up"),
+    ("increase the volume", "volume up"),
+    ("turn up the volume", "volume up"),
+    ("louder", "volume up"),
+    ("awaaz badhao", "volume up"),
+    ("आवाज़ तेज़ करो", "volume up"),
+    ("volum up", "volume up"),
+    ("volume down", "volume down"),
+    ("lower the volume please", "volume down"),
+    ("decrease volume", "volume down"),
+    ("quieter", "volume down"),
+    ("zara awaz kam karo", "volume down"),
+    ("आवाज़ कम करो", "volume down"),
+    ("mute", "mute"),
+    ("mute the volume", "mute"),
+    ("म्यूट करो", "mute"),
+    ("open downloads", "open downloads"),
+    ("open the downloads folder", "open downloads"),
+    ("downloads kholo", "open downloads"),
+    ("open desktop", "open desktop"),
+    ("डेस्कटॉप खोलो", "open desktop"),
+    ("open documents folder", "open documents"),
+    ("open safari", "open safari"),
+    ("safari kholo", "open safari"),
+    ("open chrome", "open chrome"),
+    ("open google chrome", "open chrome"),
+    ("open the browser", "open browser"),
+    ("open browser", "open browser"),
+    ("open finder", "open finder"),
+    ("open terminal", "open terminal"),
+    ("टर्मिनल खोलो", "open terminal"),
+    ("open calculator", "open calculator"),
+    ("open calendar", "open calendar"),
+    ("open notes", "open notes"),
+    ("open system preferences", "open system preferences"),
+    ("open settings", "open system preferences"),
+    ("open activity monitor", "open activity monitor"),
+    ("open task manager", "open activity monitor"),
+    ("take screenshot", "take screenshot"),
+    ("take a screenshot of this", "take screenshot"),
+    ("screenshot lo", "take screenshot"),
+    ("lock screen", "lock screen"),
+    ("lock the screen now", "lock screen"),
+    ("स्क्रीन लॉक करो", "lock screen"),
+    ("empty trash", "empty trash"),
+    ("empty the trash", "empty trash"),
+    ("do not empty the trash", None),
+    ("don't empty trash", None),
+    ("never lock the screen", None),
+    ("don't mute", None),
+    ("volume mat badhao", None),
+    ("कचरा खाली मत करो", None),
+    ("empty the trash in my downloads folder", None),
+    ("what's the weather in delhi", None),
+    ("unmute", None),
+    ("send a message to mom", None),
+    ("how loud is a jet engine", None),
+    ("play some music", None),
+]
+
+# The chain execute_mac_command used before, in its order: substrings -> command
+LEGACY_CHAIN = [
+    (("increase brightness", "brightness up"), "brightness up"),
+    (("decrease brightness", "brightness down"), "brightness down"),
+    (("increase volume", "volume up"), "volume up"),
+    (("decrease volume", "volume down"), "volume down"),
+    (("mute", "mute volume"), "mute"),
+    (("open downloads",), "open downloads"),
+    (("open desktop",), "open desktop"),
+    (("open documents",), "open documents"),
+    (("open safari",), "open safari"),
+    (("open chrome",), "open chrome"),
+    (("open browser",), "open browser"),
+    (("open finder",), "open finder"),
+    (("open terminal",), "open terminal"),
+    (("open calculator",), "open calculator"),
+    (("open calendar",), "open calendar"),
+    (("open notes",), "open notes"),
+    (("open system preferences",), "open system preferences"),
+    (("open activity monitor",), "open activity monitor"),
+    (("take screenshot",), "take screenshot"),
+    (("lock screen",), "lock screen"),
+    (("empty trash",), "empty trash"),
+]
+
+def legacy_match(command):
+    command = command.lower()
+    for substrings, name in LEGACY_CHAIN:
+        if any(substring in command for substring in substrings):
+            return name
+    return None
+
+def compiled_match(command):
+    from All_tools.mac_system_control import match_mac_command
+    matched = match_mac_command(command)
+    return matched.name if matched else None
+
+def time_matcher(match, iterations):
+    """(correct count, per-utterance microseconds sorted, wrong [(utterance, got, expected)])"""
+    timings, wrong = [], []
+    for utterance, expected in CORPUS:
+        got = match(utterance)
+        if got != expected:
+            wrong.append((utterance, got, expected))
+        started = time.perf_counter()
+        for _ in range(iterations):
+            match(utterance)
+        timings.append((time.perf_counter() - started) / iterations * 1e6)
+    return len(CORPUS) - len(wrong), sorted(timings), wrong
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500, help="matches per utterance")
+    parser.add_argument("--show-misses", action="store_true", help="list the utterances each matcher gets wrong")
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+    sys.path.insert(0, REPO_ROOT)
+
+    started = time.perf_counter()
+    from All_tools import mac_system_control
+    import_ms = (time.perf_counter() - started) * 1000
+    phrases = sum(len(entry.phrases) for entry in mac_system_control.MAC_COMMANDS)
+    print(f"{len(mac_system_control.MAC_COMMANDS)} commands, {phrases} phrases; "
+          f"import and compile {import_ms:.0f} ms; {len(CORPUS)} utterances\n")
+
+    results = {}
+    print(f"{'matcher':10} {'correct':>9} {'p50 us':>8} {'p95 us':>8} {'mean us':>8}")
+    for name, match in (("legacy", legacy_match), ("compiled", compiled_match)):
+        correct, timings, wrong = time_matcher(match, args.iterations)
+        row = {
+            "correct": correct,
+            "p50_us": round(statistics.median(timings), 2),
+            "p95_us": round(timings[int(0.95 * (len(timings) - 1))], 2),
+            "mean_us": round(statistics.mean(timings), 2),
+            "wrong": wrong,
+        }
+        results[name] = row
+        print(f"{name:10} {correct:4}/{len(CORPUS):<4} {row['p50_us']:8.2f} {row['p95_us']:8.2f} {row['mean_us']:8.2f}")
+        if args.show_misses:
+            for utterance, got, expected in wrong:
+                print(f"    {utterance!r}: got {got}, expected {expected}")
+
+    misses = [utterance for utterance, expected in CORPUS if expected is None]
+    started = time.perf_counter()
+    for utterance in misses:
+        mac_system_control.suggest_mac_commands(utterance)
+    suggest_us = (time.perf_counter() - started) / len(misses) * 1e6
+    results["suggest_us"] = round(suggest_us, 1)
+    print(f"\nsuggestions for an unrecognized command: {suggest_us:.0f} us")
+    for utterance in misses[:3]:
+        print(f"    {utterance!r} -> {mac_system_control.suggest_mac_commands(utterance)}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
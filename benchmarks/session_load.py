@@ -0,0 +1,385 @@
+"""
+Capacity planning: how many concurrent Friday sessions one host can sustain.
+
+Every simulated user gets a real livekit AgentSession running the Assistant
+from agent.py, with the session event handlers agent.py attaches, but no
+LiveKit room. The Gemini realtime model is replaced by a scripted LLM that
+answers like a model would: a user turn from CONVERSATION gets that turn's
+function calls as streamed tool-call chunks, and the turn after the tool
+outputs gets the reply text. Each turn is one session.run(user_input=...), so
+the session's own scheduling, chat context, tool execution and events are all
+part of the numbers:
+
+- the user "speaks": 20 ms input audio frames are paced on the event loop for
+  the utterance, then the text goes to the session
+- the scripted model thinks, then streams the tool calls; the session runs
+  them against the tool_bench stand-ins (fake osascript, stub HTTP server,
+  synthetic HOME) and asks the model again
+- the reply is paced as 20 ms output frames
+
+Speech recognition, speech synthesis and the room transport are not simulated
+beyond the frame pacing. --tools-only skips AgentSession and the model stream
+and calls the Assistant's tools directly, which isolates the tools' share of
+the load.
+
+Concurrency ramps through --levels. For each level it reports completed
+turns per second, turn latency (end of user speech to the first reply
+frame), event-loop lag, late audio frames and resident memory per session.
+All sessions share one event loop, so blocking tool calls show up directly
+as loop lag and late frames.
+
+Needs livekit-agents 1.2 or later (AgentSession.run) unless --tools-only is given.
+
+    python benchmarks/session_load.py --levels 1,4,16,32 --turns 6
+    python benchmarks/session_load.py --levels 8 --time-scale 1 --save load.json
+    python benchmarks/session_load.py --levels 1,4,16 --tools-only
+"""
+
+import argparse
+import asyncio
+import collections
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import shutil
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tool_bench import install_stand_ins, percentile
+
+FRAME_SECONDS = 0.02
+FRAME_BYTES = 1920  # 20 ms of 48 kHz mono 16-bit audio
+SECONDS_PER_WORD = 0.3
+
+# (user utterance, [(tool, kwargs)], reply)
+CONVERSATION = [
+    ("Friday, what's the weather in Delhi today?",
+     [("get_weather_info", {"location": "Delhi"})],
+     "It is thirty one degrees and sunny in Delhi with light winds."),
+    ("Set the volume to forty please",
+     [("set_volume", {"level": 40})],
+     "Done, volume is at forty percent."),
+    ("Any news about electric cars?",
+     [("get_current_news", {"topic": "electric cars"})],
+     "Here are the top three stories about electric cars this morning."),
+    ("Open Safari and search for python asyncio",
+     [("open_app", {"app_name": "Safari"}), ("search_in_browser", {"query": "python asyncio"})],
+     "Safari is open with your search results."),
+    ("Thanks Friday, how are you doing?",
+     [],
+     "I am doing great, thanks for asking. Anything else?"),
+    ("Find my notes that mention Friday",
+     [("search_in_files", {"folder_path": "~/Documents", "search_text": "Friday", "file_extension": ".txt"})],
+     "I found twenty note files that mention Friday."),
+]
+
+def script_for(utterance: str):
+    """([(tool, kwargs)], reply) of the CONVERSATION turn for utterance"""
+    for text, calls, reply in CONVERSATION:
+        if text == utterance:
+            return calls, reply
+    return [], "Sorry, I did not catch that."
+
+def expand_home(kwargs, home):
+    return {key: value.replace("~", home, 1) if isinstance(value, str) and value.startswith("~") else value
+            for key, value in kwargs.items()}
+
+def make_mock_llm(think_seconds: float, home: str):
+    """
+    livekit LLM that plays the model's part of CONVERSATION: a user turn gets
+    its function calls (or the reply when it has none), and the generation
+    after the tool outputs gets the reply
+    """
+    from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, llm
+
+    class MockLLMStream(llm.LLMStream):
+        async def _run(self):
+            items = self.chat_ctx.items
+            utterance = next((item.text_content or "" for item in reversed(items)
+                              if item.type == "message" and item.role == "user"), "")
+            calls, reply = script_for(utterance)
+            after_tools = bool(items) and items[-1].type == "function_call_output"
+            await asyncio.sleep(think_seconds * (random.uniform(0.4, 0.8) if after_tools else random.uniform(0.7, 1.3)))
+            if calls and not after_tools:
+                delta = llm.ChoiceDelta(role="assistant", tool_calls=[
+                    llm.FunctionToolCall(name=name, arguments=json.dumps(expand_home(kwargs, home)),
+                                         call_id=f"call_{uuid.uuid4().hex[:12]}")
+                    for name, kwargs in calls
+                ])
+            else:
+                delta = llm.ChoiceDelta(role="assistant", content=reply)
+            self._event_ch.send_nowait(llm.ChatChunk(id=uuid.uuid4().hex, delta=delta))
+
+    class MockLLM(llm.LLM):
+        def chat(self, *, chat_ctx, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs):
+            return MockLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+    return MockLLM()
+
+class MockRealtimeModel:
+    """
+    --tools-only stand-in for google.beta.realtime.RealtimeModel: answers every
+    turn from CONVERSATION after a think delay and keeps a growing chat history,
+    like the real session context does
+    """
+
+    def __init__(self, *args, think_seconds: float = 0.3, **kwargs):
+        self.options = kwargs
+        self.think_seconds = think_seconds
+        self.history = []
+
+    async def respond(self, utterance: str, turn: int):
+        """Tool calls the model asks for on this turn"""
+        self.history.append({"role": "user", "content": utterance})
+        await asyncio.sleep(self.think_seconds * random.uniform(0.7, 1.3))
+        return CONVERSATION[turn % len(CONVERSATION)][1]
+
+    async def reply(self, turn: int, tool_results):
+        for result in tool_results:
+            self.history.append({"role": "tool", "content": str(result)})
+        await asyncio.sleep(self.think_seconds * random.uniform(0.4, 0.8))
+        text = CONVERSATION[turn % len(CONVERSATION)][2]
+        self.history.append({"role": "assistant", "content": text})
+        return text
+
+class StubRunContext:
+    """What a tool receives instead of livekit's RunContext"""
+
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+        self.userdata = {}
+
+class RoomStandIn:
+    """Audio frames at a fixed 20 ms cadence; counts frames that arrive too late"""
+
+    def __init__(self, jitter_seconds: float, stats: "LevelStats"):
+        self.jitter_seconds = jitter_seconds
+        self.stats = stats
+        self.buffer = collections.deque(maxlen=50)
+
+    async def stream(self, seconds: float):
+        """Push (or pull) frames for seconds of audio; returns the time of the first frame"""
+        frames = max(1, int(seconds / FRAME_SECONDS))
+        started = time.perf_counter()
+        for frame in range(frames):
+            deadline = started + frame * FRAME_SECONDS
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lateness = time.perf_counter() - deadline
+            self.buffer.append(bytes(FRAME_BYTES))
+            self.stats.frames += 1
+            if lateness > self.jitter_seconds:
+                self.stats.late_frames += 1
+        return started
+
+class LevelStats:
+    def __init__(self):
+        self.turns = 0
+        self.turn_latency = []
+        self.tool_errors = 0
+        self.frames = 0
+        self.late_frames = 0
+        self.loop_lag = []
+        self.rss_peak = 0
+
+def install_mock_llm(think_seconds: float, home: str):
+    """Make agent.Assistant() use a fresh scripted LLM instead of the Gemini realtime model"""
+    from livekit.plugins import google
+    google.beta.realtime.RealtimeModel = lambda *args, **kwargs: make_mock_llm(think_seconds, home)
+
+def build_assistant(model_options):
+    """--tools-only: Assistant from agent.py with the mock realtime model, and its tools by name"""
+    from livekit.plugins import google
+    import agent
+
+    google.beta.realtime.RealtimeModel = lambda *args, **kwargs: MockRealtimeModel(*args, **model_options, **kwargs)
+    assistant = agent.Assistant()
+    model = getattr(assistant, "llm", None) or getattr(assistant, "_llm", None)
+    if not isinstance(model, MockRealtimeModel):
+        model = MockRealtimeModel(**model_options)
+    tools = getattr(assistant, "tools", None) or agent.get_all_tools()
+    return assistant, model, {tool_name(tool): tool for tool in tools}
+
+def tool_name(tool) -> str:
+    info = getattr(tool, "info", None) or getattr(tool, "__livekit_tool_info", None)
+    return getattr(info, "name", None) or getattr(tool, "__name__", "")
+
+async def run_agent_session(session_id, args, home, stats):
+    """One user talking to a real AgentSession (no room) that runs the Assistant"""
+    from livekit.agents import AgentSession
+    import agent
+
+    room = RoomStandIn(args.jitter_ms / 1000, stats)
+    await asyncio.sleep(random.uniform(0, args.ramp_seconds))
+    session = AgentSession()
+    agent.attach_session_events(session)
+    await session.start(agent=agent.Assistant())
+    try:
+        for turn in range(args.turns):
+            utterance, _, _ = CONVERSATION[turn % len(CONVERSATION)]
+            await room.stream(len(utterance.split()) * SECONDS_PER_WORD * args.time_scale)
+            speech_end = time.perf_counter()
+
+            result = await session.run(user_input=utterance)
+            text = ""
+            for event in result.events:
+                if event.type == "function_call_output" and event.item.is_error:
+                    stats.tool_errors += 1
+                elif event.type == "message" and event.item.role == "assistant":
+                    text = event.item.text_content or ""
+
+            first_frame = await room.stream(len(text.split()) * SECONDS_PER_WORD * args.time_scale)
+            stats.turn_latency.append((first_frame - speech_end) * 1000)
+            stats.turns += 1
+    finally:
+        await session.aclose()
+
+async def run_tools_session(session_id, args, home, stats):
+    """--tools-only: the same conversation with the Assistant's tools called directly"""
+    assistant, model, tools = build_assistant({"think_seconds": args.think_ms / 1000 * args.time_scale})
+    context = StubRunContext(session_id)
+    room = RoomStandIn(args.jitter_ms / 1000, stats)
+    await asyncio.sleep(random.uniform(0, args.ramp_seconds))
+    for turn in range(args.turns):
+        utterance, _, _ = CONVERSATION[turn % len(CONVERSATION)]
+        await room.stream(len(utterance.split()) * SECONDS_PER_WORD * args.time_scale)
+        speech_end = time.perf_counter()
+
+        results = []
+        for name, kwargs in await model.respond(utterance, turn):
+            try:
+                results.append(await tools[name](context, **expand_home(kwargs, home)))
+            except Exception as e:
+                stats.tool_errors += 1
+                results.append(f"Error: {e}")
+        text = await model.reply(turn, results)
+
+        first_frame = await room.stream(len(text.split()) * SECONDS_PER_WORD * args.time_scale)
+        stats.turn_latency.append((first_frame - speech_end) * 1000)
+        stats.turns += 1
+
+async def monitor_loop(stats, interval, stop):
+    """Event-loop lag: how late a short sleep wakes up"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        stats.loop_lag.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+async def monitor_memory(stats, stop):
+    from process_stats import snapshot
+    pid = os.getpid()
+    while not stop.is_set():
+        info = snapshot([pid]).get(pid)
+        if info is not None:
+            stats.rss_peak = max(stats.rss_peak, info.rss)
+        await asyncio.sleep(0.25)
+
+def current_rss() -> int:
+    from process_stats import snapshot
+    info = snapshot([os.getpid()]).get(os.getpid())
+    return info.rss if info else 0
+
+async def run_level(sessions, args, home):
+    stats = LevelStats()
+    gc.collect()
+    rss_before = current_rss()
+    stop = asyncio.Event()
+    monitors = [asyncio.create_task(monitor_loop(stats, 0.01, stop)),
+                asyncio.create_task(monitor_memory(stats, stop))]
+    started = time.perf_counter()
+    run_session = run_tools_session if args.tools_only else run_agent_session
+    outcomes = await asyncio.gather(*(run_session(i, args, home, stats) for i in range(sessions)),
+                                    return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*monitors)
+    failed = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if failed:
+        print(f"  {len(failed)} sessions failed, first: {failed[0]!r}", file=sys.stderr)
+
+    latency = sorted(stats.turn_latency)
+    lag = sorted(stats.loop_lag)
+    return {
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "turns": stats.turns,
+        "turns_per_second": round(stats.turns / elapsed, 2) if elapsed else 0.0,
+        "turn_p50_ms": round(percentile(latency, 0.50), 1),
+        "turn_p95_ms": round(percentile(latency, 0.95), 1),
+        "loop_lag_p50_ms": round(percentile(lag, 0.50), 2),
+        "loop_lag_p99_ms": round(percentile(lag, 0.99), 2),
+        "loop_lag_max_ms": round(lag[-1], 2) if lag else 0.0,
+        "late_frame_percent": round(100 * stats.late_frames / stats.frames, 2) if stats.frames else 0.0,
+        "tool_errors": stats.tool_errors,
+        "rss_mib": round(stats.rss_peak / 2**20, 1),
+        "rss_per_session_kib": round(max(0, stats.rss_peak - rss_before) / 1024 / sessions, 1),
+        "failed_sessions": len(failed),
+    }
+
+def print_row(row):
+    print(f"{row['sessions']:8} {row['turns_per_second']:8.2f} {row['turn_p50_ms']:9.0f} {row['turn_p95_ms']:9.0f} "
+          f"{row['loop_lag_p50_ms']:8.2f} {row['loop_lag_p99_ms']:8.2f} {row['loop_lag_max_ms']:8.1f} "
+          f"{row['late_frame_percent']:7.2f} {row['rss_mib']:8.1f} {row['rss_per_session_kib']:9.0f}")
+
+async def run(args, home):
+    results = []
+    # Import the agent and tools before the first level's memory baseline
+    if args.tools_only:
+        build_assistant({})
+    else:
+        install_mock_llm(args.think_ms / 1000 * args.time_scale, home)
+        import agent  # noqa: F401
+    print(f"{'sessions':>8} {'turns/s':>8} {'turn p50':>9} {'turn p95':>9} {'lag p50':>8} {'lag p99':>8} "
+          f"{'lag max':>8} {'late %':>7} {'RSS MiB':>8} {'KiB/sess':>9}")
+    for sessions in args.levels:
+        row = await run_level(sessions, args, home)
+        print_row(row)
+        results.append(row)
+        if row["late_frame_percent"] > args.max_late_percent:
+            print(f"Stopping: {row['late_frame_percent']}% late audio frames at {sessions} sessions "
+                  f"(limit {args.max_late_percent}%)")
+            break
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16", help="comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=len(CONVERSATION), help="turns per session")
+    parser.add_argument("--time-scale", type=float, default=0.25,
+                        help="multiplier for speech and think time (1 = real time)")
+    parser.add_argument("--think-ms", type=float, default=600, help="mock model think time per turn at time scale 1")
+    parser.add_argument("--ramp-seconds", type=float, default=1.0, help="sessions start at random within this window")
+    parser.add_argument("--jitter-ms", type=float, default=40, help="audio frame lateness counted as a glitch")
+    parser.add_argument("--max-late-percent", type=float, default=5.0, help="stop ramping past this share of late frames")
+    parser.add_argument("--files", type=int, default=200, help="files in the synthetic Downloads folder")
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0, help="delay added by the stub HTTP server")
+    parser.add_argument("--tools-only", action="store_true",
+                        help="call the tools directly instead of running an AgentSession per user")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(",")]
+    # install_stand_ins options that this script does not expose
+    args.real_ocr = False
+    args.platform = "darwin"
+    random.seed(args.seed)
+
+    root = tempfile.mkdtemp(prefix="friday-session-load-")
+    try:
+        home, _, _ = install_stand_ins(args, root)
+        results = asyncio.run(run(args, home))
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump({"python": sys.version.split()[0], "time_scale": args.time_scale,
+                           "mode": "tools-only" if args.tools_only else "agent-session",
+                           "turns": args.turns, "levels": results}, f, indent=2)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
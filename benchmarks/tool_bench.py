@@ -0,0 +1,618 @@
+"""
+Offline benchmark for every tool returned by get_all_tools().
+
+Tools run against deterministic local stand-ins instead of macOS and the
+internet, so results are comparable between machines and runs:
+
+- a bin directory first on PATH with fake osascript, open, screencapture,
+  networksetup, tesseract, ... that log every call and the AppleScript
+  `delay` seconds it asked for (time a real Mac would spend waiting)
+- a stub HTTP server for the Cloud/DeepSeek chat APIs (via CLOUD_API_BASE /
+  DEEPSEEK_API_BASE) and for DuckDuckGo search (DDGS is swapped for a client
+  of the stub)
+- fixture screenshots for OCR: pyautogui.screenshot, ImageGrab.grab and
+  screencapture return a generated image; the fake tesseract returns its text
+  unless --real-ocr is given
+- HOME points at a synthetic file tree (Documents, Downloads with duplicates)
+- platform.system() reports Darwin so the macOS code paths run; SMTP and
+  Gmail settings point at a local SMTP stub that accepts and discards mail,
+  and the outbox lives under the temporary root, so no real mail is sent
+
+For each tool it reports p50/p95 latency, peak Python allocations (one extra
+tracemalloc run), subprocesses and stub HTTP requests per call, and the
+scripted AppleScript delay. Save a run and compare later ones against it:
+
+    python benchmarks/tool_bench.py --save baseline.json
+    python benchmarks/tool_bench.py --compare baseline.json --fail-on-regression
+    python benchmarks/tool_bench.py --tools volume,brightness --iterations 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# macOS commands the tools launch; each becomes a logging stand-in
+FAKE_COMMANDS = (
+    "osascript", "open", "screencapture", "networksetup", "brightness", "pmset",
+    "system_profiler", "vm_stat", "subl", "code", "blueutil", "say", "pbcopy",
+    "pbpaste", "defaults", "killall", "shortcuts", "tesseract",
+)
+
+FIXTURE_TEXT = [
+    "Friday benchmark fixture",
+    "Inbox (3) - Mail",
+    "Meeting with design team at 4 PM",
+    "Search results for weather in Delhi",
+    "Submit",
+]
+
+# Stand-in for every command; argv[0] tells it which one it is
+FAKE_COMMAND_SOURCE = r'''
+import json, os, re, shutil, sys
+
+name = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+script = ""
+if name == "osascript":
+    parts = [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "-e"]
+    script = "\n".join(parts) if parts else sys.stdin.read()
+
+record = {
+    "cmd": name,
+    "delay": sum(float(value) for value in re.findall(r"\bdelay\s+([0-9.]+)", script)),
+}
+with open(os.environ["FAKE_BIN_LOG"], "a") as log:
+    log.write(json.dumps(record) + "\n")
+
+OSASCRIPT_REPLIES = [
+    (r"get volume settings|output volume of", "50"),
+    (r"name of (every )?(application )?process", "Finder, Safari, WhatsApp, Music"),
+    (r"whose frontmost|where it is frontmost", "Safari"),
+    (r"URL of (every )?tab|title of (every )?tab", "https://example.com, Example Domain"),
+    (r"every (calendar )?event|summary of", "Design review, Standup"),
+]
+REPLIES = {
+    "networksetup": "Wi-Fi Power (en0): On",
+    "pmset": "Now drawing from 'AC Power'\n -InternalBattery-0\t87%; charged",
+    "system_profiler": "Hardware:\n\n    Hardware Overview:\n\n      Model Name: MacBook Pro\n      Chip: Apple M2\n      Memory: 16 GB\n",
+    "vm_stat": "Mach Virtual Memory Statistics: (page size of 16384 bytes)\nPages free: 12000.\nPages active: 250000.\nPages inactive: 240000.\nPages wired down: 90000.\n",
+}
+
+reply = ""
+if name == "osascript":
+    for pattern, reply in OSASCRIPT_REPLIES:
+        if re.search(pattern, script):
+            break
+    else:
+        literal = re.search(r'return\s+"([^"]*)"', script)
+        reply = literal.group(1) if literal else ""
+elif name == "tesseract":
+    if args and args[0] in ("--version", "-v"):
+        print("tesseract 5.3.0")
+    elif len(args) >= 2:
+        output = sys.stdout if args[1] == "stdout" else open(args[1] + ".txt", "w")
+        output.write(os.environ.get("FAKE_OCR_TEXT", "") + "\n")
+elif name == "screencapture":
+    targets = [arg for arg in args if not arg.startswith("-")]
+    if targets:
+        shutil.copyfile(os.environ["FAKE_SCREENSHOT"], targets[-1])
+else:
+    reply = REPLIES.get(name, "")
+if reply:
+    print(reply)
+'''
+
+# Keyword arguments per tool; anything missing is filled in from its signature
+CASES = {
+    "search_internet": {"query": "latest AI news"},
+    "get_current_news": {"topic": "technology"},
+    "get_weather_info": {"location": "Delhi"},
+    "ask_cloud_api_with_internet": {"question": "What changed in Python 3.13?"},
+    "ask_deepseek_with_internet": {"question": "What changed in Python 3.13?"},
+    "execute_mac_command": {"command": "volume up"},
+    "set_brightness": {"level": 60},
+    "set_volume": {"level": 40},
+    "open_app": {"app_name": "Safari"},
+    "close_application": {"app_name": "Safari"},
+    "control_music": {"action": "play", "song_name": "Believer"},
+    "create_file": {"file_path": "~/Documents/bench/new.txt", "content": "hello\n", "overwrite": True},
+    "delete_file": {"file_path": "~/Documents/bench/delete_me.txt", "permanent": True},
+    "read_file_content": {"file_path": "~/Documents/notes_0.txt"},
+    "write_file_content": {"file_path": "~/Documents/bench/write.txt", "content": "line\n" * 200},
+    "create_folder": {"folder_path": "~/Documents/bench/new_folder"},
+    "list_folder_contents": {"folder_path": "~/Downloads", "detailed": True},
+    "copy_file_or_folder": {"source_path": "~/Documents/project", "destination_path": "~/Documents/bench/project_copy"},
+    "move_file_or_folder": {"source_path": "~/Documents/bench/move_me.txt", "destination_path": "~/Documents/bench/moved.txt"},
+    "send_email": {"to_email": "bench@example.com", "subject": "Benchmark", "message": "Hello from the benchmark"},
+    "send_bulk_email": {"recipients": "email,name\nasha@example.com,Asha\nravi@example.com,Ravi",
+                        "subject": "Hi $name", "message": "Hello $name from the benchmark"},
+    "send_whatsapp_message": {"contact_name": "Mom", "message": "Running late"},
+    "make_phone_call": {"contact_name": "Mom"},
+    "set_audio_output": {"device": "MacBook Pro Speakers"},
+    "set_keyboard_backlight": {"level": 50},
+    "open_website": {"website_name": "youtube"},
+    "search_in_browser": {"query": "python asyncio"},
+    "open_web_search": {"query": "python asyncio", "site": "stackoverflow"},
+    "control_browser_music": {"action": "play"},
+    "create_reminder": {"task": "Call the bank", "due_time": "5 PM"},
+    "control_smart_home": {"device": "living room light", "action": "on"},
+    "find_and_replace_in_file": {"file_path": "~/Documents/bench/replace.txt", "find_text": "Friday", "replace_text": "FRIDAY"},
+    "search_in_files": {"folder_path": "~/Documents", "search_text": "Friday", "file_extension": ".txt"},
+    "detect_language": {"text": "मैं ठीक हूँ, thank you for asking"},
+    "set_volume_precise": {"percentage": 35},
+    "set_brightness_precise": {"percentage": 70},
+    "open_folder_in_app": {"folder_path": "~/Documents", "application": "finder"},
+    "change_wallpaper": {"image_path": "~/Pictures/wallpaper.png"},
+    "enhanced_internet_query": {"query": "electric cars in India"},
+    "multi_source_analysis": {"topic": "electric cars in India"},
+    "send_whatsapp_desktop_message": {"contact_name": "Mom", "message": "Running late"},
+    "fill_input_field": {"text_to_fill": "hello"},
+    "find_text_on_screen": {"search_text": "Inbox"},
+}
+
+def write_file(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+def remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+# Restore the state a tool changes; runs before every call, outside the timing
+SETUPS = {
+    "create_file": lambda home: remove(f"{home}/Documents/bench/new.txt"),
+    "delete_file": lambda home: write_file(f"{home}/Documents/bench/delete_me.txt", "bye\n"),
+    "create_folder": lambda home: remove(f"{home}/Documents/bench/new_folder"),
+    "copy_file_or_folder": lambda home: remove(f"{home}/Documents/bench/project_copy"),
+    "move_file_or_folder": lambda home: (remove(f"{home}/Documents/bench/moved.txt"),
+                                         write_file(f"{home}/Documents/bench/move_me.txt", "move\n")),
+    "find_and_replace_in_file": lambda home: write_file(f"{home}/Documents/bench/replace.txt",
+                                                        "Friday is here. Ask Friday.\n" * 100),
+}
+
+def default_arguments(tool):
+    """Plain values for required parameters that CASES does not cover"""
+    import inspect
+    values = {int: 1, float: 1.0, bool: True, str: "test"}
+    kwargs = {}
+    for name, parameter in list(inspect.signature(tool).parameters.items())[1:]:
+        if parameter.default is inspect.Parameter.empty:
+            kwargs[name] = values.get(parameter.annotation, "test")
+    return kwargs
+
+def build_home(root, files):
+    """Synthetic home: text notes, a small project, Downloads with duplicates and old files"""
+    home = os.path.join(root, "home")
+    rng = random.Random(7)
+    for i in range(20):
+        write_file(f"{home}/Documents/notes_{i}.txt",
+                   "".join(f"Note {i}.{line}: ask Friday about item {rng.randint(1, 999)}\n" for line in range(200)))
+    for i in range(10):
+        write_file(f"{home}/Documents/project/src/module_{i}.py", f"def handler_{i}():\n    return {i}\n" * 50)
+    for folder in ("Desktop", "Downloads", "Documents/bench", "Pictures"):
+        os.makedirs(f"{home}/{folder}", exist_ok=True)
+    now = time.time()
+    for i in range(files):
+        extension = rng.choice([".pdf", ".zip", ".jpg", ".dmg", ".txt", ".docx"])
+        path = f"{home}/Downloads/file_{i}{extension}"
+        size = rng.choice([512, 4096, 65536, 262144])
+        # every fifth file duplicates the one before it
+        seed = i - 1 if i % 5 == 4 else i
+        with open(path, "wb") as f:
+            f.write(random.Random(seed).randbytes(size))
+        age = rng.randint(0, 200) * 86400
+        os.utime(path, (now - age, now - age))
+    return home
+
+def build_fixture_image(path):
+    """Screenshot stand-in with known text; None when Pillow is missing"""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        with open(path, "wb") as f:
+            f.write(b"")
+        return None
+    image = Image.new("RGB", (1440, 900), "white")
+    draw = ImageDraw.Draw(image)
+    for row, text in enumerate(FIXTURE_TEXT):
+        draw.text((80, 80 + row * 60), text, fill="black")
+    image.save(path)
+    return image
+
+def build_fake_bin(root, real_ocr):
+    bin_dir = os.path.join(root, "bin")
+    os.makedirs(bin_dir)
+    script = os.path.join(bin_dir, "fake_command.py")
+    with open(script, "w") as f:
+        f.write(f"#!{sys.executable}\n{FAKE_COMMAND_SOURCE}")
+    os.chmod(script, 0o755)
+    for name in FAKE_COMMANDS:
+        if name == "tesseract" and real_ocr:
+            continue
+        os.symlink(script, os.path.join(bin_dir, name))
+    return bin_dir
+
+class StubState:
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def hit(self):
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+def search_results(query, count, news=False):
+    results = []
+    for i in range(count):
+        result = {"title": f"{query} - result {i + 1}",
+                  "body": f"Stub summary {i + 1} about {query}. " * 4,
+                  "href": f"https://example.com/{i + 1}"}
+        if news:
+            result.update({"date": "2026-01-01T09:00:00", "source": "Stub News", "url": result["href"]})
+        results.append(result)
+    return results
+
+def start_stub_server(state):
+    """Chat-completions and search stand-ins on an ephemeral port"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            state.hit()
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            count = int(query.get("max_results", ["5"])[0])
+            text = query.get("q", [""])[0]
+            self.reply(search_results(text, count, news=url.path.endswith("/news")))
+
+        def do_POST(self):
+            state.hit()
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.reply({"choices": [{"message": {"role": "assistant", "content": "Stub answer from the benchmark server."}}]})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_stub_smtp_server():
+    """Plain-text SMTP stand-in on an ephemeral port that accepts every message and drops it"""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def send(self, line):
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def handle(self):
+            self.send("220 bench SMTP stub")
+            in_data = False
+            for raw in self.rfile:
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                if in_data:
+                    if line == ".":
+                        in_data = False
+                        self.send("250 OK queued")
+                    continue
+                verb = line[:4].upper()
+                if verb == "EHLO":
+                    self.send("250 bench")
+                elif verb == "DATA":
+                    in_data = True
+                    self.send("354 End data with <CR><LF>.<CR><LF>")
+                elif verb == "QUIT":
+                    self.send("221 Bye")
+                    return
+                else:
+                    self.send("250 OK")
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_stub_ddgs(base_url):
+    class StubDDGS:
+        """Same surface as ddgs.DDGS for the calls the tools make"""
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def fetch(self, kind, query, max_results):
+            url = f"{base_url}/ddgs/{kind}?" + urllib.parse.urlencode({"q": query, "max_results": max_results})
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return json.loads(response.read())
+
+        def text(self, query, max_results=5, **kwargs):
+            return self.fetch("text", query, max_results)
+
+        def news(self, query, max_results=5, **kwargs):
+            return self.fetch("news", query, max_results)
+
+    return StubDDGS
+
+class Counters:
+    """Subprocesses started in this process and fake commands seen, per call"""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.subprocesses = 0
+        self.offset = 0
+        original = subprocess.Popen.__init__
+
+        def counting_init(popen, *args, **kwargs):
+            self.subprocesses += 1
+            original(popen, *args, **kwargs)
+
+        subprocess.Popen.__init__ = counting_init
+
+    def reset(self):
+        self.subprocesses = 0
+        self.offset = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+
+    def commands(self):
+        """(commands by name, scripted delay seconds) logged since reset"""
+        names, delay = {}, 0.0
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as log:
+                log.seek(self.offset)
+                for line in log:
+                    record = json.loads(line)
+                    names[record["cmd"]] = names.get(record["cmd"], 0) + 1
+                    delay += record["delay"]
+        return names, delay
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def call(tool, kwargs, timeout):
+    """(result, exception) of one call"""
+    try:
+        return await asyncio.wait_for(tool(None, **kwargs), timeout), None
+    except Exception as e:
+        return None, e
+
+async def bench_tool(tool, kwargs, setup, home, args, counters, stub):
+    from All_tools.tool_metrics import error_kind
+    timings = []
+    subprocesses = requests = 0
+    commands, delay = {}, 0.0
+    result = exception = None
+    for iteration in range(args.warmup + args.iterations):
+        if setup:
+            setup(home)
+        counters.reset()
+        requests_before = stub.requests
+        started = time.perf_counter()
+        result, exception = await call(tool, kwargs, args.timeout)
+        elapsed = time.perf_counter() - started
+        if iteration < args.warmup:
+            continue
+        timings.append(elapsed * 1000)
+        subprocesses += counters.subprocesses
+        requests += stub.requests - requests_before
+        names, seconds = counters.commands()
+        for name, count in names.items():
+            commands[name] = commands.get(name, 0) + count
+        delay += seconds
+
+    if setup:
+        setup(home)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    await call(tool, kwargs, args.timeout)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    timings.sort()
+    runs = len(timings)
+    return {
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "max_ms": round(timings[-1], 3),
+        "peak_kib": round(peak / 1024, 1),
+        "subprocesses": round(subprocesses / runs, 2),
+        "http_requests": round(requests / runs, 2),
+        "scripted_delay_s": round(delay / runs, 2),
+        "commands": {name: round(count / runs, 2) for name, count in sorted(commands.items())},
+        "outcome": "raised" if exception is not None else (error_kind(result, None) or "ok"),
+        "result": str(exception if exception is not None else result)[:120],
+    }
+
+def print_table(results):
+    print(f"{'tool':34} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>9} {'procs':>6} {'http':>5} {'delay s':>8}  outcome")
+    for name, row in results.items():
+        print(f"{name:34} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['peak_kib']:9.1f} "
+              f"{row['subprocesses']:6.1f} {row['http_requests']:5.1f} {row['scripted_delay_s']:8.1f}  {row['outcome']}")
+
+def compare(results, baseline, threshold):
+    """Print deltas against a saved run; returns the tools that regressed"""
+    regressed = []
+    print(f"\n{'tool':34} {'p50 ms':>18} {'p95 ms':>18} {'procs':>11}")
+    for name, row in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:34} (new)")
+            continue
+        slower = row["p95_ms"] > old["p95_ms"] * (1 + threshold) and row["p95_ms"] - old["p95_ms"] > 1.0
+        more_processes = row["subprocesses"] > old["subprocesses"]
+        flag = "  REGRESSION" if slower or more_processes else ""
+        if flag:
+            regressed.append(name)
+        change = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        print(f"{name:34} {old['p50_ms']:8.2f} → {row['p50_ms']:7.2f} {old['p95_ms']:8.2f} → {row['p95_ms']:7.2f} "
+              f"{old['subprocesses']:4.1f} → {row['subprocesses']:4.1f} ({change:+.0f}% p95){flag}")
+    return regressed
+
+async def run(args, home, counters, stub):
+    from All_tools.tools_manager import get_all_tools
+    patterns = [pattern.strip() for pattern in args.tools.split(",")] if args.tools else []
+    results = {}
+    for tool in get_all_tools():
+        name = tool.__name__
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        kwargs = CASES.get(name)
+        if kwargs is None:
+            kwargs = default_arguments(tool)
+        expanded = {key: value.replace("~", home, 1) if isinstance(value, str) and value.startswith("~") else value
+                    for key, value in kwargs.items()}
+        results[name] = await bench_tool(tool, expanded, SETUPS.get(name), home, args, counters, stub)
+        if args.verbose:
+            print(f"{name}: {results[name]['result']!r}", file=sys.stderr)
+    return results
+
+def install_stand_ins(args, root):
+    """Environment and patches that must be in place before the tools are imported"""
+    fixture_path = os.path.join(root, "screen.png")
+    fixture = build_fixture_image(fixture_path)
+    home = build_home(root, args.files)
+    shutil.copyfile(fixture_path, f"{home}/Pictures/wallpaper.png")
+    bin_dir = build_fake_bin(root, args.real_ocr)
+
+    stub = StubState(args.stub_latency_ms / 1000)
+    server = start_stub_server(stub)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    smtp_server = start_stub_smtp_server()
+
+    log_path = os.path.join(root, "commands.log")
+    os.environ.update({
+        "HOME": home,
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "FAKE_BIN_LOG": log_path,
+        "FAKE_SCREENSHOT": fixture_path,
+        "FAKE_OCR_TEXT": "\n".join(FIXTURE_TEXT),
+        "CLOUD_API_BASE": f"{base_url}/cloud",
+        "DEEPSEEK_API_BASE": f"{base_url}/deepseek",
+        "CLOUD_API_KEY": "bench",
+        "DEEPSEEK_API_KEY": "bench",
+        # Real credentials from the shell must never reach a server
+        "GMAIL_USER": "",
+        "GMAIL_APP_PASSWORD": "",
+        "SMTP_USER": "",
+        "SMTP_PASSWORD": "",
+        "SMTP_FROM": "friday-bench@example.com",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_server.server_address[1]),
+        "SMTP_SECURITY": "none",
+        "FRIDAY_OUTBOX_DIR": os.path.join(root, "outbox"),
+        # Every timed call sends the same text; let each one through
+        "FRIDAY_WHATSAPP_DEDUPE_SECONDS": "0",
+    })
+    for name in ("FRIDAY_EVENTS", "FRIDAY_TRACING"):
+        os.environ.pop(name, None)
+
+    # Fake commands that read stdin must not wait on the terminal
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+
+    if args.platform == "darwin":
+        platform.system = lambda: "Darwin"
+
+    if fixture is not None:
+        def grab(*a, region=None, **k):
+            return fixture.crop((region[0], region[1], region[0] + region[2], region[1] + region[3])) if region else fixture.copy()
+        try:
+            from PIL import ImageGrab
+            ImageGrab.grab = lambda *a, **k: fixture.copy()
+        except ImportError:
+            pass
+        try:
+            import pyautogui
+            pyautogui.screenshot = grab
+        except Exception:
+            pass
+
+    sys.path.insert(0, REPO_ROOT)
+    import All_tools  # noqa: F401  (imports every tool module)
+    stub_ddgs = make_stub_ddgs(base_url)
+    for module_name, module in list(sys.modules.items()):
+        if module_name.startswith("All_tools.") and hasattr(module, "DDGS"):
+            module.DDGS = stub_ddgs
+    return home, Counters(log_path), stub
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", help="comma-separated name filters (substring match)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per call")
+    parser.add_argument("--files", type=int, default=200, help="files in the synthetic Downloads folder")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="delay added by the stub HTTP server")
+    parser.add_argument("--platform", choices=("darwin", "native"), default="darwin",
+                        help="report Darwin to the tools (default) or the real platform")
+    parser.add_argument("--real-ocr", action="store_true", help="use the installed tesseract instead of the fake")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against a JSON file written by --save")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 slowdown counted as a regression (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the sandbox directory")
+    parser.add_argument("--verbose", action="store_true", help="print each tool's result")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="friday-tool-bench-")
+    try:
+        home, counters, stub = install_stand_ins(args, root)
+        started = time.time()
+        results = asyncio.run(run(args, home, counters, stub))
+        if not results:
+            sys.exit("No tools matched")
+        print_table(results)
+        print(f"\n{len(results)} tools, {args.iterations} timed calls each, {time.time() - started:.1f}s")
+
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump({"python": sys.version.split()[0], "iterations": args.iterations,
+                           "platform": args.platform, "tools": results}, f, indent=2, ensure_ascii=False)
+        if args.compare:
+            with open(args.compare) as f:
+                regressed = compare(results, json.load(f)["tools"], args.threshold)
+            if regressed:
+                print(f"\n{len(regressed)} regressions: {', '.join(regressed)}")
+                if args.fail_on_regression:
+                    sys.exit(1)
+    finally:
+        if args.keep:
+            print(f"Sandbox kept at {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+How much UI waiting the event-driven waits (All_tools/ui_wait.py) save in common flows.
+
+Each flow calls the tool twice per scenario: once as it was in the baseline
+tree (--baseline, default the repository's first commit), whose scripts pause
+for hard-coded `delay`s, and once as it is now, with polled waits. The baseline
+All_tools is extracted with `git archive` and imported under another package
+name, so both run in the same process. The tool_bench stand-ins are installed, except that
+osascript is replaced by a small simulator. The simulator does not run
+AppleScript. It walks the script's success path, adding each fixed `delay` and,
+for each polled wait, the time until the app would be ready in the chosen
+scenario (rounded up to the poll interval):
+
+- warm: the app is already open and in front
+- cold: the app has to launch first
+
+In the cold scenario a fixed delay can be shorter than the launch. The old
+scripts then typed into whatever app was in front. A polled wait that takes
+longer there is a correctness fix, not a regression.
+
+The simulator sleeps for the simulated time multiplied by --time-scale, so
+the tool's measured wall time includes it. The table reports simulated UI seconds per call (what a Mac
+would spend waiting) and the wall-clock overhead of the tool itself.
+
+    python benchmarks/ui_wait_bench.py
+    python benchmarks/ui_wait_bench.py --scenarios cold --ready frontmost=2.5,page=4
+    python benchmarks/ui_wait_bench.py --baseline v1.0
+"""
+
+import argparse
+import asyncio
+import importlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tool_bench import REPO_ROOT, install_stand_ins, percentile
+
+BASELINE_PACKAGE = "All_tools_baseline"
+
+# Seconds until each kind of polled condition becomes true
+READY = {
+    "warm": {"frontmost": 0.0, "window": 0.0, "element": 0.15, "page": 0.3, "condition": 0.1},
+    "cold": {"frontmost": 1.2, "window": 1.5, "element": 0.3, "page": 2.0, "condition": 0.3},
+}
+
+# (label, tool, kwargs, path through the script: "main" or "fallback" for on-error branches)
+FLOWS = [
+    ("Play a song", "control_music", {"action": "play_song", "song_name": "Believer"}, "main"),
+    ("Search in the browser", "search_in_browser", {"query": "python asyncio"}, "main"),
+    ("Smart home without a shortcut", "control_smart_home", {"device": "lights", "action": "on"}, "fallback"),
+    ("Show WhatsApp chats", "get_whatsapp_contacts", {}, "main"),
+    ("WhatsApp Desktop message", "send_whatsapp_desktop_message", {"contact_name": "Mom", "message": "Running late"}, "main"),
+    ("WhatsApp Web message", "send_whatsapp_message", {"contact_name": "Ravi", "message": "On my way"}, "main"),
+]
+
+# Stand-in for osascript: simulated UI wait for the script, logged and slept (scaled)
+SIMULATOR_SOURCE = r'''
+import json, math, os, re, sys, time
+
+args = sys.argv[1:]
+parts = [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "-e"]
+script = "\n".join(parts) if parts else sys.stdin.read()
+ready = json.loads(os.environ["UI_READY"])
+fallback = os.environ.get("UI_BRANCH") == "fallback"
+poll = float(os.environ["UI_POLL_SECONDS"])
+
+OPENER = re.compile(r"^(try|repeat\b.*|if\b.*\bthen|tell\b(?!.*\bto\b).*)$")
+
+def path_lines(lines):
+    # Lines on the simulated path: the if-branch of every if, and either the
+    # body or (UI_BRANCH=fallback) the on-error part of every try
+    kept, frames = [], []
+    for raw in lines:
+        line = raw.strip()
+        if not line.startswith("-- ui_wait"):
+            line = line.split("--")[0].strip()
+        if line == "else" and frames:
+            frames[-1][1] = True
+        elif line.startswith("on error") and frames:
+            frames[-1][1] = not fallback
+        elif line.startswith("end") and frames:
+            frames.pop()
+        elif OPENER.match(line):
+            frames.append([line.split()[0], line == "try" and fallback])
+        elif not any(skip for _, skip in frames):
+            kept.append(line)
+    return kept
+
+# Launch milestones count from the start of the script; other conditions from the last action
+SINCE_START = ("frontmost", "window", "page")
+
+def ui_seconds(lines):
+    seconds, in_wait = 0.0, False
+    for line in lines:
+        wait = re.match(r"-- ui_wait (fixed )?(\w+):", line)
+        if wait and not wait.group(1):
+            # Polled: done at the first poll after the condition holds
+            kind = wait.group(2)
+            needed = ready.get(kind, ready["condition"])
+            if kind in SINCE_START:
+                needed -= seconds
+            seconds += math.ceil(needed / poll - 1e-9) * poll if needed > 0 else 0.0
+            in_wait = True
+        elif in_wait:
+            in_wait = not line.startswith("set waited to waited")
+        else:
+            delay = re.match(r"delay\s+([0-9.]+)", line)
+            if delay:
+                seconds += float(delay.group(1))
+    return seconds
+
+seconds = ui_seconds(path_lines(script.splitlines()))
+with open(os.environ["UI_LOG"], "a") as log:
+    log.write(json.dumps({"ui_seconds": seconds}) + "\n")
+time.sleep(seconds * float(os.environ.get("UI_TIME_SCALE", "0")))
+
+literal = re.search(r'return\s+"([^"]*)"', script)
+if literal:
+    print(literal.group(1))
+'''
+
+def install_simulator(root):
+    bin_dir = os.environ["PATH"].split(os.pathsep)[0]
+    path = os.path.join(root, "osascript_simulator.py")
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n{SIMULATOR_SOURCE}")
+    os.chmod(path, 0o755)
+    target = os.path.join(bin_dir, "osascript")
+    os.remove(target)
+    os.symlink(path, target)
+    log_path = os.path.join(root, "ui_wait.log")
+    os.environ["UI_LOG"] = log_path
+    return log_path
+
+def first_commit() -> str:
+    return subprocess.run(["git", "-C", REPO_ROOT, "rev-list", "--max-parents=0", "HEAD"],
+                          capture_output=True, text=True, check=True).stdout.split()[0]
+
+def load_baseline_tools(ref, root):
+    """Tools by name from All_tools as of ref, imported as BASELINE_PACKAGE"""
+    archive = subprocess.run(["git", "-C", REPO_ROOT, "archive", "--format=tar", ref, "All_tools"],
+                             capture_output=True, check=True).stdout
+    target = os.path.join(root, "baseline")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+    os.rename(os.path.join(target, "All_tools"), os.path.join(target, BASELINE_PACKAGE))
+    sys.path.insert(0, target)
+    tools_manager = importlib.import_module(f"{BASELINE_PACKAGE}.tools_manager")
+    return {getattr(tool, "__name__", ""): tool for tool in tools_manager.get_all_tools()}
+
+def read_log(path, offset):
+    with open(path) as f:
+        f.seek(offset)
+        records = [json.loads(line) for line in f if line.strip()]
+        return records, f.tell()
+
+async def run_flow(tool, kwargs, iterations, log_path):
+    """(simulated UI seconds per call, wall ms per call)"""
+    offset = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    ui, wall = [], []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await tool(None, **kwargs)
+        wall.append((time.perf_counter() - started) * 1000)
+        records, offset = read_log(log_path, offset)
+        ui.append(sum(record["ui_seconds"] for record in records))
+    return sorted(ui), sorted(wall)
+
+def parse_ready(text):
+    overrides = {}
+    for item in filter(None, (text or "").split(",")):
+        kind, _, seconds = item.partition("=")
+        overrides[kind.strip()] = float(seconds)
+    return overrides
+
+async def run(args, log_path, baseline_tools):
+    sys.path.insert(0, REPO_ROOT)
+    from All_tools import ui_wait
+    from All_tools.tools_manager import get_all_tools
+    tools = {getattr(tool, "__name__", ""): tool for tool in get_all_tools()}
+    ui_wait.FIXED_DELAYS = False
+    os.environ["UI_POLL_SECONDS"] = str(ui_wait.POLL_SECONDS)
+    os.environ["UI_TIME_SCALE"] = str(args.time_scale)
+
+    results = []
+    print(f"{'flow':32} {'scenario':8} {'fixed s':>8} {'polled s':>9} {'saved s':>8} {'saved %':>8} {'tool ms':>8}")
+    for scenario in args.scenarios:
+        os.environ["UI_READY"] = json.dumps({**READY[scenario], **parse_ready(args.ready)})
+        for label, name, kwargs, branch in FLOWS:
+            if name not in tools or name not in baseline_tools:
+                print(f"{label:32} {scenario:8} (tool {name} not found)")
+                continue
+            os.environ["UI_BRANCH"] = branch
+            row = {"flow": label, "tool": name, "scenario": scenario}
+            for mode, tool in (("fixed", baseline_tools[name]), ("polled", tools[name])):
+                ui, wall = await run_flow(tool, kwargs, args.iterations, log_path)
+                row[f"{mode}_seconds"] = round(percentile(ui, 0.5), 3)
+                # Wall time minus the scaled simulated wait: the tool's own overhead
+                row[f"{mode}_tool_ms"] = round(percentile(wall, 0.5) - row[f"{mode}_seconds"] * args.time_scale * 1000, 1)
+            saved = row["fixed_seconds"] - row["polled_seconds"]
+            row["saved_seconds"] = round(saved, 3)
+            print(f"{label:32} {scenario:8} {row['fixed_seconds']:8.2f} {row['polled_seconds']:9.2f} {saved:8.2f} "
+                  f"{100 * saved / row['fixed_seconds'] if row['fixed_seconds'] else 0:7.0f}% {row['polled_tool_ms']:8.1f}")
+            results.append(row)
+        total_fixed = sum(r["fixed_seconds"] for r in results if r["scenario"] == scenario)
+        total_polled = sum(r["polled_seconds"] for r in results if r["scenario"] == scenario)
+        print(f"{'all flows':32} {scenario:8} {total_fixed:8.2f} {total_polled:9.2f} {total_fixed - total_polled:8.2f}\n")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="warm,cold", help="comma-separated: warm, cold")
+    parser.add_argument("--ready", help="override readiness seconds, e.g. frontmost=2,page=3")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="fraction of the simulated UI wait actually slept (1 = real time)")
+    parser.add_argument("--baseline", help="git ref whose tools give the fixed-delay numbers (default: first commit)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+    args.baseline = args.baseline or first_commit()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip() in READY]
+    # install_stand_ins options that this script does not expose
+    args.files, args.real_ocr, args.stub_latency_ms, args.platform = 20, False, 0.0, "darwin"
+
+    root = tempfile.mkdtemp(prefix="friday-ui-wait-")
+    try:
+        install_stand_ins(args, root)
+        log_path = install_simulator(root)
+        baseline_tools = load_baseline_tools(args.baseline, root)
+        results = asyncio.run(run(args, log_path, baseline_tools))
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump({"baseline": args.baseline, "poll_ms": float(os.environ["UI_POLL_SECONDS"]) * 1000,
+                           "ready": READY, "results": results}, f, indent=2)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
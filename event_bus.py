@@ -0,0 +1,140 @@
+"""
+In-process publish/subscribe bus for the web control plane.
+
+Supervisor state changes and events reported by the agent process are
+published here once and fanned out to every open dashboard, either over
+server-sent events (/events) or long-polling (/status?since=...).
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+HISTORY_SIZE = 256
+SUBSCRIBER_QUEUE_SIZE = 512
+
+class Event:
+    def __init__(self, event_id: int, event_type: str, data: dict):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+        self.time = time.time()
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "type": self.type, "time": self.time, "data": self.data}
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+class Subscription:
+    """A bounded queue of events for one client; slow clients lose old events, not the bus"""
+
+    def __init__(self, bus: "EventBus"):
+        self.bus = bus
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def put(self, event: Event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(event)
+            except (queue.Empty, queue.Full):
+                pass
+
+    def get(self, timeout: float):
+        """Next event, or None after timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class AsyncSubscription:
+    """Subscription for asyncio consumers (asgi.py); publish() may run on any thread"""
+
+    def __init__(self, bus: "EventBus", loop: asyncio.AbstractEventLoop):
+        self.bus = bus
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def put(self, event: Event):
+        try:
+            self.loop.call_soon_threadsafe(self.enqueue, event)
+        except RuntimeError:
+            # Event loop already closed
+            self.bus.unsubscribe(self)
+
+    def enqueue(self, event: Event):
+        if self.queue.full():
+            self.dropped += 1
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float):
+        """Next event, or None after timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class EventBus:
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self.condition = threading.Condition()
+        self.history = deque(maxlen=history_size)
+        self.subscribers = set()
+        self.last_id = 0
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        with self.condition:
+            self.last_id += 1
+            event = Event(self.last_id, event_type, data)
+            self.history.append(event)
+            subscribers = list(self.subscribers)
+            self.condition.notify_all()
+        for subscriber in subscribers:
+            subscriber.put(event)
+        return event
+
+    def subscribe(self, last_event_id: int = None, subscription=None) -> Subscription:
+        """New subscription, replaying history after last_event_id (for reconnects)"""
+        subscription = subscription or Subscription(self)
+        with self.condition:
+            if last_event_id is not None:
+                for event in self.history:
+                    if event.id > last_event_id:
+                        subscription.put(event)
+            self.subscribers.add(subscription)
+        return subscription
+
+    def subscribe_async(self, last_event_id: int = None) -> AsyncSubscription:
+        """Like subscribe(), delivering to the running event loop"""
+        return self.subscribe(last_event_id, AsyncSubscription(self, asyncio.get_running_loop()))
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.condition:
+            self.subscribers.discard(subscription)
+
+    def events_since(self, since_id: int, timeout: float = 0.0) -> list:
+        """Events after since_id, waiting up to timeout for the first one (long-polling)"""
+        with self.condition:
+            if timeout > 0:
+                self.condition.wait_for(lambda: self.last_id > since_id, timeout=timeout)
+            return [event for event in self.history if event.id > since_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self.condition:
+            return len(self.subscribers)
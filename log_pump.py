@@ -0,0 +1,133 @@
+"""
+Agent log capture for the web control plane.
+
+Both of the agent's output pipes are drained by dedicated reader threads
+into a bounded in-memory ring buffer (and optionally a rotating log file),
+so a chatty agent can never block on a full pipe. /logs serves the buffer.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+DEFAULT_BUFFER_LINES = 5000
+MAX_LINE_CHARS = 8192
+
+# Rotating file: FRIDAY_AGENT_LOG_FILE=/path/agent.log (10 MB x 5 by default)
+LOG_FILE_MAX_BYTES = int(os.environ.get('FRIDAY_AGENT_LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_FILE_BACKUPS = int(os.environ.get('FRIDAY_AGENT_LOG_BACKUPS', 5))
+
+class LogLine:
+    def __init__(self, seq: int, stream: str, pid: int, text: str):
+        self.seq = seq
+        self.stream = stream
+        self.pid = pid
+        self.text = text
+        self.time = time.time()
+
+    def to_dict(self) -> dict:
+        return {"seq": self.seq, "time": self.time, "pid": self.pid, "stream": self.stream, "text": self.text}
+
+    def format(self) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.time))
+        return f"{stamp} [agent {self.pid} {self.stream}] {self.text}"
+
+class LogBuffer:
+    """Ring buffer of the most recent agent output lines"""
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_LINES, log_file: str = None):
+        self.condition = threading.Condition()
+        self.lines = deque(maxlen=capacity)
+        self.last_seq = 0
+        # Callables invoked after each append (used by the async /logs follower)
+        self.listeners = set()
+        self.file_logger = None
+        if log_file:
+            self.file_logger = self.open_log_file(log_file)
+
+    @staticmethod
+    def open_log_file(path: str) -> logging.Logger:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("friday.agent_output")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers = [handler]
+        return logger
+
+    def append(self, stream: str, pid: int, text: str) -> LogLine:
+        if len(text) > MAX_LINE_CHARS:
+            text = text[:MAX_LINE_CHARS] + " …[truncated]"
+        with self.condition:
+            self.last_seq += 1
+            line = LogLine(self.last_seq, stream, pid, text)
+            self.lines.append(line)
+            self.condition.notify_all()
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener()
+        if self.file_logger is not None:
+            try:
+                self.file_logger.info(line.format())
+            except Exception:
+                # A full disk must not stop the pipe from being drained
+                pass
+        return line
+
+    def tail(self, count: int, stream: str = None, pid: int = None):
+        """(last count matching lines, cursor to follow from)"""
+        with self.condition:
+            lines = [line for line in self.lines if self.matches(line, stream, pid)]
+            cursor = self.last_seq
+        return (lines[-count:] if count > 0 else []), cursor
+
+    def since(self, seq: int, timeout: float = 0.0, stream: str = None, pid: int = None):
+        """(matching lines after seq, new cursor), waiting up to timeout for output (follow mode)"""
+        with self.condition:
+            if timeout > 0:
+                self.condition.wait_for(lambda: self.last_seq > seq, timeout=timeout)
+            lines = [line for line in self.lines if line.seq > seq and self.matches(line, stream, pid)]
+            return lines, self.last_seq
+
+    def add_listener(self, listener):
+        with self.condition:
+            self.listeners.add(listener)
+
+    def remove_listener(self, listener):
+        with self.condition:
+            self.listeners.discard(listener)
+
+    @staticmethod
+    def matches(line: LogLine, stream: str, pid: int) -> bool:
+        return (stream is None or line.stream == stream) and (pid is None or line.pid == pid)
+
+def pump(pipe, buffer: LogBuffer, stream: str, pid: int, on_line=None):
+    """
+    Drain pipe until EOF. on_line(text) may claim a line (return True) so
+    it is handled as a control message instead of being logged.
+    """
+    try:
+        for raw in pipe:
+            text = raw.rstrip("\r\n")
+            if on_line is not None and on_line(text):
+                continue
+            buffer.append(stream, pid, text)
+    except (OSError, ValueError) as e:
+        buffer.append(stream, pid, f"<log pump stopped: {e}>")
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+def start_pump(pipe, buffer: LogBuffer, stream: str, pid: int, on_line=None) -> threading.Thread:
+    thread = threading.Thread(
+        target=pump, args=(pipe, buffer, stream, pid, on_line),
+        name=f"agent-{pid}-{stream}", daemon=True
+    )
+    thread.start()
+    return thread
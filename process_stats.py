@@ -0,0 +1,166 @@
+"""
+CPU and memory accounting for agent worker process trees.
+
+LiveKit runs each job in a child process of the worker, so usage is summed
+over the worker and all of its descendants. Uses psutil when installed,
+/proc on Linux, and one `ps` call otherwise (macOS).
+"""
+
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, List
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+class ProcessInfo:
+    def __init__(self, pid: int, ppid: int, cpu_seconds: float, rss: int):
+        self.pid = pid
+        self.ppid = ppid
+        self.cpu_seconds = cpu_seconds
+        self.rss = rss
+
+def parse_cpu_time(value: str) -> float:
+    """ps TIME column: [[dd-]hh:]mm:ss[.ss]"""
+    days = 0
+    if "-" in value:
+        day_part, value = value.split("-", 1)
+        days = int(day_part)
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return days * 86400 + seconds
+
+def snapshot_proc() -> Dict[int, ProcessInfo]:
+    processes = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{name}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        # The command name may contain spaces, fields are counted after its closing paren
+        fields = stat[stat.rfind(")") + 2:].split()
+        processes[int(name)] = ProcessInfo(
+            int(name), int(fields[1]),
+            (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+            resident_pages * PAGE_SIZE
+        )
+    return processes
+
+def snapshot_ps() -> Dict[int, ProcessInfo]:
+    processes = {}
+    try:
+        output = subprocess.run(
+            ["ps", "-A", "-o", "pid=,ppid=,rss=,time="], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return processes
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) != 4:
+            continue
+        try:
+            pid, ppid, rss_kb = int(parts[0]), int(parts[1]), int(parts[2])
+            processes[pid] = ProcessInfo(pid, ppid, parse_cpu_time(parts[3]), rss_kb * 1024)
+        except ValueError:
+            continue
+    return processes
+
+def snapshot_psutil(root_pids: List[int]) -> Dict[int, ProcessInfo]:
+    processes = {}
+    for root_pid in root_pids:
+        try:
+            root = psutil.Process(root_pid)
+            members = [root] + root.children(recursive=True)
+        except psutil.Error:
+            continue
+        for process in members:
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    processes[process.pid] = ProcessInfo(
+                        process.pid, process.ppid(), times.user + times.system, process.memory_info().rss
+                    )
+            except psutil.Error:
+                continue
+    return processes
+
+def snapshot(root_pids: List[int]) -> Dict[int, ProcessInfo]:
+    if psutil is not None:
+        return snapshot_psutil(root_pids)
+    if os.path.isdir("/proc/self"):
+        return snapshot_proc()
+    return snapshot_ps()
+
+def tree_members(processes: Dict[int, ProcessInfo], root_pid: int) -> List[ProcessInfo]:
+    children = {}
+    for info in processes.values():
+        children.setdefault(info.ppid, []).append(info)
+    members = []
+    stack = [root_pid] if root_pid in processes else []
+    while stack:
+        pid = stack.pop()
+        members.append(processes[pid])
+        stack.extend(child.pid for child in children.get(pid, []))
+    return members
+
+class UsageSampler:
+    """
+    CPU % between consecutive samples (100 = one full core) and resident
+    memory, per process tree. One process listing per sample for all trees.
+    """
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.previous: Dict[int, tuple] = {}
+        self.cached: Dict[int, dict] = {}
+        self.sampled_at = 0.0
+
+    def sample(self, root_pids: List[int]) -> Dict[int, dict]:
+        root_pids = [pid for pid in root_pids if pid]
+        with self.lock:
+            now = time.monotonic()
+            if now - self.sampled_at < self.min_interval and all(pid in self.cached for pid in root_pids):
+                return {pid: self.cached[pid] for pid in root_pids}
+
+            processes = snapshot(root_pids)
+            usage = {}
+            for root_pid in root_pids:
+                members = tree_members(processes, root_pid)
+                if not members:
+                    continue
+                cpu_seconds = sum(info.cpu_seconds for info in members)
+                cpu_percent = None
+                if root_pid in self.previous:
+                    last_cpu, last_time = self.previous[root_pid]
+                    elapsed = now - last_time
+                    if elapsed > 0:
+                        cpu_percent = round(max(0.0, cpu_seconds - last_cpu) / elapsed * 100, 1)
+                self.previous[root_pid] = (cpu_seconds, now)
+                usage[root_pid] = {
+                    "cpu_percent": cpu_percent,
+                    "cpu_seconds": round(cpu_seconds, 2),
+                    "rss_bytes": sum(info.rss for info in members),
+                    "processes": len(members),
+                }
+            # Forget trees that are gone
+            self.previous = {pid: value for pid, value in self.previous.items() if pid in usage}
+            self.cached = usage
+            self.sampled_at = now
+            return usage
+
+def cpu_count() -> int:
+    return os.cpu_count() or 1
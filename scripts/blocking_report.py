@@ -0,0 +1,78 @@
+"""
+Rank the call sites that blocked the agent's event loop.
+
+Reads the records written by the loop watchdog (FRIDAY_LOOP_WATCHDOG=1) and
+groups them by call site, tool or full stack, worst total blocked time first.
+
+    python scripts/blocking_report.py                       # ~/.friday/loop_blocks/*.jsonl
+    python scripts/blocking_report.py --by tool
+    python scripts/blocking_report.py --stacks --limit 5 blocks.jsonl
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+DEFAULT_GLOB = os.path.expanduser("~/.friday/loop_blocks/*.jsonl")
+
+def load_blocks(paths):
+    blocks = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    blocks.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"{path}:{number}: skipping malformed record", file=sys.stderr)
+    return blocks
+
+def group_key(block, by):
+    if by == "tool":
+        return block.get("tool") or "(no tool)"
+    if by == "stack":
+        return " <- ".join(reversed(block.get("stack", [])[-6:])) or block.get("site", "?")
+    return block.get("site", "?")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help=f"block files (default {DEFAULT_GLOB})")
+    parser.add_argument("--by", choices=("site", "tool", "stack"), default="site")
+    parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--stacks", action="store_true", help="print the slowest block's stack for each entry")
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(DEFAULT_GLOB))
+    if not paths:
+        sys.exit(f"No block files found ({DEFAULT_GLOB}); run the agent with FRIDAY_LOOP_WATCHDOG=1")
+    blocks = load_blocks(paths)
+    if not blocks:
+        sys.exit("No blocking episodes recorded")
+
+    groups = defaultdict(list)
+    for block in blocks:
+        groups[group_key(block, args.by)].append(block)
+    ranked = sorted(groups.items(), key=lambda item: sum(b["duration_ms"] for b in item[1]), reverse=True)
+
+    total = sum(block["duration_ms"] for block in blocks)
+    print(f"{len(blocks)} blocks, {total / 1000:.1f}s of blocked event loop\n")
+    print(f"{'total ms':>10} {'share':>6} {'blocks':>6} {'p95 ms':>8} {'max ms':>8}  {args.by}")
+    for key, members in ranked[:args.limit]:
+        durations = sorted(block["duration_ms"] for block in members)
+        p95 = durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+        tools = sorted({block.get("tool") for block in members if block.get("tool")})
+        detail = f"  [{', '.join(tools)}]" if tools and args.by != "tool" else ""
+        print(f"{sum(durations):10.0f} {100 * sum(durations) / total:5.1f}% {len(members):6} "
+              f"{p95:8.0f} {durations[-1]:8.0f}  {key}{detail}")
+        if args.stacks:
+            worst = max(members, key=lambda block: block["duration_ms"])
+            for frame in worst.get("stack", [])[-12:]:
+                print(f"{'':44}{frame}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Offline analyzer for agent traces written with FRIDAY_TRACING=file.
+
+For every voice turn it prints the critical path: the chain of spans that
+decided how long the user waited, walking back from the moment the agent
+started speaking (or the end of the turn) and charging gaps between child
+spans to their parent's own time. A breakdown across all turns follows.
+
+    python scripts/trace_report.py                      # ~/.friday/traces/*.jsonl
+    python scripts/trace_report.py traces.jsonl --last 5
+    python scripts/trace_report.py --trace 4bf92f3577b34da6a3ce929d0e0e4736
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+DEFAULT_GLOB = os.path.expanduser("~/.friday/traces/*.jsonl")
+
+def load_spans(paths):
+    spans = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"{path}:{number}: skipping malformed span", file=sys.stderr)
+    return spans
+
+def build_traces(spans):
+    """trace_id -> (root spans, children by parent span_id)"""
+    traces = defaultdict(lambda: ([], defaultdict(list)))
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        roots, children = traces[span["trace_id"]]
+        parent = span.get("parent_span_id")
+        if parent and parent in ids:
+            children[parent].append(span)
+        else:
+            roots.append(span)
+    return traces
+
+def speech_start(span):
+    for event in span.get("events", []):
+        if event["name"] == "agent.speech_start":
+            return event["time_unix_nano"]
+    return None
+
+def label(span):
+    return span["name"] + (" [error]" if span.get("status", {}).get("code") == "ERROR" else "")
+
+def critical_path(span, children, until, path=()):
+    """Segments (label, nanoseconds) covering span's start..until, latest work first"""
+    name = " > ".join(path + (label(span),))
+    segments = []
+    cursor = until
+    pending = [child for child in children.get(span["span_id"], []) if child["start_time_unix_nano"] < cursor]
+    while cursor > span["start_time_unix_nano"]:
+        candidates = [child for child in pending if child["start_time_unix_nano"] < cursor]
+        if not candidates:
+            break
+        child = max(candidates, key=lambda c: min(c["end_time_unix_nano"], cursor))
+        child_end = min(child["end_time_unix_nano"], cursor)
+        if child_end < cursor:
+            segments.append((f"{name} (self)", cursor - child_end))
+        segments.extend(critical_path(child, children, child_end, path + (label(span),)))
+        cursor = max(child["start_time_unix_nano"], span["start_time_unix_nano"])
+        pending.remove(child)
+    if cursor > span["start_time_unix_nano"]:
+        segments.append((f"{name} (self)", cursor - span["start_time_unix_nano"]))
+    return segments
+
+def merge(segments):
+    """Oldest first, adjacent segments with the same label combined"""
+    merged = []
+    for name, duration in reversed(segments):
+        if merged and merged[-1][0] == name:
+            merged[-1] = (name, merged[-1][1] + duration)
+        else:
+            merged.append((name, duration))
+    return merged
+
+def ms(nanoseconds):
+    return nanoseconds / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help=f"trace files (default {DEFAULT_GLOB})")
+    parser.add_argument("--last", type=int, default=0, help="only the most recent N turns")
+    parser.add_argument("--trace", help="only this trace id")
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(DEFAULT_GLOB))
+    if not paths:
+        sys.exit(f"No trace files found ({DEFAULT_GLOB}); run the agent with FRIDAY_TRACING=file")
+    spans = load_spans(paths)
+    traces = build_traces(spans)
+
+    turns = []
+    untraced = 0
+    for trace_id, (roots, children) in traces.items():
+        if args.trace and trace_id != args.trace:
+            continue
+        for root in roots:
+            if root["name"] == "turn":
+                turns.append((root, children))
+            else:
+                untraced += 1
+    turns.sort(key=lambda item: item[0]["start_time_unix_nano"])
+    if args.last:
+        turns = turns[-args.last:]
+    if not turns:
+        sys.exit("No turns found")
+
+    totals = defaultdict(int)
+    waited = 0
+    for turn, children in turns:
+        attributes = turn.get("attributes", {})
+        spoke = speech_start(turn)
+        until = spoke or turn["end_time_unix_nano"]
+        segments = merge(critical_path(turn, children, until))
+        response = ms(until - turn["start_time_unix_nano"])
+        waited += until - turn["start_time_unix_nano"]
+        print(f"Turn {attributes.get('turn.number', '?')}  trace {turn['trace_id']}  "
+              f"{'response' if spoke else 'no speech, total'} {response:.0f} ms  "
+              f"(ended: {attributes.get('turn.end_reason', '?')})")
+        for name, duration in segments:
+            totals[name.replace(" [error]", "")] += duration
+            share = 100 * duration / (until - turn["start_time_unix_nano"]) if until > turn["start_time_unix_nano"] else 0
+            print(f"  {ms(duration):9.1f} ms  {share:5.1f}%  {name}")
+        print()
+
+    print(f"Critical path across {len(turns)} turns ({ms(waited) / len(turns):.0f} ms mean response):")
+    for name, duration in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {ms(duration):9.1f} ms  {100 * duration / waited if waited else 0:5.1f}%  {name}")
+    if untraced:
+        print(f"\n{untraced} spans ran outside any turn (e.g. tools called after the turn ended)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Per-tool call statistics with Prometheus text rendering.
+
+The agent process records every tool call (see All_tools/tool_metrics.py)
+and reports it to the control plane as a tool_result event; app.py feeds
+those events into its own registry, which serves /metrics for all workers.
+Event-loop lag and blocking reported by the agents' watchdogs (see
+All_tools/loop_watchdog.py) are kept in a LoopStatsRegistry next to it.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Seconds; voice turns feel slow past ~1s, so resolution is finest below that
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes of tool arguments / results (results are read back by the model)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+# Seconds the agent's event loop was blocked; audio breaks up past ~40ms
+BLOCK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when empty or beyond the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        separator = "," if labels else ""
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6g}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.args_bytes = Histogram(SIZE_BUCKETS)
+        self.result_bytes = Histogram(SIZE_BUCKETS)
+        self.max_latency = 0.0
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class ToolStatsRegistry:
+    """Thread-safe stats keyed by (tool, worker); worker is empty inside the agent process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tools: Dict[Tuple[str, str], ToolStats] = {}
+
+    def record(self, tool: str, latency: float, error: str = None,
+               args_bytes: int = 0, result_bytes: int = 0, worker: str = ""):
+        """error is None for success, otherwise a kind such as "exception" or "reported" """
+        with self.lock:
+            stats = self.tools.get((tool, worker))
+            if stats is None:
+                stats = self.tools[(tool, worker)] = ToolStats()
+            stats.calls += 1
+            if error:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+            stats.latency.observe(latency)
+            stats.args_bytes.observe(args_bytes)
+            stats.result_bytes.observe(result_bytes)
+            stats.max_latency = max(stats.max_latency, latency)
+
+    def summary(self) -> List[dict]:
+        """One row per tool (all workers merged), slowest total time first"""
+        merged: Dict[str, dict] = {}
+        with self.lock:
+            for (tool, _), stats in self.tools.items():
+                row = merged.setdefault(tool, {"tool": tool, "calls": 0, "errors": 0, "total_seconds": 0.0,
+                                               "max_seconds": 0.0, "p95_seconds": None, "result_bytes": 0})
+                row["calls"] += stats.calls
+                row["errors"] += sum(stats.errors.values())
+                row["total_seconds"] += stats.latency.sum
+                row["max_seconds"] = max(row["max_seconds"], stats.max_latency)
+                row["result_bytes"] += int(stats.result_bytes.sum)
+                p95 = stats.latency.quantile(0.95)
+                if p95 is not None:
+                    row["p95_seconds"] = max(row["p95_seconds"] or 0.0, p95)
+        rows = sorted(merged.values(), key=lambda row: row["total_seconds"], reverse=True)
+        for row in rows:
+            row["mean_seconds"] = row["total_seconds"] / row["calls"] if row["calls"] else 0.0
+            # Bucket bounds overshoot; the slowest observed call is a tighter bound
+            if row["p95_seconds"] is not None:
+                row["p95_seconds"] = min(row["p95_seconds"], row["max_seconds"])
+        return rows
+
+    def render_prometheus(self) -> str:
+        with self.lock:
+            items = sorted(self.tools.items())
+            calls, errors, latency, args, results = [], [], [], [], []
+            for (tool, worker), stats in items:
+                labels = f'tool="{escape_label(tool)}"'
+                if worker:
+                    labels += f',worker="{escape_label(worker)}"'
+                calls.append(f"friday_tool_calls_total{{{labels}}} {stats.calls}")
+                for kind, count in sorted(stats.errors.items()):
+                    errors.append(f'friday_tool_errors_total{{{labels},kind="{escape_label(kind)}"}} {count}')
+                latency.extend(stats.latency.render("friday_tool_latency_seconds", labels))
+                args.extend(stats.args_bytes.render("friday_tool_args_bytes", labels))
+                results.extend(stats.result_bytes.render("friday_tool_result_bytes", labels))
+
+        lines = [
+            "# HELP friday_tool_calls_total Tool invocations.",
+            "# TYPE friday_tool_calls_total counter", *calls,
+            "# HELP friday_tool_errors_total Tool calls that raised (kind=exception) or returned an error message (kind=reported).",
+            "# TYPE friday_tool_errors_total counter", *errors,
+            "# HELP friday_tool_latency_seconds Tool execution time.",
+            "# TYPE friday_tool_latency_seconds histogram", *latency,
+            "# HELP friday_tool_args_bytes Size of tool arguments.",
+            "# TYPE friday_tool_args_bytes histogram", *args,
+            "# HELP friday_tool_result_bytes Size of tool results returned to the model.",
+            "# TYPE friday_tool_result_bytes histogram", *results,
+        ]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self.lock:
+            self.tools.clear()
+
+class LoopStatsRegistry:
+    """Event-loop lag windows and blocking episodes, keyed by worker"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lag: Dict[str, Tuple[float, float]] = {}
+        self.blocks: Dict[Tuple[str, str, str], List[float]] = {}
+        self.durations: Dict[str, Histogram] = {}
+
+    def record_lag(self, max_seconds: float, p99_seconds: float, worker: str = ""):
+        with self.lock:
+            self.lag[worker] = (max_seconds, p99_seconds)
+
+    def record_block(self, seconds: float, tool: str = "", site: str = "", worker: str = ""):
+        with self.lock:
+            totals = self.blocks.setdefault((worker, tool, site), [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            histogram = self.durations.get(worker)
+            if histogram is None:
+                histogram = self.durations[worker] = Histogram(BLOCK_BUCKETS)
+            histogram.observe(seconds)
+
+    def render_prometheus(self) -> str:
+        with self.lock:
+            lag_max, lag_p99, counts, seconds, durations = [], [], [], [], []
+            for worker, (max_seconds, p99_seconds) in sorted(self.lag.items()):
+                labels = f'worker="{escape_label(worker)}"'
+                lag_max.append(f"friday_loop_lag_max_seconds{{{labels}}} {max_seconds:.6g}")
+                lag_p99.append(f"friday_loop_lag_p99_seconds{{{labels}}} {p99_seconds:.6g}")
+            for (worker, tool, site), (count, total) in sorted(self.blocks.items()):
+                labels = f'worker="{escape_label(worker)}",tool="{escape_label(tool)}",site="{escape_label(site)}"'
+                counts.append(f"friday_loop_blocks_total{{{labels}}} {count}")
+                seconds.append(f"friday_loop_blocked_seconds_total{{{labels}}} {total:.6g}")
+            for worker, histogram in sorted(self.durations.items()):
+                durations.extend(histogram.render("friday_loop_block_seconds", f'worker="{escape_label(worker)}"'))
+
+        lines = [
+            "# HELP friday_loop_lag_max_seconds Worst event-loop lag in the agent's last report window.",
+            "# TYPE friday_loop_lag_max_seconds gauge", *lag_max,
+            "# HELP friday_loop_lag_p99_seconds 99th percentile event-loop lag in the agent's last report window.",
+            "# TYPE friday_loop_lag_p99_seconds gauge", *lag_p99,
+            "# HELP friday_loop_blocks_total Times the agent's event loop was blocked past the watchdog threshold.",
+            "# TYPE friday_loop_blocks_total counter", *counts,
+            "# HELP friday_loop_blocked_seconds_total Time the agent's event loop spent blocked.",
+            "# TYPE friday_loop_blocked_seconds_total counter", *seconds,
+            "# HELP friday_loop_block_seconds Duration of each blocking episode.",
+            "# TYPE friday_loop_block_seconds histogram", *durations,
+        ]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self.lock:
+            self.lag.clear()
+            self.blocks.clear()
+            self.durations.clear()
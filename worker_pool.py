@@ -0,0 +1,320 @@
+"""
+Pool of supervised agent workers for the web control plane.
+
+Each worker is an agent.py process under its own AgentSupervisor, with a
+worker id, its own health-check port and (optionally) its own LiveKit agent
+name for explicit dispatch. The pool tracks sessions per worker from the
+agents' session events, hands out the least-loaded worker for new rooms and
+reports CPU/memory per worker so capacity per core can be measured.
+
+Supervisor callbacks arrive with that supervisor's lock held, so the pool
+never calls into a supervisor while holding its own lock; aggregate status
+is built from the state each supervisor last published.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_supervisor import AgentSupervisor, STOPPED, STARTING, READY, RUNNING, STOPPING, CRASHED
+from log_pump import LogBuffer
+from process_stats import UsageSampler, cpu_count
+
+DEFAULT_BASE_PORT = 8081
+MAX_WORKERS = 32
+
+# A room handed to a worker counts towards its load until its session starts
+PENDING_ASSIGNMENT_TTL = 60.0
+
+# Most significant state wins when summarising the pool for the dashboard
+STATE_PRIORITY = [RUNNING, STOPPING, STARTING, CRASHED, READY, STOPPED]
+
+class Worker:
+    def __init__(self, worker_id: int, port: int, agent_name: str):
+        self.id = worker_id
+        self.port = port
+        self.agent_name = agent_name
+        self.supervisor = None
+        self.sessions = set()
+        self.pending = {}
+        self.sessions_served = 0
+        self.last_status = {"state": STOPPED, "running": False, "pid": None, "standby_pid": None,
+                            "standby_ready": False, "restarts": 0, "last_error": None}
+
+    def expire_pending(self, now: float):
+        self.pending = {room: at for room, at in self.pending.items() if now - at < PENDING_ASSIGNMENT_TTL}
+
+    @property
+    def load(self) -> int:
+        return len(self.sessions) + len(self.pending)
+
+class WorkerPool:
+    def __init__(self, size: int = 1, command=None, agent_args=None, warm_standby: bool = True,
+                 listener=None, logs=None, base_port: int = DEFAULT_BASE_PORT, explicit_dispatch: bool = False):
+        self.command = command
+        self.agent_args = agent_args
+        self.warm_standby = warm_standby
+        self.listener = listener
+        self.logs = logs or LogBuffer()
+        self.base_port = base_port
+        self.explicit_dispatch = explicit_dispatch
+        self.target_size = max(1, min(size, MAX_WORKERS))
+        self.lock = threading.RLock()
+        self.workers = OrderedDict()
+        self.desired_running = False
+        self.closed = False
+        self.sampler = UsageSampler()
+
+    # --- worker lifecycle ---
+
+    def add_worker(self) -> Worker:
+        with self.lock:
+            # Reuse the lowest free id so ports stay in a small, predictable range
+            worker_id = next(i for i in range(1, MAX_WORKERS + 2) if i not in self.workers)
+            worker = Worker(
+                worker_id,
+                self.base_port + worker_id - 1,
+                f"friday-{worker_id}" if self.explicit_dispatch else ""
+            )
+            env = {"FRIDAY_WORKER_ID": str(worker_id), "FRIDAY_WORKER_PORT": str(worker.port)}
+            if worker.agent_name:
+                env["FRIDAY_AGENT_NAME"] = worker.agent_name
+            worker.supervisor = AgentSupervisor(
+                command=self.command,
+                agent_args=self.agent_args,
+                warm_standby=self.warm_standby,
+                listener=lambda event_type, data: self.on_worker_event(worker, event_type, data),
+                logs=self.logs,
+                env=env,
+                name=f"Worker {worker_id}"
+            )
+            self.workers[worker_id] = worker
+            return worker
+
+    def ensure_size(self) -> list:
+        """Create workers up to the target size; returns the new ones"""
+        created = []
+        with self.lock:
+            while not self.closed and len(self.workers) < self.target_size:
+                created.append(self.add_worker())
+        return created
+
+    def warm_up(self):
+        for worker in self.ensure_size():
+            worker.supervisor.warm_up()
+
+    def get(self, worker_id: int):
+        with self.lock:
+            return self.workers.get(worker_id)
+
+    def start(self, worker_id: int = None, timeout: float = 60.0, wait: bool = True):
+        """Start one worker, or every worker in the pool; returns (ok, message)"""
+        if worker_id is not None:
+            worker = self.get(worker_id)
+            if worker is None:
+                return False, f"No worker with id {worker_id}"
+            return worker.supervisor.start(timeout, wait)
+
+        with self.lock:
+            self.desired_running = True
+        self.ensure_size()
+        with self.lock:
+            workers = list(self.workers.values())
+        if not wait:
+            results = [worker.supervisor.start(timeout, wait=False) for worker in workers]
+        else:
+            # Workers boot in parallel, so starting N costs about as long as starting one
+            with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+                results = list(executor.map(lambda worker: worker.supervisor.start(timeout), workers))
+
+        started = sum(1 for ok, _ in results if ok)
+        already = sum(1 for ok, message in results if not ok and "already running" in message)
+        if started == 0 and already == 0:
+            return False, results[0][1] if results else "No workers configured"
+        if started == 0:
+            return False, results[0][1] if len(results) == 1 else f"All {already} workers are already running"
+        if len(workers) == 1:
+            return True, results[0][1]
+        return True, f"{'Started' if wait else 'Starting'} {started} of {len(workers)} workers"
+
+    def stop(self, worker_id: int = None, timeout: float = 5.0, wait: bool = True):
+        """Stop one worker, or every worker in the pool; returns (ok, message)"""
+        if worker_id is not None:
+            worker = self.get(worker_id)
+            if worker is None:
+                return False, f"No worker with id {worker_id}"
+            return worker.supervisor.stop(timeout, wait)
+
+        with self.lock:
+            self.desired_running = False
+            workers = list(self.workers.values())
+        if not workers:
+            return False, "Agent is not running"
+        if not wait:
+            results = [worker.supervisor.stop(timeout, wait=False) for worker in workers]
+        else:
+            with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+                results = list(executor.map(lambda worker: worker.supervisor.stop(timeout), workers))
+
+        stopped = sum(1 for ok, _ in results if ok)
+        if stopped == 0:
+            return False, results[0][1]
+        if len(workers) == 1:
+            return True, results[0][1]
+        return True, f"{'Stopped' if wait else 'Stopping'} {stopped} workers"
+
+    def scale(self, count: int, timeout: float = 60.0):
+        """Grow or shrink the pool to count workers, idle workers are removed first"""
+        count = max(1, min(count, MAX_WORKERS))
+        with self.lock:
+            self.target_size = count
+            removable = sorted(self.workers.values(), key=lambda worker: (worker.load, -worker.id))
+            removed = removable[:max(0, len(self.workers) - count)]
+            for worker in removed:
+                del self.workers[worker.id]
+            desired_running = self.desired_running
+
+        for worker in removed:
+            worker.supervisor.shutdown()
+            self.publish("worker_removed", {"worker_id": worker.id})
+
+        # New workers boot in the background; progress arrives as state events
+        created = self.ensure_size()
+        for worker in created:
+            if desired_running:
+                worker.supervisor.start(timeout, wait=False)
+            else:
+                worker.supervisor.warm_up()
+
+        self.publish_status()
+        return True, f"Pool scaled to {count} workers (+{len(created)}, -{len(removed)})"
+
+    def assign(self, room: str = None):
+        """Least-loaded running worker (fewest sessions, then lowest CPU); None if nothing is running"""
+        candidates = self.workers_status(include_usage=True)["workers"]
+        running = [worker for worker in candidates if worker["state"] == RUNNING]
+        if not running:
+            return None
+        best = min(running, key=lambda worker: (
+            worker["load"], (worker["usage"] or {}).get("cpu_percent") or 0.0, worker["id"]
+        ))
+        if room:
+            with self.lock:
+                worker = self.workers.get(best["id"])
+                if worker is not None:
+                    worker.pending[room] = time.time()
+                    best["load"] = worker.load
+        return best
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            workers = list(self.workers.values())
+        for worker in workers:
+            worker.supervisor.shutdown()
+
+    # --- events from the supervisors ---
+
+    def on_worker_event(self, worker: Worker, event_type: str, data: dict):
+        data = dict(data, worker_id=worker.id)
+        with self.lock:
+            if event_type == "state":
+                worker.last_status = {key: value for key, value in data.items() if key in worker.last_status}
+                if data["state"] != RUNNING:
+                    worker.sessions.clear()
+                    worker.pending.clear()
+            elif event_type == "session":
+                room = data.get("room")
+                worker.pending.pop(room, None)
+                if data.get("status") == "started":
+                    worker.sessions.add(room)
+                    worker.sessions_served += 1
+                else:
+                    worker.sessions.discard(room)
+
+        if event_type == "state":
+            self.publish("worker_state", data)
+            self.publish_status()
+        else:
+            self.publish(event_type, data)
+
+    def publish(self, event_type: str, data: dict):
+        if self.listener is None:
+            return
+        try:
+            self.listener(event_type, data)
+        except Exception as e:
+            print(f"Error publishing {event_type} event: {e}")
+
+    def publish_status(self):
+        self.publish("state", self.status())
+
+    # --- reporting ---
+
+    def status(self) -> dict:
+        """Pool summary in the single-agent status shape the dashboard expects"""
+        with self.lock:
+            workers = list(self.workers.values())
+            statuses = [worker.last_status for worker in workers]
+            sessions = sum(len(worker.sessions) for worker in workers)
+        if not statuses:
+            statuses = [Worker(0, 0, "").last_status]
+
+        state = min((status["state"] for status in statuses), key=STATE_PRIORITY.index)
+        primary = next((status for status in statuses if status["state"] == RUNNING), statuses[0])
+        errors = [status["last_error"] for status in statuses if status["last_error"]]
+        return {
+            "state": state,
+            "running": state == RUNNING,
+            "pid": primary["pid"],
+            "standby_pid": primary["standby_pid"],
+            "standby_ready": primary["standby_ready"],
+            "restarts": sum(status["restarts"] for status in statuses),
+            "last_error": errors[-1] if errors else None,
+            "workers": len(workers),
+            "running_workers": sum(1 for status in statuses if status["state"] == RUNNING),
+            "sessions": sessions,
+        }
+
+    def workers_status(self, include_usage: bool = True) -> dict:
+        now = time.time()
+        with self.lock:
+            workers = list(self.workers.values())
+            for worker in workers:
+                worker.expire_pending(now)
+            rows = [{
+                "id": worker.id,
+                "port": worker.port,
+                "agent_name": worker.agent_name or None,
+                "sessions": sorted(worker.sessions),
+                "pending": sorted(worker.pending),
+                "load": worker.load,
+                "sessions_served": worker.sessions_served,
+                **worker.last_status,
+            } for worker in workers]
+
+        usage = self.sampler.sample([row["pid"] for row in rows]) if include_usage else {}
+        for row in rows:
+            row["usage"] = usage.get(row["pid"]) if row["pid"] else None
+
+        measured = [row["usage"] for row in rows if row["usage"]]
+        total_cpu = sum(item["cpu_percent"] or 0.0 for item in measured)
+        total_rss = sum(item["rss_bytes"] for item in measured)
+        total_sessions = sum(len(row["sessions"]) for row in rows)
+        return {
+            "workers": rows,
+            "capacity": {
+                "cpu_count": cpu_count(),
+                "target_size": self.target_size,
+                "sessions": total_sessions,
+                "cpu_percent": round(total_cpu, 1),
+                "rss_bytes": total_rss,
+                "cpu_percent_per_session": round(total_cpu / total_sessions, 1) if total_sessions else None,
+                "rss_bytes_per_session": total_rss // total_sessions if total_sessions else None,
+            },
+        }
+
+    def pid_of(self, worker_id: int):
+        worker = self.get(worker_id)
+        return worker.last_status["pid"] if worker else None